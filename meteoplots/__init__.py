@@ -0,0 +1,102 @@
+'''
+meteoplots: funções para plotagem meteorológica.
+
+The public API is loaded lazily (PEP 562): ``import meteoplots`` is cheap and the
+heavy dependencies (cartopy, matplotlib.pyplot, geopandas, regionmask) are only
+imported when the function that needs them is first accessed.
+
+>>> import meteoplots
+>>> meteoplots.generate_title('Precipitação', unidade='mm')  # does not import cartopy
+>>> meteoplots.plot_contourf_from_xarray(data, plot_var_colorbar='tp')
+'''
+
+import importlib
+
+# Public name -> module where it is defined
+_LAZY_ATTRS = {
+    # plots
+    'add_text_annotations': 'meteoplots.plots',
+    'get_base_ax': 'meteoplots.plots',
+    'add_base_features': 'meteoplots.plots',
+    'add_box_to_plot': 'meteoplots.plots',
+    'add_shapefiles_to_plot': 'meteoplots.plots',
+    'plot_contourf_from_xarray': 'meteoplots.plots',
+    'plot_contour_from_xarray': 'meteoplots.plots',
+    'plot_quiver_from_xarray': 'meteoplots.plots',
+    'plot_streamplot_from_xarray': 'meteoplots.plots',
+    'plot_multipletypes_from_xarray': 'meteoplots.plots',
+    'plot_small_multiples_from_xarray': 'meteoplots.plots',
+    'plot_choropleth_from_geodataframe': 'meteoplots.plots',
+    'plot_ensemble_statistic': 'meteoplots.plots',
+    'plot_accumulated_lead_times': 'meteoplots.plots',
+    'plot_stations': 'meteoplots.plots',
+    # colorbar
+    'custom_colorbar': 'meteoplots.colorbar.colorbars',
+    'palette_norm': 'meteoplots.colorbar.colorbars',
+    # utils
+    'calculate_mean_basin_value_from_shapefile': 'meteoplots.utils.utils',
+    'normalize_longitude': 'meteoplots.utils.utils',
+    'normalize_extent': 'meteoplots.utils.utils',
+    'coarsen_to_display': 'meteoplots.utils.utils',
+    'gaussian_smooth': 'meteoplots.utils.utils',
+    'smooth_contour_paths': 'meteoplots.utils.utils',
+    'place_contour_labels': 'meteoplots.utils.utils',
+    'land_sea_mask': 'meteoplots.utils.utils',
+    'mask_land_sea': 'meteoplots.utils.utils',
+    'figures_panel': 'meteoplots.utils.utils',
+    'EnsembleStatistics': 'meteoplots.utils.ensemble',
+    'ensemble_statistics': 'meteoplots.utils.ensemble',
+    'CumulativeSum': 'meteoplots.utils.accumulation',
+    'load_climatology': 'meteoplots.utils.accumulation',
+    'compute_anomaly': 'meteoplots.utils.accumulation',
+    'iter_accumulated': 'meteoplots.utils.accumulation',
+    'wind_speed': 'meteoplots.utils.derived',
+    'vorticity': 'meteoplots.utils.derived',
+    'divergence': 'meteoplots.utils.derived',
+    'integrated_vapor_transport': 'meteoplots.utils.derived',
+    'TextCollection': 'meteoplots.utils.annotations',
+    'add_text_collection': 'meteoplots.utils.annotations',
+    'select_non_overlapping': 'meteoplots.utils.annotations',
+    'declutter_texts': 'meteoplots.utils.annotations',
+    'stations_to_grid': 'meteoplots.utils.stations',
+    'idw_to_grid': 'meteoplots.utils.stations',
+    'delaunay_to_grid': 'meteoplots.utils.stations',
+    'read_shapefile': 'meteoplots.utils.geometry',
+    'simplify_tolerance': 'meteoplots.utils.geometry',
+    'simplified_geometries': 'meteoplots.utils.geometry',
+    'geometry_paths': 'meteoplots.utils.geometry',
+    'features_in_extent': 'meteoplots.utils.geometry',
+    'land_geometries': 'meteoplots.utils.geometry',
+    'natural_earth_geometries': 'meteoplots.utils.natural_earth',
+    'natural_earth_resolution': 'meteoplots.utils.natural_earth',
+    'warmup_natural_earth': 'meteoplots.utils.natural_earth',
+    'add_natural_earth': 'meteoplots.utils.natural_earth',
+    # io
+    'read_grib': 'meteoplots.io',
+    'read_netcdf': 'meteoplots.io',
+    'open_field': 'meteoplots.io',
+    'build_grib_index': 'meteoplots.io',
+    'FieldStore': 'meteoplots.io',
+    'generate_title': 'meteoplots.utils.titles',
+}
+
+# Submodules that can be accessed as attributes (meteoplots.plots, meteoplots.cli, ...)
+_LAZY_SUBMODULES = ['plots', 'colorbar', 'utils', 'io', 'cli']
+
+__all__ = list(_LAZY_ATTRS) + _LAZY_SUBMODULES
+
+def __getattr__(name):
+
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name]), name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f'{__name__}.{name}')
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    # Cache no namespace do pacote para que os próximos acessos não passem por aqui
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
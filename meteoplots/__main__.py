@@ -0,0 +1,5 @@
+import sys
+
+from meteoplots.cli import main
+
+sys.exit(main())
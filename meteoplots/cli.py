@@ -0,0 +1,348 @@
+'''Command line entry point for batch (operational) rendering of meteoplots products'''
+
+import argparse
+import sys
+import time
+
+from meteoplots.utils.utils import LRUCache
+
+# Funções de plotagem disponíveis no spec (nome no spec -> nome em meteoplots.plots)
+PLOT_FUNCTIONS = {
+    'contourf': 'plot_contourf_from_xarray',
+    'contour': 'plot_contour_from_xarray',
+    'quiver': 'plot_quiver_from_xarray',
+    'streamplot': 'plot_streamplot_from_xarray',
+    'multiple': 'plot_multipletypes_from_xarray',
+}
+
+# Chaves do spec que são tratadas pelo CLI; o restante é repassado como kwargs para a função de plot
+SPEC_KEYS = ['name', 'data', 'variable', 'layers', 'plot', 'sel', 'isel', 'scale', 'offset', 'store', 'kwargs']
+
+# Chaves que definem o mapa base (mapas com o mesmo dado e mesmo mapa base são agrupados e desenhados
+# sobre uma única figura de mapa base por grupo)
+BASE_MAP_KEYS = ['extent', 'figsize', 'central_longitude', 'coastline_resolution']
+
+# Cache de datasets abertos no processo (cada worker mantém o seu); limitado, pois specs
+# operacionais apontam para arquivos novos a cada rodada
+_DATASETS = LRUCache(maxsize=8)
+
+def load_spec(path_spec):
+
+    '''Read a YAML/JSON product spec and return the list of products with defaults applied'''
+
+    import json
+    import os
+
+    with open(path_spec, 'r', encoding='utf-8') as f:
+        if path_spec.endswith('.json'):
+            spec = json.load(f)
+        else:
+            try:
+                import yaml
+            except ImportError:
+                raise ImportError("Reading YAML product specs requires PyYAML: pip install pyyaml")
+            spec = yaml.safe_load(f)
+
+    if isinstance(spec, list):
+        spec = {'products': spec}
+
+    if not spec or not spec.get('products'):
+        raise ValueError(f"Spec {path_spec} has no 'products' to render")
+
+    defaults = spec.get('defaults', {}) or {}
+    base_dir = os.path.dirname(os.path.abspath(path_spec))
+
+    products = []
+    for i, item in enumerate(spec['products']):
+
+        product = {**defaults, **item}
+        product['kwargs'] = {**defaults.get('kwargs', {}), **item.get('kwargs', {})}
+        product.setdefault('plot', 'contourf')
+        product.setdefault('name', item.get('output_filename', f'product_{i}'))
+
+        if product['plot'] not in PLOT_FUNCTIONS:
+            raise ValueError(f"Product {product['name']}: plot '{product['plot']}' not supported. Options: {list(PLOT_FUNCTIONS)}")
+
+        if 'data' not in product:
+            raise ValueError(f"Product {product['name']}: missing 'data' (path to the dataset)")
+
+        if 'variable' not in product and 'layers' not in product:
+            raise ValueError(f"Product {product['name']}: provide 'variable' or 'layers'")
+
+        # Caminhos relativos são resolvidos a partir do diretório do spec
+        if not os.path.isabs(product['data']):
+            product['data'] = os.path.join(base_dir, product['data'])
+
+        products.append(product)
+
+    return products
+
+def plot_kwargs(product):
+
+    '''kwargs passed to the plot function of a product: its non-spec keys updated with `kwargs`'''
+
+    kwargs = {k: v for k, v in product.items() if k not in SPEC_KEYS}
+    kwargs.update(product['kwargs'])
+    kwargs.setdefault('output_filename', f"{product['name']}.png")
+
+    return kwargs
+
+def base_map_key(product):
+
+    '''Base map parameters of a product, None without an explicit extent (each plot function has its own default)'''
+
+    kwargs = plot_kwargs(product)
+    if kwargs.get('extent') is None:
+        return None
+
+    return tuple(str(kwargs.get(key)) for key in BASE_MAP_KEYS)
+
+def group_products(products):
+
+    '''Group products sharing the same data file and base map, preserving spec order'''
+
+    groups = {}
+    for product in products:
+        groups.setdefault((product['data'], base_map_key(product)), []).append(product)
+
+    return list(groups.values())
+
+def open_dataset(path_data):
+
+    '''Open a dataset once per process and reuse it for every product that needs it'''
+
+    import xarray as xr
+
+    if path_data not in _DATASETS:
+        _DATASETS[path_data] = xr.open_dataset(path_data)
+
+    return _DATASETS[path_data]
+
+def select_field(ds, variable, product):
+
+    '''Extract a plot-ready DataArray from the dataset following the product spec'''
+
+    da = ds[variable]
+
+    if product.get('sel'):
+        da = da.sel(**product['sel'])
+
+    if product.get('isel'):
+        da = da.isel(**product['isel'])
+
+    da = da.squeeze(drop=True)
+
+    if product.get('scale') is not None:
+        da = da * product['scale']
+
+    if product.get('offset') is not None:
+        da = da + product['offset']
+
+    return da
+
+def load_field(variable, product):
+
+    '''
+    Plot-ready field of a product. With `store: true` in the spec the decoded field is taken
+    from the memory-mapped FieldStore, so products (and workers) sharing it decode it only once.
+    '''
+
+    if not product.get('store'):
+        return select_field(open_dataset(product['data']), variable, product)
+
+    from meteoplots.io import FieldStore
+
+    selection = {key: product.get(key) for key in ['sel', 'isel', 'scale', 'offset']}
+
+    return FieldStore().get_or_create(product['data'], variable, lambda: select_field(open_dataset(product['data']), variable, product), **selection)
+
+def draw_base_map(product):
+
+    '''
+    Figure and GeoAxes with the base map of a product (extent, coastlines, borders, gridlines), and the
+    state to restore it with reset_base_map once a product has been drawn and saved on top of it
+    '''
+
+    from meteoplots.plots import get_base_ax
+    from meteoplots.utils.utils import normalize_extent
+
+    kwargs = plot_kwargs(product)
+    central_longitude = kwargs.get('central_longitude', 0)
+    fig, ax = get_base_ax(extent=normalize_extent(kwargs['extent'], central_longitude), figsize=tuple(kwargs.get('figsize', (12, 12))),
+                          central_longitude=central_longitude, resolution=kwargs.get('coastline_resolution', 'auto'))
+
+    state = {'artists': set(ax.get_children()), 'figure': set(fig.get_children()), 'limits': (ax.get_xlim(), ax.get_ylim())}
+
+    return fig, ax, state
+
+def reset_base_map(fig, ax, state):
+
+    '''Remove everything a product added to the base map (layers, labels, colorbar axes, titles)'''
+
+    # Colorbars (inset_axes) e textos da figura primeiro: remover uma camada com colorbar também mexe no eixo dela
+    for artist in fig.get_children():
+        if artist not in state['figure'] and artist in fig.get_children():
+            artist.remove()
+
+    # Algumas camadas removem junto seus artistas (rótulos do clabel): só remove o que ainda está no eixo
+    for artist in ax.get_children():
+        if artist not in state['artists'] and artist.axes is ax:
+            artist.remove()
+
+    for loc in ['left', 'center', 'right']:
+        ax.set_title('', loc=loc)
+
+    ax.set_xlim(state['limits'][0])
+    ax.set_ylim(state['limits'][1])
+
+def render_product(product, base_map=None):
+
+    '''
+    Render a single product from the spec. With base_map (fig, ax) the product is drawn on that
+    figure and saved here instead of building its own base map.
+    '''
+
+    import os
+    from meteoplots import plots
+
+    kwargs = plot_kwargs(product)
+    savefigure = kwargs.get('savefigure', True)
+    if base_map is not None:
+        kwargs.update(fig=base_map[0], ax=base_map[1], savefigure=False)
+
+    plot_function = getattr(plots, PLOT_FUNCTIONS[product['plot']])
+
+    if product['plot'] == 'multiple':
+        layers = {layer: load_field(variable, product) for layer, variable in product['layers'].items()}
+        plot_function(layers, **kwargs)
+
+    elif product['plot'] in ['quiver', 'streamplot']:
+        u_var, v_var = product['variable']
+        plot_function(load_field(u_var, product), load_field(v_var, product), **kwargs)
+
+    else:
+        plot_function(load_field(product['variable'], product), **kwargs)
+
+    if base_map is not None and savefigure:
+        path_save = kwargs.get('path_save', './tmp/plots')
+        os.makedirs(path_save, exist_ok=True)
+        base_map[0].savefig(f"{path_save}/{kwargs['output_filename']}", bbox_inches='tight')
+        print(f"✅ Plot saved as {path_save}/{kwargs['output_filename']}")
+
+def render_group(products):
+
+    '''
+    Render a group of products in the current process, returning (name, seconds, error) per product.
+    Products with an extent share one base map: it is drawn once for the group, each product is drawn
+    on it and saved, and its artists are then removed for the next one.
+    '''
+
+    import matplotlib.pyplot as plt
+
+    base_map = None
+    results = []
+    for product in products:
+        start = time.perf_counter()
+        try:
+            if base_map is None and base_map_key(product) is not None:
+                base_map = draw_base_map(product)
+            render_product(product, base_map=base_map[:2] if base_map is not None else None)
+            error = None
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+        finally:
+            if base_map is not None:
+                reset_base_map(*base_map)
+            # Figuras criadas pelo produto; a do mapa base fica aberta até o fim do grupo
+            for number in plt.get_fignums():
+                if base_map is None or number != base_map[0].number:
+                    plt.close(number)
+        results.append((product['name'], time.perf_counter() - start, error))
+
+    if base_map is not None:
+        plt.close(base_map[0])
+
+    return results
+
+def init_worker():
+
+    '''Initializer of the render worker processes: non-interactive backend, set before pyplot draws anything'''
+
+    import matplotlib
+    matplotlib.use('Agg')
+
+def render(path_spec, workers=1):
+
+    '''Render every product of a spec, optionally spreading the groups over N worker processes'''
+
+    start = time.perf_counter()
+    products = load_spec(path_spec)
+    groups = group_products(products)
+
+    print(f'Rendering {len(products)} products in {len(groups)} groups with {workers} worker(s)...')
+
+    results = []
+    if workers > 1 and len(groups) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            for group_results in executor.map(render_group, groups):
+                results.extend(group_results)
+    else:
+        for group in groups:
+            results.extend(render_group(group))
+
+    print_summary(results, time.perf_counter() - start)
+
+    return results
+
+def print_summary(results, total_time):
+
+    '''Print the timing summary of a batch run'''
+
+    width = max([len(name) for name, _, _ in results] + [7])
+
+    print('\n' + '-' * (width + 20))
+    print(f"{'Product':<{width}}  {'Time (s)':>8}  Status")
+    print('-' * (width + 20))
+    for name, seconds, error in results:
+        status = '✅' if error is None else f'❌ {error}'
+        print(f'{name:<{width}}  {seconds:>8.2f}  {status}')
+    print('-' * (width + 20))
+
+    n_failed = sum(error is not None for _, _, error in results)
+    render_time = sum(seconds for _, seconds, _ in results)
+    print(f'{len(results) - n_failed}/{len(results)} products rendered | render time {render_time:.2f}s | wall time {total_time:.2f}s')
+
+def main(argv=None):
+
+    parser = argparse.ArgumentParser(prog='meteoplots', description='Batch rendering of meteorological maps')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    parser_render = subparsers.add_parser('render', help='Render every product listed in a YAML/JSON spec')
+    parser_render.add_argument('spec', help='Path to the products spec (YAML or JSON)')
+    parser_render.add_argument('-j', '--workers', type=int, default=1, help='Number of worker processes (default: 1)')
+
+    parser_warmup = subparsers.add_parser('warmup', help='Download and cache the Natural Earth base map features (run once before offline workers)')
+    parser_warmup.add_argument('-r', '--resolutions', nargs='+', default=None, help="Natural Earth resolutions (110m, 50m, 10m; default: all, as used by resolution='auto')")
+    parser_warmup.add_argument('-f', '--features', nargs='+', default=None, help='Features to cache (coastline, borders, land, ocean; default: all)')
+    parser_warmup.add_argument('--central-longitudes', nargs='+', type=float, default=[0], help='Central longitudes of the PlateCarree maps (default: 0)')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'render':
+        import matplotlib
+        matplotlib.use('Agg')
+        results = render(args.spec, workers=args.workers)
+        return 1 if any(error is not None for _, _, error in results) else 0
+
+    if args.command == 'warmup':
+        from meteoplots.utils.natural_earth import warmup_natural_earth
+        try:
+            warmup_natural_earth(resolutions=args.resolutions, features=args.features, central_longitudes=args.central_longitudes)
+        except Exception as e:
+            print(f'❌ Natural Earth warm-up failed: {type(e).__name__}: {e}')
+            return 1
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -521,4 +521,43 @@ def custom_colorbar(variavel_plotagem=None, help=False, custom=False):
         cmap = custom.get("cmap")
         cbar_ticks = custom.get("cbar_ticks")
 
-    return levels, colors, cmap, cbar_ticks
\ No newline at end of file
+    return levels, colors, cmap, cbar_ticks
+
+
+def palette_norm(levels, colors=None, cmap=None):
+
+    '''
+    Colormap and BoundaryNorm for a custom_colorbar palette outside contourf (scatter, collections),
+    with the same colors as contourf: a list of colors is cycled/truncated to the level bins and, with
+    len(levels) + 1 colors, the first/last ones are used below/above the levels. Named and short
+    colormaps are resampled so every bin and both extensions get a color.
+    '''
+
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import BoundaryNorm, ListedColormap
+
+    levels = list(levels)
+    n_bins = len(levels) - 1
+
+    if cmap is None:
+        colors = [colors] if isinstance(colors, str) else list(colors)
+        # Cores extras nas pontas: abaixo/acima dos níveis (como no contourf com extend='both')
+        extremes = len(colors) == n_bins + 2
+        inner = colors[1:-1] if extremes else colors
+        cmap = ListedColormap([inner[i % len(inner)] for i in range(n_bins)])
+        if extremes:
+            cmap.set_under(colors[0])
+            cmap.set_over(colors[-1])
+        return cmap, BoundaryNorm(levels, n_bins)
+
+    if isinstance(cmap, str):
+        cmap = plt.get_cmap(cmap)
+
+    # Uma cor por intervalo: valores fora dos níveis usam as cores das pontas do colormap
+    if cmap.N == n_bins:
+        return cmap, BoundaryNorm(levels, n_bins)
+
+    if cmap.N < n_bins + 2:
+        cmap = cmap.resampled(n_bins + 2)
+
+    return cmap, BoundaryNorm(levels, cmap.N, extend='both')
@@ -0,0 +1,347 @@
+'''Readers for GRIB/NetCDF files returning plot-ready DataArrays (latitude/longitude dims)'''
+
+import os
+
+from meteoplots.utils.utils import LRUCache
+
+# Chaves do cabeçalho GRIB guardadas no índice de mensagens
+GRIB_INDEX_KEYS = ['shortName', 'typeOfLevel', 'level', 'endStep', 'stepRange', 'dataDate', 'dataTime', 'validityDate', 'validityTime', 'gridType']
+
+# Extensões tratadas como GRIB (o resto é aberto como NetCDF)
+GRIB_EXTENSIONS = ('.grib', '.grb', '.grib2', '.grb2', '.grib1', '.grb1')
+
+# Nomes alternativos de latitude/longitude renomeados para os nomes das funções de plot
+LAT_NAMES = ['lat', 'y', 'nav_lat', 'XLAT']
+LON_NAMES = ['lon', 'x', 'nav_lon', 'XLONG']
+
+# Índices já lidos neste processo: chave do arquivo -> lista de mensagens.
+# Limitado: cada rodada de modelo traz arquivos novos (os antigos continuam no cache em disco)
+_GRIB_INDEXES = LRUCache(maxsize=64)
+
+def _file_key(path):
+
+    import hashlib
+
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+
+    return hashlib.sha1(f'{path}|{stat.st_mtime_ns}|{stat.st_size}'.encode()).hexdigest()
+
+def build_grib_index(path, cache_dir=None):
+
+    '''
+    Index the messages of a GRIB file (offset, length and header keys), reading headers only.
+    The index is cached in memory and on disk (JSON in the meteoplots cache dir), keyed by
+    path, size and modification time, so each file is scanned once.
+    '''
+
+    import json
+    import eccodes
+    from meteoplots.utils.utils import get_cache_dir
+
+    key = _file_key(path)
+    if key in _GRIB_INDEXES:
+        return _GRIB_INDEXES[key]
+
+    index_file = os.path.join(cache_dir or get_cache_dir('grib_index'), f'{key}.json')
+
+    if os.path.exists(index_file):
+        with open(index_file, 'r') as f:
+            index = json.load(f)
+
+    else:
+        index = []
+        with open(path, 'rb') as f:
+            while True:
+                handle = eccodes.codes_grib_new_from_file(f, headers_only=True)
+                if handle is None:
+                    break
+                try:
+                    message = {'offset': int(eccodes.codes_get(handle, 'offset')), 'length': int(eccodes.codes_get(handle, 'totalLength'))}
+                    for name in GRIB_INDEX_KEYS:
+                        message[name] = eccodes.codes_get(handle, name) if eccodes.codes_is_defined(handle, name) else None
+                    index.append(message)
+                finally:
+                    eccodes.codes_release(handle)
+
+        # Escrita atômica: outro processo nunca lê um índice pela metade
+        tmp = f'{index_file}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp, index_file)
+
+    _GRIB_INDEXES[key] = index
+
+    return index
+
+def select_grib_messages(index, shortName=None, level=None, step=None, typeOfLevel=None):
+
+    '''Filter index entries by shortName, level, step (endStep, hours) and typeOfLevel; each filter may be a value or a list'''
+
+    def matches(value, wanted):
+        if wanted is None:
+            return True
+        if isinstance(wanted, (list, tuple, set, range)):
+            return value in wanted
+        return value == wanted
+
+    return [message for message in index
+            if matches(message['shortName'], shortName) and matches(message['level'], level)
+            and matches(message['endStep'], step) and matches(message['typeOfLevel'], typeOfLevel)]
+
+def _extent_indexes(lat, lon, extent):
+
+    '''Row/column slices of the grid inside extent [lon_min, lon_max, lat_min, lat_max] (grid and extent in 0-360 or -180-180)'''
+
+    import numpy as np
+    from meteoplots.utils.utils import normalize_extent
+
+    lon_min, lon_max, lat_min, lat_max = normalize_extent(extent)
+
+    rows = np.flatnonzero((lat >= lat_min) & (lat <= lat_max))
+    # Distância a leste de lon_min (módulo 360): grade em 0-360 ou -180-180 e extents que cruzam 180°
+    columns = np.flatnonzero((lon - lon_min) % 360 <= lon_max - lon_min)
+
+    if rows.size == 0 or columns.size == 0:
+        raise ValueError(f'Extent {extent} does not intersect the grid')
+
+    return rows, columns
+
+def _decode_grib_message(data, extent=None):
+
+    '''Decode one GRIB message (bytes) into (values 2D, lat, lon), cropped to the extent'''
+
+    import eccodes
+    import numpy as np
+
+    handle = eccodes.codes_new_from_message(data)
+    try:
+        grid_type = eccodes.codes_get(handle, 'gridType')
+        if grid_type not in ('regular_ll', 'regular_gg'):
+            raise ValueError(f"GRIB grid type '{grid_type}' not supported (regular_ll/regular_gg only)")
+
+        ni, nj = eccodes.codes_get(handle, 'Ni'), eccodes.codes_get(handle, 'Nj')
+        values = eccodes.codes_get_values(handle).reshape(nj, ni)
+
+        if eccodes.codes_get(handle, 'bitmapPresent'):
+            values = np.where(values == eccodes.codes_get(handle, 'missingValue'), np.nan, values)
+
+        lat = np.array(eccodes.codes_get_array(handle, 'distinctLatitudes'), dtype=float)
+        lon = np.array(eccodes.codes_get_array(handle, 'distinctLongitudes'), dtype=float)
+
+        # distinctLatitudes vem ordenado; alinha com a ordem de varredura da mensagem
+        first_lat = eccodes.codes_get(handle, 'latitudeOfFirstGridPointInDegrees')
+        last_lat = eccodes.codes_get(handle, 'latitudeOfLastGridPointInDegrees')
+        if (first_lat > last_lat) != (lat[0] > lat[-1]):
+            lat = lat[::-1]
+    finally:
+        eccodes.codes_release(handle)
+
+    if extent is not None:
+        rows, columns = _extent_indexes(lat, lon, extent)
+        values = values[rows[0]:rows[-1] + 1][:, columns]
+        lat, lon = lat[rows[0]:rows[-1] + 1], lon[columns]
+
+    return values, lat, lon
+
+def read_grib(path, shortName, level=None, step=None, typeOfLevel=None, extent=None, cache_dir=None):
+
+    '''
+    Read only the requested messages of a GRIB file using the cached message index.
+
+    Messages are read by offset (the rest of the file is never decoded) and optionally
+    cropped to the plot extent. A single message returns a 2D DataArray; several steps
+    and/or levels are stacked on `step`/`level` dims. Longitudes are converted to -180-180.
+    '''
+
+    import pandas as pd
+    import xarray as xr
+    from meteoplots.utils.utils import normalize_longitude
+
+    messages = select_grib_messages(build_grib_index(path, cache_dir=cache_dir), shortName=shortName, level=level, step=step, typeOfLevel=typeOfLevel)
+
+    if not messages:
+        raise ValueError(f"No GRIB message in {path} for shortName={shortName}, level={level}, step={step}, typeOfLevel={typeOfLevel}")
+
+    fields = []
+    with open(path, 'rb') as f:
+        for message in messages:
+            f.seek(message['offset'])
+            values, lat, lon = _decode_grib_message(f.read(message['length']), extent=extent)
+
+            valid_time = pd.to_datetime(f"{message['validityDate']}{message['validityTime']:04d}", format='%Y%m%d%H%M')
+            field = xr.DataArray(values, coords=[('latitude', lat), ('longitude', lon)], name=shortName,
+                                 attrs={'typeOfLevel': message['typeOfLevel'], 'stepRange': message['stepRange']})
+            fields.append(field.assign_coords(level=message['level'], step=message['endStep'], valid_time=valid_time))
+
+    if len(fields) == 1:
+        return normalize_longitude(fields[0])
+
+    # Empilha nas dimensões que variam entre as mensagens (passo e/ou nível)
+    stack_dims = [dim for dim, key in [('step', 'endStep'), ('level', 'level')] if len({message[key] for message in messages}) > 1]
+
+    return normalize_longitude(_stack_fields(fields, stack_dims))
+
+def _stack_fields(fields, dims):
+
+    import xarray as xr
+
+    if not dims:
+        if len(fields) > 1:
+            raise ValueError(f'{len(fields)} GRIB messages match the same step/level: refine the selection (e.g. typeOfLevel)')
+        return fields[0]
+
+    groups = {}
+    for field in fields:
+        groups.setdefault(field[dims[0]].item(), []).append(field)
+
+    return xr.concat([_stack_fields(groups[value], dims[1:]) for value in sorted(groups)], dim=dims[0])
+
+def read_netcdf(path, variable, extent=None, sel=None, isel=None):
+
+    '''
+    Read one variable of a NetCDF file lazily, selecting (`sel`/`isel`) and cropping to
+    the extent before loading, with lat/lon renamed to latitude/longitude and longitudes
+    converted to -180-180.
+    '''
+
+    import xarray as xr
+    from meteoplots.utils.utils import normalize_longitude
+
+    with xr.open_dataset(path) as ds:
+
+        data = ds[variable]
+        data = data.rename({name: 'latitude' for name in LAT_NAMES if name in data.dims})
+        data = data.rename({name: 'longitude' for name in LON_NAMES if name in data.dims})
+
+        if isel:
+            data = data.isel(isel)
+        if sel:
+            data = data.sel(sel)
+
+        if extent is not None:
+            rows, columns = _extent_indexes(data['latitude'].values, data['longitude'].values, extent)
+            data = data.isel(latitude=slice(rows[0], rows[-1] + 1), longitude=columns)
+
+        # Só a seleção é lida do disco
+        data = data.load()
+
+    return normalize_longitude(data)
+
+def open_field(path, variable, extent=None, store=None, **kwargs):
+
+    '''
+    Read a field from a GRIB (by extension) or NetCDF file; kwargs go to read_grib or read_netcdf.
+    With store (a FieldStore, or True for the default one) the decoded field is written once
+    and memory-mapped on every later call, in any process.
+    '''
+
+    def load():
+        if path.lower().endswith(GRIB_EXTENSIONS):
+            return read_grib(path, shortName=variable, extent=extent, **kwargs)
+        return read_netcdf(path, variable, extent=extent, **kwargs)
+
+    if not store:
+        return load()
+
+    store = FieldStore() if store is True else store
+
+    return store.get_or_create(path, variable, load, extent=extent, **kwargs)
+
+class FieldStore:
+
+    '''
+    Local store of decoded, plot-ready fields shared by every product of a run.
+
+    Each field is written once as an uncompressed .npy (64-byte aligned header) plus a
+    .npz with its coordinates, and later opened with np.load(mmap_mode='r'), so any
+    process gets a zero-copy, read-only view. Entries are keyed by (source file with its
+    size/mtime, variable, level, step, extent) and written atomically.
+
+    >>> store = FieldStore()
+    >>> t850 = store.get_or_create('gfs.grib2', 't', level=850, step=24, extent=[-80, -30, -35, 10],
+    ...                            loader=lambda: read_grib('gfs.grib2', 't', level=850, step=24, extent=[-80, -30, -35, 10]))
+    '''
+
+    def __init__(self, root=None):
+
+        from meteoplots.utils.utils import get_cache_dir
+
+        self.root = root or get_cache_dir('fields')
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, source, variable, level=None, step=None, extent=None, **selection):
+
+        import hashlib
+        import json
+
+        parts = [_file_key(source), variable, level, step, list(extent) if extent is not None else None, sorted(selection.items())]
+
+        return hashlib.sha1(json.dumps(parts, default=str).encode()).hexdigest()
+
+    def _paths(self, key):
+        return os.path.join(self.root, f'{key}.npy'), os.path.join(self.root, f'{key}.npz')
+
+    def __contains__(self, key):
+        return all(os.path.exists(path) for path in self._paths(key))
+
+    def put(self, key, xarray_data):
+
+        '''Write a DataArray under key (values first, coordinates last: an entry is only visible when complete)'''
+
+        import json
+        import numpy as np
+
+        values_file, coords_file = self._paths(key)
+
+        # Coordenadas object (strings) viram unicode para não depender de pickle na leitura
+        coords = {f'coord_{name}': np.asarray(coord.values, dtype=str if coord.dtype == object else None) for name, coord in xarray_data.coords.items()}
+        meta = {'name': xarray_data.name, 'dims': list(xarray_data.dims), 'attrs': xarray_data.attrs,
+                'coords': {name: list(coord.dims) for name, coord in xarray_data.coords.items()}}
+
+        for target, write in [(values_file, lambda f: np.save(f, np.ascontiguousarray(xarray_data.values))),
+                              (coords_file, lambda f: np.savez(f, meta=json.dumps(meta, default=str), **coords))]:
+            tmp = f'{target}.{os.getpid()}.tmp'
+            with open(tmp, 'wb') as f:
+                write(f)
+            os.replace(tmp, target)
+
+    def get(self, key):
+
+        '''Memory-map a stored field (read-only, zero-copy) or return None if it is not stored'''
+
+        import json
+        import numpy as np
+        import xarray as xr
+
+        if key not in self:
+            return None
+
+        values_file, coords_file = self._paths(key)
+
+        with np.load(coords_file) as stored:
+            meta = json.loads(str(stored['meta']))
+            coords = {name: (dims, stored[f'coord_{name}']) for name, dims in meta['coords'].items()}
+
+        values = np.load(values_file, mmap_mode='r')
+
+        return xr.DataArray(values, coords=coords, dims=meta['dims'], name=meta['name'], attrs=meta['attrs'])
+
+    def get_or_create(self, source, variable, loader, level=None, step=None, extent=None, **selection):
+
+        '''Return the stored field, decoding it with loader() and storing it the first time'''
+
+        key = self.key(source, variable, level=level, step=step, extent=extent, **selection)
+
+        if key not in self:
+            self.put(key, loader())
+
+        return self.get(key)
+
+    def clear(self):
+
+        '''Remove every stored field'''
+
+        for name in os.listdir(self.root):
+            if name.endswith(('.npy', '.npz')):
+                os.remove(os.path.join(self.root, name))
@@ -1,11 +1,4 @@
 
-import cartopy.crs as ccrs
-import matplotlib.pyplot as plt
-import cartopy.feature as cfeature
-
-import cartopy.crs as ccrs
-import matplotlib.pyplot as plt
-
 def add_text_annotations(ax, texts, **text_kwargs):
     """
     Add text annotations to the plot.
@@ -14,12 +7,23 @@ def add_text_annotations(ax, texts, **text_kwargs):
     -----------
     ax : matplotlib.axes.Axes or cartopy.mpl.geoaxes.GeoAxes
         The axes to add text to
-    texts : list of dict
+    texts : list of dict, DataFrame or dict of arrays
         List of text dictionaries with keys: 'x', 'y', 'text' and optional styling
         Example: [{'x': -50, 'y': -25, 'text': 'Label', 'fontsize': 12, 'color': 'red'}]
+        Columnar input (e.g. thousands of stations) is drawn in bulk by a single artist,
+        see meteoplots.utils.annotations.add_text_collection
     **text_kwargs : dict
-        Default styling options for all texts
+        Default styling options for all texts (text_extent drops columnar labels outside the extent,
+        text_declutter=True hides labels overlapping a higher 'priority' one)
     """
+
+    import cartopy.crs as ccrs
+
+    # Columnar input: one vectorized projection and a single artist for all labels
+    if hasattr(texts, 'columns') or isinstance(texts, dict):
+        from meteoplots.utils.annotations import add_text_collection
+        return add_text_collection(ax, texts, extent=text_kwargs.get('text_extent', None), **text_kwargs)
+
     default_style = {
         'fontsize': text_kwargs.get('text_fontsize', 12),
         'color': text_kwargs.get('text_color', 'black'),
@@ -29,6 +33,7 @@ def add_text_annotations(ax, texts, **text_kwargs):
         'transform': ccrs.PlateCarree()
     }
     
+    artists, priority = [], []
     for text_info in texts:
         # Handle both x/y and lon/lat coordinate systems
         if 'x' in text_info and 'y' in text_info and 'text' in text_info:
@@ -50,64 +55,171 @@ def add_text_annotations(ax, texts, **text_kwargs):
                 else:
                     style[key] = text_info[key]
         
-        ax.text(x, y, text_info['text'], **style)
+        artists.append(ax.text(x, y, text_info['text'], **style))
+        priority.append(text_info.get('priority', 0))
+
+    # Overlap removal (higher priority first, then input order)
+    if text_kwargs.get('text_declutter', False):
+        from meteoplots.utils.annotations import declutter_texts
+        declutter_texts(artists, priority=priority)
 
-def get_base_ax(extent, figsize, central_longitude=0):
+    return artists
 
-    import cartopy.feature as cfeature
+def get_base_ax(extent, figsize, central_longitude=0, resolution='auto'):
+
+    import cartopy.crs as ccrs
+    import matplotlib.pyplot as plt
 
     fig = plt.figure(figsize=figsize)
     ax = plt.axes(projection=ccrs.PlateCarree(central_longitude=central_longitude))
+    add_base_features(ax, extent, resolution=resolution)
+
+    return fig, ax
+
+def add_base_features(ax, extent, left_labels=True, bottom_labels=True, resolution='auto', base_ax=None):
+
+    '''
+    Set the extent and draw coastlines, borders and gridlines on an existing GeoAxes. Natural Earth
+    features come from the local binary cache (filled on first use or by `meteoplots warmup`), at
+    `resolution` ('110m', '50m', '10m' or 'auto': by extent size) and clipped to the extent. With
+    `base_ax`, a GeoAxes already drawn by this function with the same projection and extent, its
+    coastline and border paths are reused instead of loaded again.
+    '''
+
+    import cartopy.crs as ccrs
+    from meteoplots.utils.natural_earth import add_natural_earth, NaturalEarthCollection
+
     ax.set_extent(list(extent), crs=ccrs.PlateCarree())
 
-    ax.coastlines(resolution='110m', color='black')
-    ax.add_feature(cfeature.BORDERS, edgecolor='black')
+    shared = {} if base_ax is None else {collection.feature: collection for collection in base_ax.collections if isinstance(collection, NaturalEarthCollection)}
+    add_natural_earth(ax, 'coastline', resolution, extent=extent, share=shared.get('coastline'), edgecolor='black')
+    add_natural_earth(ax, 'borders', resolution, extent=extent, share=shared.get('borders'), edgecolor='black')
 
-    # Labels dos ticks de lat e lon
-    gl = ax.gridlines(draw_labels=True, alpha=0.2, linestyle='--')
-    gl.top_labels = False
-    gl.right_labels = False
+    # Labels dos ticks de lat e lon (apenas à esquerda e embaixo)
+    draw_labels = {side: axis for side, axis, show in [('left', 'y', left_labels), ('bottom', 'x', bottom_labels)] if show}
+    ax.gridlines(draw_labels=draw_labels or False, alpha=0.2, linestyle='--')
 
-    return fig, ax
+    return ax
 
 def add_box_to_plot(ax, extent_boxes:list, **kwargs):
 
-    import matplotlib.patches as mpatches
+    import cartopy.crs as ccrs
+    import numpy as np
+    from matplotlib.collections import PolyCollection
 
-    '''Add a rectangular box to an existing plot'''
+    '''Add rectangular boxes to an existing plot, all drawn as a single PolyCollection'''
 
-    # Default parameters
+    # Default parameters (edgecolor/facecolor/linewidth may also be one value per box)
     edgecolor = kwargs.get('edgecolor_box', 'black')
     facecolor = kwargs.get('facecolor_box', 'none')
     linewidth = kwargs.get('linewidth_box', 1)
     linestyle = kwargs.get('linestyle_box', '-')
     alpha = kwargs.get('alpha_box', 1.0)
-
-    # Create a rectangle patch
-    for extent_box in extent_boxes:
-        rect = mpatches.Rectangle((extent_box[0], extent_box[2]), extent_box[1]-extent_box[0], extent_box[3]-extent_box[2],
-                                linewidth=linewidth, edgecolor=edgecolor, facecolor=facecolor, linestyle=linestyle, alpha=alpha,
-                                transform=ccrs.PlateCarree())
-
-        # Add the rectangle to the axes
-        ax.add_patch(rect)
-
-    return
+    labels = kwargs.get('labels_box', None)
+
+    extents = np.asarray(extent_boxes, dtype=float).reshape(-1, 4)
+    if len(extents) == 0:
+        return None
+
+    # Vértices (N, 4, 2) de todas as caixas de uma vez: [lon_min, lon_max, lat_min, lat_max]
+    lon_min, lon_max, lat_min, lat_max = extents.T
+    verts = np.stack([np.column_stack([lon_min, lat_min]), np.column_stack([lon_max, lat_min]),
+                      np.column_stack([lon_max, lat_max]), np.column_stack([lon_min, lat_max])], axis=1)
+
+    # Projeta todos os vértices em uma única chamada (sem a reprojeção por path do cartopy)
+    projection = getattr(ax, 'projection', None)
+    if projection is not None:
+        if not isinstance(projection, ccrs.PlateCarree):
+            # Lados densificados para acompanhar a curvatura em outras projeções
+            fraction = np.linspace(0, 1, 16, endpoint=False)[None, None, :, None]
+            verts = (verts[:, :, None] + fraction * (np.roll(verts, -1, axis=1) - verts)[:, :, None]).reshape(len(verts), -1, 2)
+        projected = projection.transform_points(ccrs.PlateCarree(), verts[..., 0].ravel(), verts[..., 1].ravel())
+        verts = projected[:, :2].reshape(verts.shape)
+
+    boxes = PolyCollection(verts, closed=True, edgecolors=edgecolor, facecolors=facecolor, linewidths=linewidth, linestyles=linestyle,
+                           alpha=alpha, transform=ax.transData, zorder=kwargs.get('zorder_box', 3))
+    ax.add_collection(boxes, autolim=False)
+
+    # Labels at the box centers, drawn as one TextCollection
+    if labels is not None:
+        from meteoplots.utils.annotations import add_text_collection
+        add_text_collection(ax, {'lon': (lon_min + lon_max) / 2, 'lat': (lat_min + lat_max) / 2, 'text': np.asarray(labels, dtype=str)},
+                            text_fontsize=kwargs.get('labels_box_fontsize', 10), text_color=kwargs.get('labels_box_color', 'black'),
+                            text_fontweight=kwargs.get('labels_box_fontweight', 'normal'))
+
+    return boxes
+
+def add_shapefiles_to_plot(ax, shapefiles, extent=None, **kwargs):
+
+    import cartopy.crs as ccrs
+    from matplotlib.collections import PathCollection
+    from meteoplots.utils.geometry import _simplified, _project_paths, simplify_tolerance
+
+    '''
+    Draw overlay shapefiles (paths or GeoDataFrames) as outlines, one PathCollection per shapefile.
+    Geometries are selected with a spatial index and clipped to the extent plus clip_margin (fraction
+    of its size), then simplified to half a pixel of the axes with shared borders simplified once;
+    everything is cached per shapefile. simplify_shapefiles=False / clip_shapefiles=False turn each
+    step off.
+    '''
+
+    projection = getattr(ax, 'projection', None)
+    if extent is None:
+        extent = ax.get_extent(crs=ccrs.PlateCarree()) if projection is not None else [*ax.get_xlim(), *ax.get_ylim()]
+
+    # Tamanho dos eixos (não da figura): nos painéis cada mapa ocupa só parte da figura
+    tolerance = 0.0
+    if kwargs.get('simplify_shapefiles', True):
+        dpi = ax.figure.dpi
+        tolerance = simplify_tolerance(extent, (ax.bbox.width / dpi, ax.bbox.height / dpi), dpi=dpi)
+
+    collections = []
+    for shapefile in shapefiles:
+        entry = _simplified(shapefile, tolerance, extent=extent if kwargs.get('clip_shapefiles', True) else None, margin=kwargs.get('clip_margin', 0.1))
+        paths = _project_paths(*entry['arrays'], projection=projection, geometries=entry['geometry'])
+        collection = PathCollection(paths, facecolors='none', edgecolors=kwargs.get('shapefile_edgecolor', 'black'), linewidths=kwargs.get('shapefile_linewidth', 1),
+                                    alpha=kwargs.get('shapefile_alpha', 0.5), transform=ax.transData, zorder=kwargs.get('shapefile_zorder', 1))
+        ax.add_collection(collection, autolim=False)
+        collections.append(collection)
+
+    return collections
+
+def _mask_surface(xarray_data, dim_lat, dim_lon, **kwargs):
+
+    '''
+    mask_method='data': land (mask_continents) and/or ocean (mask_oceans) cells of the field become NaN
+    before plotting, so they are never contoured and no LAND/OCEAN feature is drawn over the map
+    '''
+
+    from meteoplots.utils.utils import mask_land_sea
+
+    if kwargs.get('mask_method', 'feature') != 'data':
+        return xarray_data
+
+    resolution = kwargs.get('mask_resolution', '110m')
+    if kwargs.get('mask_continents', False):
+        xarray_data = mask_land_sea(xarray_data, 'land', dim_lat=dim_lat, dim_lon=dim_lon, resolution=resolution)
+    if kwargs.get('mask_oceans', False):
+        xarray_data = mask_land_sea(xarray_data, 'ocean', dim_lat=dim_lat, dim_lon=dim_lon, resolution=resolution)
+
+    return xarray_data
 
 def plot_contourf_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat='latitude', dim_lon='longitude', shapefiles=None, normalize_colorbar=False, **kwargs):
 
     from meteoplots.colorbar.colorbars import custom_colorbar
-    from meteoplots.utils.utils import calculate_mean_basin_value_from_shapefile
+    from meteoplots.utils.utils import calculate_mean_basin_value_from_shapefile, normalize_longitude, normalize_extent, coarsen_to_display, PRECIPITATION_PALETTES
     from matplotlib.colors import BoundaryNorm
+    import cartopy.crs as ccrs
+    from meteoplots.utils.natural_earth import add_natural_earth
+    import matplotlib.pyplot as plt
     from mpl_toolkits.axes_grid1.inset_locator import inset_axes
-    import geopandas as gpd
     import numpy as np
     import os
 
     '''Plot contourf data from an xarray DataArray'''
 
     # Default parameters
-    extent = kwargs.get('extent', [280, 330, -35, 10])
+    extent = kwargs.get('extent', [-80, -30, -35, 10])
     figsize = kwargs.get('figsize', (12, 12))
     central_longitude = kwargs.get('central_longitude', 0)
     title_size = kwargs.get('title_size', 16)
@@ -148,15 +260,26 @@ def plot_contourf_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat='lati
         norm = None
 
     # Create figure and axis
-    extent = tuple(extent)
+    extent = normalize_extent(extent, central_longitude)
     figsize = tuple(figsize)
     fig, ax = kwargs.get('fig', None), kwargs.get('ax', None)
     if fig is None or ax is None:
-        fig, ax = get_base_ax(extent=extent, figsize=figsize, central_longitude=central_longitude)
+        fig, ax = get_base_ax(extent=extent, figsize=figsize, central_longitude=central_longitude, resolution=kwargs.get('coastline_resolution', 'auto'))
 
     # Plot contourf data
-    lon, lat = np.meshgrid(xarray_data[dim_lon], xarray_data[dim_lat])
-    cf = ax.contourf(lon, lat, xarray_data, transform=ccrs.PlateCarree(), transform_first=True, origin='upper', levels=levels, colors=colors, extend='both', cmap=cmap, norm=norm)
+    xarray_data = normalize_longitude(xarray_data, dim_lon=dim_lon, central_longitude=central_longitude)
+
+    # Reduce the grid to the display resolution if requested (basin means keep the full grid)
+    plot_data = xarray_data
+    coarsen = kwargs.get('coarsen', False)
+    if coarsen:
+        method = coarsen if isinstance(coarsen, str) else ('max' if plot_var_colorbar in PRECIPITATION_PALETTES else 'mean')
+        plot_data = coarsen_to_display(xarray_data, extent, fig.get_size_inches(), dpi=kwargs.get('dpi', fig.dpi), method=method, dim_lat=dim_lat, dim_lon=dim_lon, pixels_per_cell=kwargs.get('coarsen_pixels', 3), central_longitude=central_longitude)
+
+    plot_data = _mask_surface(plot_data, dim_lat, dim_lon, **kwargs)
+
+    lon, lat = np.meshgrid(plot_data[dim_lon], plot_data[dim_lat])
+    cf = ax.contourf(lon, lat, plot_data, transform=ccrs.PlateCarree(), transform_first=True, origin='upper', levels=levels, colors=colors, extend='both', cmap=cmap, norm=norm)
 
     # Colorbar
     if colorbar_position == 'vertical':
@@ -172,9 +295,7 @@ def plot_contourf_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat='lati
 
     # Shapefiles if provided
     if shapefiles is not None:
-        for shapefile in shapefiles:
-            gdf = gpd.read_file(shapefile)
-            gdf.plot(ax=ax, facecolor='none', edgecolor='black', linewidths=1, alpha=0.5, transform=ccrs.PlateCarree())
+        add_shapefiles_to_plot(ax, shapefiles, extent=extent, **{k: v for k, v in kwargs.items() if k.startswith(('shapefile_', 'simplify_shapefiles', 'clip_'))})
 
     # Title
     ax.set_title(title, fontsize=title_size, loc=title_loc)
@@ -190,11 +311,21 @@ def plot_contourf_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat='lati
 
         import pandas as pd
 
-        # criando a var para tp no dataset se nao existir, o valor será o mesmo
-        shp = gpd.read_file(shp_path_bacias).to_crs(epsg=4326)
-        shp['centroid'] = shp['geometry'].centroid
+        from meteoplots.utils.geometry import read_shapefile, features_in_extent
+        import warnings
+
+        # Só as bacias no extent (índice espacial em cache por shapefile) e com o centroide dentro do mapa
+        shp = read_shapefile(shp_path_bacias)
+        shp = shp.iloc[features_in_extent(shp_path_bacias, extent, margin=0)].copy()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            shp['centroid'] = shp['geometry'].centroid
         shp['lat'] = shp['centroid'].y
         shp['lon'] = shp['centroid'].x
+        lon_min, lon_max, lat_min, lat_max = extent
+        # Centroides em -180-180, extent na janela de central_longitude: distância a leste de lon_min (módulo 360)
+        inside_lon = (shp['lon'] - lon_min) % 360 <= lon_max - lon_min
+        shp = shp[inside_lon & (shp['lat'] >= lat_min) & (shp['lat'] <= lat_max)]
 
         mean_values = []
         for basin in shp[basin_column_name].unique():
@@ -204,26 +335,36 @@ def plot_contourf_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat='lati
         media_bacia = pd.concat(mean_values, ignore_index=True)
 
         # Itera sobre as bacias e adiciona as anotações no mapa
+        basin_texts = []
         for _, row in media_bacia.iterrows():
 
             lon, lat = row[dim_lon], row[dim_lat]  # Extrai coordenadas do centroide
-            lon = lon+360
-            ax.text(lon, lat, f"{row['valor']:.0f}", fontsize=13, color='black', fontweight='bold', ha='center', va='center', transform=ccrs.PlateCarree())
+            basin_texts.append(ax.text(lon, lat, f"{row['valor']:.0f}", fontsize=13, color='black', fontweight='bold', ha='center', va='center', transform=ccrs.PlateCarree()))
+
+        # Remove rótulos sobrepostos, mantendo os das bacias maiores
+        if kwargs.get('declutter_labels', False):
+            from meteoplots.utils.annotations import declutter_texts
+
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                area = shp.set_index(basin_column_name).geometry.area.groupby(level=0).sum()
+            declutter_texts(basin_texts, priority=area.reindex(media_bacia['basin']).fillna(0).values)
 
     # Add box if extent_box is provided
     box_patches = kwargs.get('box_patches', None)
     if box_patches is not None:
         add_box_to_plot(ax, box_patches, **kwargs)
 
-    # Mask continets if requested
+    # Mask continets if requested (mask_method='data' already masked the field)
+    mask_feature = kwargs.get('mask_method', 'feature') == 'feature'
     mask_continents = kwargs.get('mask_continents', False)
-    if mask_continents:
-        ax.add_feature(cfeature.LAND, facecolor='lightgray', zorder=4)
+    if mask_continents and mask_feature:
+        add_natural_earth(ax, 'land', kwargs.get('coastline_resolution', 'auto'), extent=extent, facecolor='lightgray', edgecolor='none', zorder=4)
 
     # Mask oceans if requested
     mask_oceans = kwargs.get('mask_oceans', False)
-    if mask_oceans:
-        ax.add_feature(cfeature.OCEAN, facecolor=kwargs.get('mask_oceans_facecolor', 'lightgray'), zorder=4)
+    if mask_oceans and mask_feature:
+        add_natural_earth(ax, 'ocean', kwargs.get('coastline_resolution', 'auto'), extent=extent, facecolor=kwargs.get('mask_oceans_facecolor', 'lightgray'), edgecolor='none', zorder=4)
 
     # Add text annotations if provided
     texts = kwargs.get('texts', None)
@@ -241,16 +382,44 @@ def plot_contourf_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat='lati
 
     return fig, ax
 
+def _merge_contour_groups(contour_levels, colors_levels, styles_levels=None, widths_levels=None):
+
+    '''
+    Merge groups of contour levels (each with its color, style and width) into one sorted list of
+    levels with per-level colors, linestyles and linewidths, so the field is contoured in a single pass.
+    Styles/widths shorter than the groups repeat their last value; repeated levels keep the first group.
+    '''
+
+    import numpy as np
+
+    styles_levels = list(styles_levels or ['solid'])
+    widths_levels = list(widths_levels or [1.5])
+
+    levels, colors, styles, widths = [], [], [], []
+    for i, (color, group) in enumerate(zip(colors_levels, contour_levels)):
+        group = np.atleast_1d(np.asarray(group, dtype=float))
+        levels.extend(group)
+        colors.extend([color] * len(group))
+        styles.extend([styles_levels[min(i, len(styles_levels) - 1)]] * len(group))
+        widths.extend([widths_levels[min(i, len(widths_levels) - 1)]] * len(group))
+
+    levels, first = np.unique(np.asarray(levels, dtype=float), return_index=True)
+
+    return levels, [colors[i] for i in first], [styles[i] for i in first], [widths[i] for i in first]
+
 def plot_contour_from_xarray(xarray_data, dim_lat='latitude', dim_lon='longitude', shapefiles=None, **kwargs):
 
     '''Plot contour lines from an xarray Dataset'''
 
-    import geopandas as gpd
+    from meteoplots.utils.utils import normalize_longitude, normalize_extent, coarsen_to_display, gaussian_smooth, smooth_contour_paths, place_contour_labels
+    import cartopy.crs as ccrs
+    from meteoplots.utils.natural_earth import add_natural_earth
+    import matplotlib.pyplot as plt
     import numpy as np
     import os
 
     # Default parameters
-    extent = kwargs.get('extent', [240, 360, -60, 20])
+    extent = kwargs.get('extent', [-120, 0, -60, 20])
     figsize = kwargs.get('figsize', (12, 12))
     central_longitude = kwargs.get('central_longitude', 0)
     title_size = kwargs.get('title_size', 16)
@@ -260,26 +429,48 @@ def plot_contour_from_xarray(xarray_data, dim_lat='latitude', dim_lon='longitude
     output_filename = kwargs.get('output_filename', 'contour_plot.png')
 
     # Create figure and axis
-    extent = tuple(extent)
+    extent = normalize_extent(extent, central_longitude)
     figsize = tuple(figsize)
     fig, ax = kwargs.get('fig', None), kwargs.get('ax', None)
     if fig is None or ax is None:
-        fig, ax = get_base_ax(extent=extent, figsize=figsize, central_longitude=central_longitude)
+        fig, ax = get_base_ax(extent=extent, figsize=figsize, central_longitude=central_longitude, resolution=kwargs.get('coastline_resolution', 'auto'))
 
     # Plot contour data
+    xarray_data = normalize_longitude(xarray_data, dim_lon=dim_lon, central_longitude=central_longitude)
+
+    # Reduce the grid to the display resolution if requested
+    coarsen = kwargs.get('coarsen', False)
+    if coarsen:
+        xarray_data = coarsen_to_display(xarray_data, extent, fig.get_size_inches(), dpi=kwargs.get('dpi', fig.dpi), method=coarsen if isinstance(coarsen, str) else 'mean',
+                                         dim_lat=dim_lat, dim_lon=dim_lon, pixels_per_cell=kwargs.get('coarsen_pixels', 3), central_longitude=central_longitude)
+
+    # Smoothing: gaussian filter on the field and/or Chaikin on the contour paths only
+    xarray_data = gaussian_smooth(xarray_data, kwargs.get('smooth_sigma', None), dim_lat=dim_lat, dim_lon=dim_lon)
+    smooth_paths = kwargs.get('smooth_paths', 0)
+    xarray_data = _mask_surface(xarray_data, dim_lat, dim_lon, **kwargs)
+
+    # Labels: 'clabel' (inline, default) or 'fast' (precomputed positions along the paths)
+    label_method = kwargs.get('label_method', 'clabel')
+    label_spacing = kwargs.get('label_spacing', 250)
+
     lon, lat = np.meshgrid(xarray_data[dim_lon], xarray_data[dim_lat])
     contour_levels = kwargs.get('contour_levels', [np.arange(np.nanmin(xarray_data), np.nanmax(xarray_data), 5)])
     colors_levels = kwargs.get('colors_levels', ['red'])
 
-    for color, level in zip(colors_levels, contour_levels):
-        cf = ax.contour(lon, lat, xarray_data, levels=level, colors=color, linestyles='solid', linewidths=1.5, transform=ccrs.PlateCarree(), transform_first=True)
-        plt.clabel(cf, inline=True, fmt='%.0f', fontsize=15, colors=color)
+    # All groups in a single contour pass, with per-level colors, styles and widths
+    levels, colors, styles, widths = _merge_contour_groups(contour_levels, colors_levels, kwargs.get('styles_levels', None), kwargs.get('widths_levels', None))
+
+    if len(levels):
+        cf = ax.contour(lon, lat, xarray_data, levels=levels, colors=colors, linestyles=styles, linewidths=widths, transform=ccrs.PlateCarree(), transform_first=True)
+        smooth_contour_paths(cf, smooth_paths)
+        if label_method == 'fast':
+            place_contour_labels(cf, fmt='%.0f', fontsize=15, colors=colors, spacing=label_spacing)
+        else:
+            plt.clabel(cf, inline=True, fmt='%.0f', fontsize=15, colors=colors)
 
     # Shapefiles if provided
     if shapefiles is not None:
-        for shapefile in shapefiles:
-            gdf = gpd.read_file(shapefile)
-            gdf.plot(ax=ax, facecolor='none', edgecolor='black', linewidths=1, alpha=0.5, transform=ccrs.PlateCarree())
+        add_shapefiles_to_plot(ax, shapefiles, extent=extent, **{k: v for k, v in kwargs.items() if k.startswith(('shapefile_', 'simplify_shapefiles', 'clip_'))})
 
     # Title
     ax.set_title(title, fontsize=title_size, loc=title_loc)
@@ -289,15 +480,16 @@ def plot_contour_from_xarray(xarray_data, dim_lat='latitude', dim_lon='longitude
     if box_patches is not None:
         add_box_to_plot(ax, box_patches, **kwargs)
 
-    # Mask continets if requested
+    # Mask continets if requested (mask_method='data' already masked the field)
+    mask_feature = kwargs.get('mask_method', 'feature') == 'feature'
     mask_continents = kwargs.get('mask_continents', False)
-    if mask_continents:
-        ax.add_feature(cfeature.LAND, facecolor='lightgray', zorder=4)
+    if mask_continents and mask_feature:
+        add_natural_earth(ax, 'land', kwargs.get('coastline_resolution', 'auto'), extent=extent, facecolor='lightgray', edgecolor='none', zorder=4)
 
     # Mask oceans if requested
     mask_oceans = kwargs.get('mask_oceans', False)
-    if mask_oceans:
-        ax.add_feature(cfeature.OCEAN, facecolor=kwargs.get('mask_oceans_facecolor', 'lightgray'), zorder=4)
+    if mask_oceans and mask_feature:
+        add_natural_earth(ax, 'ocean', kwargs.get('coastline_resolution', 'auto'), extent=extent, facecolor=kwargs.get('mask_oceans_facecolor', 'lightgray'), edgecolor='none', zorder=4)
 
     # Add text annotations if provided
     texts = kwargs.get('texts', None)
@@ -319,12 +511,15 @@ def plot_quiver_from_xarray(xarray_u, xarray_v, dim_lat='latitude', dim_lon='lon
 
     '''Plot quiver (wind vectors) from xarray DataArrays for u and v components'''
 
-    import geopandas as gpd
+    from meteoplots.utils.utils import normalize_longitude, normalize_extent
+    import cartopy.crs as ccrs
+    from meteoplots.utils.natural_earth import add_natural_earth
+    import matplotlib.pyplot as plt
     import numpy as np
     import os
 
     # Default parameters
-    extent = kwargs.get('extent', [240, 360, -60, 20])
+    extent = kwargs.get('extent', [-120, 0, -60, 20])
     figsize = kwargs.get('figsize', (12, 12))
     central_longitude = kwargs.get('central_longitude', 0)
     title_size = kwargs.get('title_size', 16)
@@ -337,13 +532,15 @@ def plot_quiver_from_xarray(xarray_u, xarray_v, dim_lat='latitude', dim_lon='lon
     quiver_skip = kwargs.get('quiver_skip', 2)  # Skip every N points for cleaner display
 
     # Create figure and axis
-    extent = tuple(extent)
+    extent = normalize_extent(extent, central_longitude)
     figsize = tuple(figsize)
     fig, ax = kwargs.get('fig', None), kwargs.get('ax', None)
     if fig is None or ax is None:
-        fig, ax = get_base_ax(extent=extent, figsize=figsize, central_longitude=central_longitude)
+        fig, ax = get_base_ax(extent=extent, figsize=figsize, central_longitude=central_longitude, resolution=kwargs.get('coastline_resolution', 'auto'))
 
     # Create coordinate grids
+    xarray_u = _mask_surface(normalize_longitude(xarray_u, dim_lon=dim_lon, central_longitude=central_longitude), dim_lat, dim_lon, **kwargs)
+    xarray_v = _mask_surface(normalize_longitude(xarray_v, dim_lon=dim_lon, central_longitude=central_longitude), dim_lat, dim_lon, **kwargs)
     lon, lat = np.meshgrid(xarray_u[dim_lon], xarray_u[dim_lat])
     
     # Subsample for cleaner display
@@ -370,9 +567,7 @@ def plot_quiver_from_xarray(xarray_u, xarray_v, dim_lat='latitude', dim_lon='lon
 
     # Shapefiles if provided
     if shapefiles is not None:
-        for shapefile in shapefiles:
-            gdf = gpd.read_file(shapefile)
-            gdf.plot(ax=ax, facecolor='none', edgecolor='black', linewidths=1, alpha=0.5, transform=ccrs.PlateCarree())
+        add_shapefiles_to_plot(ax, shapefiles, extent=extent, **{k: v for k, v in kwargs.items() if k.startswith(('shapefile_', 'simplify_shapefiles', 'clip_'))})
 
     # Title
     ax.set_title(title, fontsize=title_size, loc=title_loc)
@@ -382,15 +577,16 @@ def plot_quiver_from_xarray(xarray_u, xarray_v, dim_lat='latitude', dim_lon='lon
     if box_patches is not None:
         add_box_to_plot(ax, box_patches, **kwargs)
 
-    # Mask continets if requested
+    # Mask continets if requested (mask_method='data' already masked the field)
+    mask_feature = kwargs.get('mask_method', 'feature') == 'feature'
     mask_continents = kwargs.get('mask_continents', False)
-    if mask_continents:
-        ax.add_feature(cfeature.LAND, facecolor='lightgray', zorder=4)
+    if mask_continents and mask_feature:
+        add_natural_earth(ax, 'land', kwargs.get('coastline_resolution', 'auto'), extent=extent, facecolor='lightgray', edgecolor='none', zorder=4)
 
     # Mask oceans if requested
     mask_oceans = kwargs.get('mask_oceans', False)
-    if mask_oceans:
-        ax.add_feature(cfeature.OCEAN, facecolor=kwargs.get('mask_oceans_facecolor', 'lightgray'), zorder=4)
+    if mask_oceans and mask_feature:
+        add_natural_earth(ax, 'ocean', kwargs.get('coastline_resolution', 'auto'), extent=extent, facecolor=kwargs.get('mask_oceans_facecolor', 'lightgray'), edgecolor='none', zorder=4)
 
     # Add text annotations if provided
     texts = kwargs.get('texts', None)
@@ -413,12 +609,16 @@ def plot_streamplot_from_xarray(xarray_u, xarray_v, dim_lat='latitude', dim_lon=
 
     '''Plot streamlines from xarray DataArrays for u and v components'''
 
-    import geopandas as gpd
+    from meteoplots.utils.utils import normalize_longitude, normalize_extent
+    from meteoplots.utils.derived import wind_speed
+    import cartopy.crs as ccrs
+    from meteoplots.utils.natural_earth import add_natural_earth
+    import matplotlib.pyplot as plt
     import numpy as np
     import os
 
     # Default parameters
-    extent = kwargs.get('extent', [240, 360, -60, 20])
+    extent = kwargs.get('extent', [-120, 0, -60, 20])
     figsize = kwargs.get('figsize', (12, 12))
     central_longitude = kwargs.get('central_longitude', 0)
     title_size = kwargs.get('title_size', 16)
@@ -437,30 +637,20 @@ def plot_streamplot_from_xarray(xarray_u, xarray_v, dim_lat='latitude', dim_lon=
     })
 
     # Create figure and axis
-    extent = tuple(extent)
+    extent = normalize_extent(extent, central_longitude)
     figsize = tuple(figsize)
     fig, ax = kwargs.get('fig', None), kwargs.get('ax', None)
     if fig is None or ax is None:
-        fig, ax = get_base_ax(extent=extent, figsize=figsize, central_longitude=central_longitude)
+        fig, ax = get_base_ax(extent=extent, figsize=figsize, central_longitude=central_longitude, resolution=kwargs.get('coastline_resolution', 'auto'))
 
-    # Get coordinate arrays
+    # Get coordinate arrays (longitude converted from 0-360 to -180-180 if needed)
+    xarray_u = _mask_surface(normalize_longitude(xarray_u, dim_lon=dim_lon, central_longitude=central_longitude), dim_lat, dim_lon, **kwargs)
+    xarray_v = _mask_surface(normalize_longitude(xarray_v, dim_lon=dim_lon, central_longitude=central_longitude), dim_lat, dim_lon, **kwargs)
     lon_data = xarray_u[dim_lon].values
     lat_data = xarray_u[dim_lat].values
     u_data = xarray_u.values
     v_data = xarray_v.values
 
-    # Check and convert longitude dimension if needed (0-360 to -180-180)
-    if lon_data.max() > 180:
-        print("Converting longitude from 0-360 to -180-180 degrees...")
-        # Convert longitude values
-        lon_data = np.where(lon_data > 180, lon_data - 360, lon_data)
-        
-        # Sort indices for proper ordering
-        sort_idx = np.argsort(lon_data)
-        lon_data = lon_data[sort_idx]
-        u_data = u_data[:, sort_idx]
-        v_data = v_data[:, sort_idx]
-
     # Create coordinate grids
     lon_grid, lat_grid = np.meshgrid(lon_data, lat_data)
 
@@ -476,7 +666,7 @@ def plot_streamplot_from_xarray(xarray_u, xarray_v, dim_lat='latitude', dim_lon=
         # remove color from stream_kwargs to avoid conflict
         if 'color' in stream_kwargs:
             del stream_kwargs['color']
-        magnitude = np.sqrt(u_data**2 + v_data**2)
+        magnitude = wind_speed(u_data, v_data)
         stream = ax.streamplot(lon_grid, lat_grid, u_data, v_data,
                                color=magnitude, transform=ccrs.PlateCarree(), cmap=kwargs.get('stream_cmap', 'viridis'), **stream_kwargs)
         
@@ -489,9 +679,7 @@ def plot_streamplot_from_xarray(xarray_u, xarray_v, dim_lat='latitude', dim_lon=
 
     # Shapefiles if provided
     if shapefiles is not None:
-        for shapefile in shapefiles:
-            gdf = gpd.read_file(shapefile)
-            gdf.plot(ax=ax, facecolor='none', edgecolor='black', linewidths=1, alpha=0.5, transform=ccrs.PlateCarree())
+        add_shapefiles_to_plot(ax, shapefiles, extent=extent, **{k: v for k, v in kwargs.items() if k.startswith(('shapefile_', 'simplify_shapefiles', 'clip_'))})
 
     # Title
     ax.set_title(title, fontsize=title_size, loc=title_loc)
@@ -501,15 +689,16 @@ def plot_streamplot_from_xarray(xarray_u, xarray_v, dim_lat='latitude', dim_lon=
     if box_patches is not None:
         add_box_to_plot(ax, box_patches, **kwargs)
 
-    # Mask continets if requested
+    # Mask continets if requested (mask_method='data' already masked the field)
+    mask_feature = kwargs.get('mask_method', 'feature') == 'feature'
     mask_continents = kwargs.get('mask_continents', False)
-    if mask_continents:
-        ax.add_feature(cfeature.LAND, facecolor='lightgray', zorder=4)
+    if mask_continents and mask_feature:
+        add_natural_earth(ax, 'land', kwargs.get('coastline_resolution', 'auto'), extent=extent, facecolor='lightgray', edgecolor='none', zorder=4)
 
     # Mask oceans if requested
     mask_oceans = kwargs.get('mask_oceans', False)
-    if mask_oceans:
-        ax.add_feature(cfeature.OCEAN, facecolor=kwargs.get('mask_oceans_facecolor', 'lightgray'), zorder=4)
+    if mask_oceans and mask_feature:
+        add_natural_earth(ax, 'ocean', kwargs.get('coastline_resolution', 'auto'), extent=extent, facecolor=kwargs.get('mask_oceans_facecolor', 'lightgray'), edgecolor='none', zorder=4)
 
     # Add text annotations if provided
     texts = kwargs.get('texts', None)
@@ -533,14 +722,18 @@ def plot_multipletypes_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat=
     '''Plot multiple types of data (contourf, contour lines, wind vectors, streamlines) from an xarray Dataset'''
     
     from meteoplots.colorbar.colorbars import custom_colorbar
+    from meteoplots.utils.utils import normalize_longitude, normalize_extent, gaussian_smooth, smooth_contour_paths, place_contour_labels
+    from meteoplots.utils.derived import wind_speed
     from matplotlib.colors import BoundaryNorm
+    import cartopy.crs as ccrs
+    from meteoplots.utils.natural_earth import add_natural_earth
+    import matplotlib.pyplot as plt
     from mpl_toolkits.axes_grid1.inset_locator import inset_axes
-    import geopandas as gpd
     import numpy as np
     import os
 
     # Pre-extract common parameters to avoid repeated kwargs.get() calls
-    extent = kwargs.get('extent', [240, 360, -60, 20])
+    extent = kwargs.get('extent', [-120, 0, -60, 20])
     figsize = kwargs.get('figsize', (12, 12))
     central_longitude = kwargs.get('central_longitude', 0)
     title_size = kwargs.get('title_size', 16)
@@ -550,17 +743,16 @@ def plot_multipletypes_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat=
     normalize_colorbar = kwargs.get('normalize_colorbar', False)
     
     # Create figure and axis once
-    extent = tuple(extent)
+    extent = normalize_extent(extent, central_longitude)
     figsize = tuple(figsize)
-    fig, ax = get_base_ax(extent=extent, figsize=figsize, central_longitude=central_longitude)
-    
-    # Pre-load and cache shapefiles to avoid repeated file I/O
-    gdfs = []
-    if shapefiles is not None:
-        print('Loading shapefiles...')
-        for shapefile in shapefiles:
-            gdfs.append(gpd.read_file(shapefile))
+    fig, ax = kwargs.get('fig', None), kwargs.get('ax', None)
+    if fig is None or ax is None:
+        fig, ax = get_base_ax(extent=extent, figsize=figsize, central_longitude=central_longitude, resolution=kwargs.get('coastline_resolution', 'auto'))
     
+    # Normalize longitude (0-360 to -180-180) once for every layer (and mask land/ocean cells with mask_method='data')
+    xarray_data = {layer: _mask_surface(normalize_longitude(xarray_data[layer], dim_lon=dim_lon, central_longitude=central_longitude), dim_lat, dim_lon, **kwargs)
+                   for layer in ['contourf', 'contour', 'u_quiver', 'v_quiver'] if layer in xarray_data}
+
     # Pre-compute coordinate grids if any plotting will be done
     lon_data = None
     lat_data = None
@@ -585,15 +777,6 @@ def plot_multipletypes_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat=
         u_wind_data = u_data.values
         v_wind_data = v_data.values
         
-        # Check and convert longitude dimension if needed (0-360 to -180-180)
-        if wind_lon_data.max() > 180:
-            print("Converting longitude from 0-360 to -180-180 degrees for wind data...")
-            wind_lon_data = np.where(wind_lon_data > 180, wind_lon_data - 360, wind_lon_data)
-            sort_idx = np.argsort(wind_lon_data)
-            wind_lon_data = wind_lon_data[sort_idx]
-            u_wind_data = u_wind_data[:, sort_idx]
-            v_wind_data = v_wind_data[:, sort_idx]
-        
         wind_lon_grid, wind_lat_grid = np.meshgrid(wind_lon_data, wind_lat_data)
     
     if 'contourf' in plot_types or 'contour' in plot_types:
@@ -667,17 +850,26 @@ def plot_multipletypes_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat=
     if 'contour' in plot_types and 'contour' in xarray_data:
         print('Plotting contour...')
         
-        contour_levels = kwargs.get('contour_levels', [np.arange(np.nanmin(xarray_data['contour']), np.nanmax(xarray_data['contour']), 1)])
+        contour_data = gaussian_smooth(xarray_data['contour'], kwargs.get('smooth_sigma', None), dim_lat=dim_lat, dim_lon=dim_lon)
+        smooth_paths = kwargs.get('smooth_paths', 0)
+        label_method = kwargs.get('label_method', 'clabel')
+        label_spacing = kwargs.get('label_spacing', 250)
+        contour_levels = kwargs.get('contour_levels', [np.arange(np.nanmin(contour_data), np.nanmax(contour_data), 1)])
         colors_levels = kwargs.get('colors_levels', ['red'])
         styles_levels = kwargs.get('styles_levels', ['solid'])
 
-        # Plot all contour levels efficiently
-        for color, level, style in zip(colors_levels, contour_levels, styles_levels):
+        # Plot all contour levels in a single pass
+        levels, colors, styles, widths = _merge_contour_groups(contour_levels, colors_levels, styles_levels, kwargs.get('widths_levels', None))
 
-            cf = ax.contour(lon_grid, lat_grid, xarray_data['contour'], levels=level, 
-                          colors=color, linestyles=style, linewidths=1.5, 
+        if len(levels):
+            cf = ax.contour(lon_grid, lat_grid, contour_data, levels=levels, 
+                          colors=colors, linestyles=styles, linewidths=widths, 
                           transform=ccrs.PlateCarree(), transform_first=True)
-            plt.clabel(cf, inline=True, fmt='%.0f', fontsize=15, colors=color)
+            smooth_contour_paths(cf, smooth_paths)
+            if label_method == 'fast':
+                place_contour_labels(cf, fmt='%.0f', fontsize=15, colors=colors, spacing=label_spacing)
+            else:
+                plt.clabel(cf, inline=True, fmt='%.0f', fontsize=15, colors=colors)
 
     # Plot quiver (wind vectors)
     if 'quiver' in plot_types and 'u_quiver' in xarray_data and 'v_quiver' in xarray_data:
@@ -735,7 +927,7 @@ def plot_multipletypes_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat=
         # Create streamplot
         stream_color_by_magnitude = kwargs.get('stream_color_by_magnitude', False)
         if stream_color_by_magnitude:
-            magnitude = np.sqrt(u_stream_data**2 + v_stream_data**2)
+            magnitude = wind_speed(u_stream_data, v_stream_data)
             # For magnitude coloring, remove 'color' from streamplot_kwargs to avoid conflict
             streamplot_kwargs_mag = streamplot_kwargs.copy()
             if 'color' in streamplot_kwargs_mag:
@@ -756,12 +948,10 @@ def plot_multipletypes_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat=
                                   transform=ccrs.PlateCarree(),
                                   **streamplot_kwargs)
 
-    # Add shapefiles once at the end
-    if gdfs:
+    # Add shapefiles once at the end (read and simplified once per process, see add_shapefiles_to_plot)
+    if shapefiles is not None:
         print('Adding shapefiles...')
-        for gdf in gdfs:
-            gdf.plot(ax=ax, facecolor='none', edgecolor='black', linewidths=1, 
-                    alpha=0.5, transform=ccrs.PlateCarree())
+        add_shapefiles_to_plot(ax, shapefiles, extent=extent, **{k: v for k, v in kwargs.items() if k.startswith(('shapefile_', 'simplify_shapefiles', 'clip_'))})
 
     # Set title
     ax.set_title(title, fontsize=title_size, loc=title_loc)
@@ -771,15 +961,16 @@ def plot_multipletypes_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat=
     if box_patches is not None:
         add_box_to_plot(ax, box_patches, **kwargs)
 
-    # Mask continets if requested
+    # Mask continets if requested (mask_method='data' already masked the field)
+    mask_feature = kwargs.get('mask_method', 'feature') == 'feature'
     mask_continents = kwargs.get('mask_continents', False)
-    if mask_continents:
-        ax.add_feature(cfeature.LAND, facecolor='lightgray', zorder=4)
+    if mask_continents and mask_feature:
+        add_natural_earth(ax, 'land', kwargs.get('coastline_resolution', 'auto'), extent=extent, facecolor='lightgray', edgecolor='none', zorder=4)
 
     # Mask oceans if requested
     mask_oceans = kwargs.get('mask_oceans', False)
-    if mask_oceans:
-        ax.add_feature(cfeature.OCEAN, facecolor=kwargs.get('mask_oceans_facecolor', 'lightgray'), zorder=4)
+    if mask_oceans and mask_feature:
+        add_natural_earth(ax, 'ocean', kwargs.get('coastline_resolution', 'auto'), extent=extent, facecolor=kwargs.get('mask_oceans_facecolor', 'lightgray'), edgecolor='none', zorder=4)
 
     # Add text annotations if provided
     texts = kwargs.get('texts', None)
@@ -798,4 +989,429 @@ def plot_multipletypes_from_xarray(xarray_data, plot_var_colorbar=None, dim_lat=
         if not kwargs.get('keep_open', False):
             plt.close(fig)
     
-    return fig, ax
\ No newline at end of file
+    return fig, ax
+
+def plot_small_multiples_from_xarray(xarray_data, plot_var_colorbar=None, panel_dim=None, dim_lat='latitude', dim_lon='longitude', shapefiles=None, normalize_colorbar=False, **kwargs):
+
+    '''
+    Plot one filled contour panel per ensemble member/model in a single figure sharing the base map
+    (Natural Earth paths loaded once for every panel), palette and colorbar. Every panel is a
+    ContourSet; with n_workers > 1 the contours are generated in worker processes.
+    '''
+
+    from meteoplots.colorbar.colorbars import custom_colorbar
+    from meteoplots.utils.contours import FilledContourSet, _CONTOUR_GRID, _init_contour_worker, _filled_contour_paths
+    from meteoplots.utils.utils import normalize_longitude, normalize_extent
+    from matplotlib.colors import BoundaryNorm
+    import matplotlib as mpl
+    import cartopy.crs as ccrs
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import math
+    import os
+
+    # Default parameters
+    extent = kwargs.get('extent', [-80, -30, -35, 10])
+    central_longitude = kwargs.get('central_longitude', 0)
+    panel_size = kwargs.get('panel_size', (4, 4))
+    title_size = kwargs.get('title_size', 16)
+    title = kwargs.get('title', '')
+    panel_title_size = kwargs.get('panel_title_size', 10)
+    colorbar_position = kwargs.get('colorbar_position', 'horizontal')
+    label_colorbar = kwargs.get('label_colorbar', '')
+    path_save = kwargs.get('path_save', './tmp/plots')
+    output_filename = kwargs.get('output_filename', 'small_multiples.png')
+    n_workers = kwargs.get('n_workers', 1)
+
+    # Dimensão dos painéis (membro/modelo)
+    if panel_dim is None:
+        candidates = [dim for dim in ['member', 'model', 'number', 'ensemble'] if dim in xarray_data.dims]
+        if not candidates:
+            raise ValueError(f"Could not find the panel dimension in {xarray_data.dims}. Use panel_dim='...'")
+        panel_dim = candidates[0]
+
+    xarray_data = normalize_longitude(xarray_data.transpose(panel_dim, dim_lat, dim_lon), dim_lon=dim_lon, central_longitude=central_longitude)
+    n_panels = xarray_data.sizes[panel_dim]
+    panel_titles = kwargs.get('panel_titles', [str(value) for value in xarray_data[panel_dim].values])
+
+    # Colormap and levels (resolved once for every panel)
+    if plot_var_colorbar is None:
+        levels = kwargs.get('levels', None)
+        colors = kwargs.get('colors', None)
+        cmap = kwargs.get('cmap', None)
+        cbar_ticks = kwargs.get('cbar_ticks', None)
+
+        if levels is None or (colors is None and cmap is None):
+            raise ValueError(
+                "When plot_var_colorbar is None, you must provide either:\n"
+                "1. 'levels' and 'colors' parameters, or\n"
+                "2. 'levels' and 'cmap' parameters\n"
+                "Example: plot_small_multiples_from_xarray(data, levels=[0,5,10], colors=['blue','red'])\n"
+                "Or use: plot_small_multiples_from_xarray(data, plot_var_colorbar='tp')"
+            )
+    else:
+        levels, colors, cmap, cbar_ticks = custom_colorbar(variavel_plotagem=plot_var_colorbar)
+
+    if colors is not None and cmap is not None:
+        colors = None
+
+    norm = BoundaryNorm(levels, len(colors) if colors else len(levels)) if normalize_colorbar else None
+
+    # Grid of GeoAxes sharing the same base map
+    ncols = kwargs.get('ncols', math.ceil(math.sqrt(n_panels)))
+    nrows = kwargs.get('nrows', math.ceil(n_panels / ncols))
+    figsize = kwargs.get('figsize', (panel_size[0] * ncols, panel_size[1] * nrows))
+    extent = normalize_extent(extent, central_longitude)
+
+    fig, axs = plt.subplots(nrows=nrows, ncols=ncols, figsize=tuple(figsize), squeeze=False,
+                            subplot_kw={'projection': ccrs.PlateCarree(central_longitude=central_longitude)})
+    axs = axs.flatten()
+
+    for i, ax in enumerate(axs):
+        if i >= n_panels:
+            ax.set_visible(False)
+            continue
+        add_base_features(ax, extent, left_labels=(i % ncols == 0), bottom_labels=(i + ncols >= n_panels),
+                          resolution=kwargs.get('coastline_resolution', 'auto'), base_ax=axs[0] if i else None)
+
+    # Coordinates projected once for every panel (equivalent to transform_first=True)
+    lon, lat = np.meshgrid(xarray_data[dim_lon], xarray_data[dim_lat])
+    xy = axs[0].projection.transform_points(ccrs.PlateCarree(), lon, lat)
+    x, y = xy[..., 0], xy[..., 1]
+    values = xarray_data.values
+
+    # Camadas extend='both': abaixo do primeiro e acima do último nível, cobrindo todo o intervalo dos dados
+    bounds = np.asarray(levels, dtype=float)
+    data_min, data_max = np.nanmin(values), np.nanmax(values)
+    bounds = np.concatenate([[min(data_min, bounds[0]) - 1], bounds, [max(data_max, bounds[-1]) + 1]])
+    grid = (x, y, mpl.rcParams['contour.algorithm'], mpl.rcParams['contour.corner_mask'])
+
+    if n_panels > 1 and n_workers > 1:
+
+        # Contour generation of the panels in parallel processes
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_contour_worker, initargs=grid) as executor:
+            futures = [executor.submit(_filled_contour_paths, values[i], bounds[:-1], bounds[1:]) for i in range(n_panels)]
+            panel_layers = [future.result() for future in futures]
+
+    else:
+        _init_contour_worker(*grid)
+        panel_layers = [_filled_contour_paths(values[i], bounds[:-1], bounds[1:]) for i in range(n_panels)]
+        _CONTOUR_GRID.clear()
+
+    # Mesmo artista (ContourSet) em todos os painéis, seriais ou paralelos; o primeiro define a colorbar
+    contour_sets = [FilledContourSet(ax, x, y, levels, layers, filled=True, extend='both', colors=colors, cmap=cmap, norm=norm)
+                    for ax, layers in zip(axs, panel_layers)]
+    cf = contour_sets[0]
+
+    # Shapefiles if provided (read and simplified once, reused by every panel)
+    if shapefiles is not None:
+        for ax in axs[:n_panels]:
+            add_shapefiles_to_plot(ax, shapefiles, extent=extent, **{k: v for k, v in kwargs.items() if k.startswith(('shapefile_', 'simplify_shapefiles', 'clip_'))})
+
+    # Panel titles
+    for ax, panel_title in zip(axs[:n_panels], panel_titles):
+        ax.set_title(panel_title, fontsize=panel_title_size, loc='left')
+
+    # One colorbar for every panel
+    if colorbar_position == 'vertical':
+        cb = fig.colorbar(cf, ax=list(axs[:n_panels]), orientation='vertical', label=label_colorbar, ticks=levels,
+                          extendrect=True, fraction=0.02, pad=0.02)
+
+    elif colorbar_position == 'horizontal':
+        cb = fig.colorbar(cf, ax=list(axs[:n_panels]), orientation='horizontal', label=label_colorbar,
+                          ticks=levels if len(levels)<=26 else levels[::2], extendrect=True, fraction=0.03, pad=0.04)
+
+    if cbar_ticks is not None:
+        cb.set_ticks(cbar_ticks)
+
+    # Title
+    fig.suptitle(title, fontsize=title_size)
+
+    savefigure_kwargs = kwargs.get('savefigure', True)
+    if savefigure_kwargs:
+        os.makedirs(path_save, exist_ok=True)
+        fig.savefig(f'{path_save}/{output_filename}', bbox_inches='tight')
+        plt.close(fig)
+        print(f'✅ Plot saved as {path_save}/{output_filename}')
+
+    return fig, axs
+
+def plot_choropleth_from_geodataframe(geodataframe, plot_var_colorbar=None, column='valor', values=None, on='Nome_Bacia', values_on='basin', shapefiles=None, **kwargs):
+
+    from meteoplots.colorbar.colorbars import custom_colorbar, palette_norm
+    from meteoplots.utils.geometry import _simplified, _rows, _project_paths, simplify_tolerance
+    from meteoplots.utils.utils import normalize_extent
+    from matplotlib.collections import PathCollection
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.axes_grid1.inset_locator import inset_axes
+    import numpy as np
+    import pandas as pd
+    import os
+
+    '''
+    Choropleth map of polygons (GeoDataFrame or shapefile path) colored with a custom_colorbar palette,
+    e.g. 'chuva_ons_geodataframe'. `values` (DataFrame with values_on/column columns, such as the basin
+    means, a Series or a dict) is joined on the `on` column; without it the GeoDataFrame `column` is used.
+    Geometries are simplified to the display resolution (cached per source and tolerance) and all
+    polygons are drawn as one collection.
+    '''
+
+    # Default parameters
+    extent = kwargs.get('extent', [-80, -30, -35, 10])
+    figsize = kwargs.get('figsize', (12, 12))
+    central_longitude = kwargs.get('central_longitude', 0)
+    title_size = kwargs.get('title_size', 16)
+    title = kwargs.get('title', '')
+    title_loc = kwargs.get('title_loc', 'left')
+    colorbar_position = kwargs.get('colorbar_position', 'horizontal')
+    label_colorbar = kwargs.get('label_colorbar', '')
+    path_save = kwargs.get('path_save', './tmp/plots')
+    output_filename = kwargs.get('output_filename', 'choropleth_plot.png')
+
+    # Colormap and levels
+    if plot_var_colorbar is None:
+        levels, colors, cmap, cbar_ticks = kwargs.get('levels', None), kwargs.get('colors', None), kwargs.get('cmap', None), kwargs.get('cbar_ticks', None)
+        if levels is None or (colors is None and cmap is None):
+            raise ValueError("When plot_var_colorbar is None, you must provide 'levels' and 'colors' (or 'cmap')")
+    else:
+        levels, colors, cmap, cbar_ticks = custom_colorbar(variavel_plotagem=plot_var_colorbar)
+
+    # Create figure and axis
+    extent = normalize_extent(extent, central_longitude)
+    fig, ax = kwargs.get('fig', None), kwargs.get('ax', None)
+    if fig is None or ax is None:
+        fig, ax = get_base_ax(extent=extent, figsize=tuple(figsize), central_longitude=central_longitude, resolution=kwargs.get('coastline_resolution', 'auto'))
+
+    # Geometrias recortadas ao extent e simplificadas para ~meio pixel do mapa (cache por shapefile, tolerância e extent);
+    # os valores vêm do GeoDataFrame atual, pelas posições das linhas mantidas
+    tolerance = kwargs.get('simplify_tolerance', None)
+    if tolerance is None:
+        tolerance = simplify_tolerance(extent, fig.get_size_inches(), dpi=kwargs.get('dpi', fig.dpi))
+    entry = _simplified(geodataframe, tolerance, extent=extent if kwargs.get('clip_shapefiles', True) else None, margin=kwargs.get('clip_margin', 0.1))
+    gdf = _rows(geodataframe, entry)
+
+    # Valores unidos às geometrias pela coluna `on`
+    if values is None:
+        if column not in gdf:
+            raise ValueError(f"GeoDataFrame has no column '{column}': provide `values` or another `column`")
+        data = pd.to_numeric(gdf[column], errors='coerce').to_numpy(dtype=float)
+    else:
+        if isinstance(values, pd.DataFrame):
+            values = values.drop_duplicates(values_on).set_index(values_on)[column]
+        data = gdf[on].map(pd.Series(values)).to_numpy(dtype=float)
+
+    # Paleta discreta igual à do contourf; polígonos sem valor com missing_color
+    cmap, norm = palette_norm(levels, colors, cmap)
+    cmap = cmap.with_extremes(bad=kwargs.get('missing_color', 'lightgray'))
+
+    paths = _project_paths(*entry['arrays'], projection=getattr(ax, 'projection', None), geometries=entry['geometry'])
+    collection = PathCollection(paths, array=np.ma.masked_invalid(data), cmap=cmap, norm=norm, edgecolors=kwargs.get('edgecolor', 'black'),
+                                linewidths=kwargs.get('linewidth', 0.5), alpha=kwargs.get('alpha', None), transform=ax.transData, zorder=kwargs.get('zorder', 2))
+    ax.add_collection(collection, autolim=False)
+
+    # Colorbar
+    if colorbar_position == 'vertical':
+        axins = inset_axes(ax, width="3%", height="100%", loc='right', borderpad=-2.7)
+        cb = fig.colorbar(collection, cax=axins, orientation='vertical', label=label_colorbar, ticks=levels, extend='both', extendrect=True)
+
+    elif colorbar_position == 'horizontal':
+        axins = inset_axes(ax, width="95%", height="2%", loc='lower center', borderpad=-3.6)
+        cb = fig.colorbar(collection, cax=axins, orientation='horizontal', ticks=levels if len(levels)<=26 else levels[::2], extend='both', extendrect=True, label=label_colorbar)
+
+    if cbar_ticks is not None:
+        cb.set_ticks(cbar_ticks)
+
+    # Valores escritos dentro de cada polígono (ponto representativo: sempre interno)
+    if kwargs.get('add_values', False):
+        from meteoplots.utils.annotations import add_text_collection
+        import warnings
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            points = gdf.geometry.representative_point()
+            area = gdf.geometry.area.to_numpy()
+        valid = np.isfinite(data)
+        value_format = kwargs.get('value_format', '%.0f')
+        add_text_collection(ax, {'lon': points.x.to_numpy()[valid], 'lat': points.y.to_numpy()[valid], 'text': [value_format % value for value in data[valid]],
+                                 'priority': area[valid]}, extent=extent, text_fontsize=kwargs.get('values_fontsize', 13), text_fontweight='bold',
+                            text_declutter=kwargs.get('declutter_labels', False))
+
+    # Shapefiles if provided
+    if shapefiles is not None:
+        add_shapefiles_to_plot(ax, shapefiles, extent=extent, **{k: v for k, v in kwargs.items() if k.startswith(('shapefile_', 'simplify_shapefiles', 'clip_'))})
+
+    # Title
+    ax.set_title(title, fontsize=title_size, loc=title_loc)
+
+    # Add box if extent_box is provided
+    box_patches = kwargs.get('box_patches', None)
+    if box_patches is not None:
+        add_box_to_plot(ax, box_patches, **kwargs)
+
+    # Add text annotations if provided
+    texts = kwargs.get('texts', None)
+    if texts is not None:
+        add_text_annotations(ax, texts, **{k: v for k, v in kwargs.items() if k.startswith('text_')})
+
+    savefigure_kwargs = kwargs.get('savefigure', True)
+    if savefigure_kwargs:
+        os.makedirs(path_save, exist_ok=True)
+        plt.savefig(f'{path_save}/{output_filename}', bbox_inches='tight')
+        plt.close(fig)
+        print(f'✅ Plot saved as {path_save}/{output_filename}')
+
+    return fig, ax
+
+def plot_stations(data, plot_var_colorbar=None, value_column='valor', interpolation=None, **kwargs):
+
+    '''
+    Plot station/point data as scatter symbols colored with the custom_colorbar palette. With
+    interpolation='idw' or 'linear' the stations are first gridded (stations_to_grid) and drawn with
+    plot_contourf_from_xarray, with the stations on top unless show_stations=False.
+    '''
+
+    from meteoplots.colorbar.colorbars import custom_colorbar, palette_norm
+    from meteoplots.utils.stations import _station_arrays, stations_to_grid
+    from meteoplots.utils.utils import normalize_extent
+    from mpl_toolkits.axes_grid1.inset_locator import inset_axes
+    import cartopy.crs as ccrs
+    import matplotlib.pyplot as plt
+    import os
+
+    # Default parameters
+    extent = kwargs.get('extent', [-80, -30, -35, 10])
+    figsize = kwargs.get('figsize', (12, 12))
+    central_longitude = kwargs.get('central_longitude', 0)
+    title_size = kwargs.get('title_size', 16)
+    title = kwargs.get('title', '')
+    title_loc = kwargs.get('title_loc', 'left')
+    colorbar_position = kwargs.get('colorbar_position', 'horizontal')
+    label_colorbar = kwargs.get('label_colorbar', '')
+    path_save = kwargs.get('path_save', './tmp/plots')
+    output_filename = kwargs.get('output_filename', 'stations_plot.png')
+    marker = kwargs.get('marker', 'o')
+    marker_size = kwargs.get('marker_size', 30)
+
+    if plot_var_colorbar is None:
+        levels, colors, cmap = kwargs.get('levels', None), kwargs.get('colors', None), kwargs.get('cmap', None)
+        if levels is None or (colors is None and cmap is None):
+            raise ValueError("When plot_var_colorbar is None, you must provide 'levels' and 'colors' (or 'cmap')")
+        cbar_ticks = None
+    else:
+        levels, colors, cmap, cbar_ticks = custom_colorbar(variavel_plotagem=plot_var_colorbar)
+
+    extent = normalize_extent(extent, central_longitude)
+    lon, lat, values = _station_arrays(data, value_column)
+
+    # Estações interpoladas para a grade e plotadas com o contourf padrão
+    if interpolation is not None:
+        field = stations_to_grid(data, value_column=value_column, method=interpolation, resolution=kwargs.get('resolution', 0.1),
+                                 extent=kwargs.get('interpolation_extent', extent), **{key: kwargs[key] for key in ['power', 'k', 'max_distance'] if key in kwargs})
+        contourf_kwargs = {key: value for key, value in kwargs.items() if key not in ['savefigure', 'levels', 'colors', 'cmap']}
+        if plot_var_colorbar is None:
+            contourf_kwargs.update(levels=levels, colors=colors, cmap=cmap)
+        fig, ax = plot_contourf_from_xarray(field, plot_var_colorbar=plot_var_colorbar, savefigure=False, **contourf_kwargs)
+        show_colorbar = False
+    else:
+        fig, ax = kwargs.get('fig', None), kwargs.get('ax', None)
+        if fig is None or ax is None:
+            fig, ax = get_base_ax(extent=extent, figsize=tuple(figsize), central_longitude=central_longitude, resolution=kwargs.get('coastline_resolution', 'auto'))
+        ax.set_title(title, fontsize=title_size, loc=title_loc)
+        show_colorbar = True
+
+    # Paleta discreta igual à do contourf (primeira/última cor para valores abaixo/acima dos níveis)
+    cmap, norm = palette_norm(levels, colors, cmap)
+
+    if interpolation is None or kwargs.get('show_stations', True):
+        sc = ax.scatter(lon, lat, c=values, cmap=cmap, norm=norm, s=marker_size, marker=marker, edgecolors=kwargs.get('marker_edgecolor', 'black'),
+                        linewidths=kwargs.get('marker_linewidth', 0.3), transform=ccrs.PlateCarree(), zorder=kwargs.get('marker_zorder', 5))
+
+        if show_colorbar:
+            if colorbar_position == 'vertical':
+                axins = inset_axes(ax, width="3%", height="100%", loc='right', borderpad=-2.7)
+                cb = fig.colorbar(sc, cax=axins, orientation='vertical', label=label_colorbar, ticks=levels, extend='both', extendrect=True)
+            else:
+                axins = inset_axes(ax, width="95%", height="2%", loc='lower center', borderpad=-3.6)
+                cb = fig.colorbar(sc, cax=axins, orientation='horizontal', ticks=levels if len(levels)<=26 else levels[::2], extend='both', extendrect=True, label=label_colorbar)
+            if cbar_ticks is not None:
+                cb.set_ticks(cbar_ticks)
+
+    # Add text annotations if provided (plot_contourf_from_xarray already adds them when interpolating)
+    texts = kwargs.get('texts', None)
+    if texts is not None and interpolation is None:
+        add_text_annotations(ax, texts, **{k: v for k, v in kwargs.items() if k.startswith('text_')})
+
+    savefigure_kwargs = kwargs.get('savefigure', True)
+    if savefigure_kwargs:
+        os.makedirs(path_save, exist_ok=True)
+        plt.savefig(f'{path_save}/{output_filename}', bbox_inches='tight')
+        plt.close(fig)
+        print(f'✅ Plot saved as {path_save}/{output_filename}')
+
+    return fig, ax
+
+def plot_ensemble_statistic(stats, statistic='probability', threshold=None, q=None, climatology=None, plot_var_colorbar=None, **kwargs):
+
+    '''Plot one ensemble statistic with plot_contourf_from_xarray using the matching custom_colorbar palette'''
+
+    from meteoplots.utils.ensemble import STATISTIC_PALETTES
+
+    if statistic == 'probability':
+        field = stats.probability(threshold)
+    elif statistic == 'std':
+        field = stats.std()
+    elif statistic == 'mean':
+        field = stats.mean()
+    elif statistic == 'percentile':
+        field = stats.percentile(q)
+    elif statistic == 'pct_climatology':
+        field = stats.pct_climatology(climatology)
+    else:
+        raise ValueError(f"Statistic {statistic} not supported. Options: probability, std, mean, percentile, pct_climatology")
+
+    if plot_var_colorbar is None:
+        plot_var_colorbar = STATISTIC_PALETTES.get(statistic)
+
+    if plot_var_colorbar is None and 'levels' not in kwargs:
+        raise ValueError(f"Statistic {statistic} has no default palette: provide plot_var_colorbar (e.g. 'tp') or levels/colors")
+
+    return plot_contourf_from_xarray(field, plot_var_colorbar=plot_var_colorbar, **kwargs)
+
+def plot_accumulated_lead_times(xarray_data, plot_var_colorbar='acumulado_total', dim_time='time', **kwargs):
+
+    '''
+    Render one accumulated map per lead time (day 1, day 1-2, ..., day 1-N) with plot_contourf_from_xarray,
+    consuming iter_accumulated as it goes. `title` and `output_filename` may use the placeholders
+    {step}, {start} and {end}. Each map is saved and closed before the next lead time, so only one
+    figure is alive at a time; returns the list of saved paths. To keep the figures, iterate
+    iter_accumulated and call plot_contourf_from_xarray with savefigure=False.
+    '''
+
+    from meteoplots.utils.accumulation import iter_accumulated
+    import pandas as pd
+
+    if not kwargs.pop('savefigure', True):
+        raise ValueError('plot_accumulated_lead_times saves and closes every map: to keep the figures, iterate iter_accumulated '
+                         'and call plot_contourf_from_xarray(savefigure=False)')
+
+    title = kwargs.pop('title', '')
+    output_filename = kwargs.pop('output_filename', 'accumulated_{step:02d}.png')
+    path_save = kwargs.get('path_save', './tmp/plots')
+
+    start = xarray_data[dim_time].values[0]
+    start = pd.Timestamp(start) if xarray_data[dim_time].dtype.kind == 'M' else start
+
+    paths = []
+    for label, field in iter_accumulated(xarray_data, dim_time=dim_time):
+
+        end = pd.Timestamp(label) if xarray_data[dim_time].dtype.kind == 'M' else label
+        names = {'step': field.attrs['accumulation_steps'], 'start': start, 'end': end}
+
+        # plot_contourf_from_xarray salva e fecha a figura
+        plot_contourf_from_xarray(field, plot_var_colorbar=plot_var_colorbar, title=title.format(**names),
+                                  output_filename=output_filename.format(**names), savefigure=True, **kwargs)
+        paths.append(f'{path_save}/{output_filename.format(**names)}')
+
+    return paths
@@ -0,0 +1,322 @@
+
+from meteoplots.utils.utils import LRUCache
+
+# Climatologias já carregadas neste processo: (caminho absoluto, data de modificação, variável) -> Climatology.
+# Limitado: cada uma mantém o memory-map e os campos interpolados por grade
+_CLIMATOLOGIES = LRUCache(maxsize=8)
+
+# Nomes aceitos para a dimensão do período da climatologia
+PERIOD_DIMS = ['dayofyear', 'month', 'time']
+
+class CumulativeSum:
+
+    '''
+    Cumulative sum along the time dimension, computed once, so the accumulation of any
+    window is the difference of two slices (O(one field) per window, whatever its length).
+
+    >>> cumsum = CumulativeSum(tp_diario, dim_time='time')
+    >>> cumsum.window(0, 5)        # acumulado dos 5 primeiros dias
+    >>> cumsum.rolling(7)          # todos os acumulados móveis de 7 dias
+    '''
+
+    def __init__(self, xarray_data, dim_time='time'):
+
+        import numpy as np
+
+        data = xarray_data.transpose(dim_time, ...)
+        values = np.asarray(data.values, dtype=float)
+
+        self.dim_time = dim_time
+        self.times = data[dim_time].values
+        self._template = data.isel({dim_time: 0}, drop=True)
+
+        # NaN contaminaria todas as somas seguintes: zera os faltantes e acumula a contagem deles separadamente
+        missing = np.isnan(values)
+        if missing.any():
+            values = np.nan_to_num(values)
+            self._missing = np.zeros((values.shape[0] + 1,) + values.shape[1:], dtype=np.int32)
+            np.cumsum(missing, axis=0, out=self._missing[1:])
+        else:
+            self._missing = None
+
+        # Linha 0 com zeros: a soma de [start, end) é cumsum[end] - cumsum[start]
+        self._cumsum = np.zeros((values.shape[0] + 1,) + values.shape[1:])
+        np.cumsum(values, axis=0, out=self._cumsum[1:])
+
+    def __len__(self):
+        return len(self.times)
+
+    def _position(self, label):
+
+        import numpy as np
+
+        if isinstance(label, (int, np.integer)):
+            return int(label)
+
+        return int(np.searchsorted(self.times, np.asarray(label, dtype=self.times.dtype)))
+
+    def window(self, start, end):
+
+        '''
+        Accumulation over the steps [start, end). start/end are integer positions or
+        time labels (the step at label `end` is not included, as in python slices).
+        '''
+
+        import numpy as np
+        import xarray as xr
+
+        start, end = self._position(start), self._position(end)
+        if not 0 <= start <= end <= len(self):
+            raise ValueError(f'Invalid window [{start}, {end}) for {len(self)} time steps')
+
+        values = self._cumsum[end] - self._cumsum[start]
+        if self._missing is not None:
+            values[(self._missing[end] - self._missing[start]) > 0] = np.nan
+
+        accumulated = xr.DataArray(values, coords=self._template.coords, dims=self._template.dims, attrs=self._template.attrs)
+        accumulated.attrs['accumulation_steps'] = end - start
+
+        return accumulated
+
+    def rolling(self, size):
+
+        '''All moving-window accumulations of `size` steps, labelled by the last step of each window'''
+
+        import numpy as np
+        import xarray as xr
+
+        if not 0 < size <= len(self):
+            raise ValueError(f'Window size {size} must be between 1 and {len(self)}')
+
+        values = self._cumsum[size:] - self._cumsum[:-size]
+        if self._missing is not None:
+            values[(self._missing[size:] - self._missing[:-size]) > 0] = np.nan
+
+        coords = dict(self._template.coords)
+        coords[self.dim_time] = self.times[size - 1:]
+
+        return xr.DataArray(values, coords=coords, dims=(self.dim_time,) + self._template.dims, attrs=self._template.attrs)
+
+def _nearest_index(source, target):
+
+    '''Index of the nearest value of `source` (any order) for each value of `target`'''
+
+    import numpy as np
+
+    order = np.argsort(source)
+    ordered = source[order]
+
+    if len(ordered) == 1:
+        return np.zeros(len(target), dtype=int)
+
+    position = np.clip(np.searchsorted(ordered, target), 1, len(ordered) - 1)
+    position -= (target - ordered[position - 1]) < (ordered[position] - target)
+
+    return order[position]
+
+class Climatology:
+
+    '''
+    Climatology (daily by `dayofyear`, monthly by `month`) read once and kept as an
+    uncompressed .npy memory-mapped from the meteoplots cache directory, so only the
+    periods actually used are paged in. Fields regridded to a target grid are cached
+    per (grid, period).
+    '''
+
+    def __init__(self, source, variable=None, dim_lat='latitude', dim_lon='longitude', cache_dir=None, max_cached_fields=64):
+
+        import xarray as xr
+
+        self.max_cached_fields = max_cached_fields
+        self._fields = {}
+
+        if isinstance(source, xr.DataArray):
+            self._set_data(source, dim_lat, dim_lon)
+        else:
+            self._load(source, variable, dim_lat, dim_lon, cache_dir)
+
+    def _set_data(self, data, dim_lat, dim_lon):
+
+        import numpy as np
+
+        dim_period = next((dim for dim in PERIOD_DIMS if dim in data.dims), None)
+        if dim_period is None:
+            raise ValueError(f'Climatology must have one of the dimensions {PERIOD_DIMS}, got {data.dims}')
+
+        data = data.transpose(dim_period, dim_lat, dim_lon)
+        periods = data[dim_period]
+
+        # Climatologia com datas (ex.: ano 2000 diário): converte para dia do ano
+        if dim_period == 'time':
+            dim_period = 'dayofyear' if len(periods) > 12 else 'month'
+            periods = getattr(periods.dt, dim_period)
+
+        self.dim_period = dim_period
+        self.periods = np.asarray(periods.values)
+        self.lat = np.asarray(data[dim_lat].values, dtype=float)
+        self.lon = np.asarray(data[dim_lon].values, dtype=float)
+        self.values = np.asarray(data.values)
+
+    def _load(self, path, variable, dim_lat, dim_lon, cache_dir):
+
+        import hashlib
+        import os
+        import numpy as np
+        import xarray as xr
+        from meteoplots.utils.utils import get_cache_dir
+
+        path = os.path.abspath(path)
+        key = hashlib.sha1(f'{path}|{os.path.getmtime(path)}|{variable}'.encode()).hexdigest()
+        cache_dir = cache_dir or get_cache_dir('climatology')
+        values_file = os.path.join(cache_dir, f'{key}.npy')
+        coords_file = os.path.join(cache_dir, f'{key}.npz')
+
+        if not (os.path.exists(values_file) and os.path.exists(coords_file)):
+
+            with xr.open_dataset(path) as ds:
+                data = ds[variable] if variable is not None else ds[list(ds.data_vars)[0]]
+                self._set_data(data.load(), dim_lat, dim_lon)
+
+            # Escrita atômica: arquivo temporário + rename
+            for target, write in [(values_file, lambda f: np.save(f, self.values)),
+                                  (coords_file, lambda f: np.savez(f, periods=self.periods, lat=self.lat, lon=self.lon, dim_period=self.dim_period))]:
+                tmp = f'{target}.{os.getpid()}.tmp'
+                with open(tmp, 'wb') as f:
+                    write(f)
+                os.replace(tmp, target)
+
+        with np.load(coords_file) as coords:
+            self.periods, self.lat, self.lon = coords['periods'], coords['lat'], coords['lon']
+            self.dim_period = str(coords['dim_period'])
+
+        self.values = np.load(values_file, mmap_mode='r')
+
+    def period_of(self, times):
+
+        '''Climatology period (day of year or month) of each time'''
+
+        import pandas as pd
+
+        return getattr(pd.DatetimeIndex(times), self.dim_period).values
+
+    def field(self, period, lat, lon):
+
+        '''Climatology of one period on the target grid (nearest neighbour), cached per (grid, period)'''
+
+        import numpy as np
+
+        lat, lon = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float)
+        key = (hash(lat.tobytes()), hash(lon.tobytes()), int(period))
+
+        if key not in self._fields:
+
+            # Períodos ausentes (ex.: 29/02 numa climatologia de 365 dias) usam o mais próximo
+            index_period = _nearest_index(self.periods, np.array([period]))[0]
+
+            # Grade alvo em -180-180 com climatologia em 0-360 (ou o inverso)
+            if self.lon.max() > 180:
+                lon = lon % 360
+            else:
+                lon = np.where(lon > 180, lon - 360, lon)
+
+            index_lat, index_lon = _nearest_index(self.lat, lat), _nearest_index(self.lon, lon)
+            field = np.asarray(self.values[index_period])[np.ix_(index_lat, index_lon)]
+
+            if len(self._fields) >= self.max_cached_fields:
+                self._fields.pop(next(iter(self._fields)))
+            self._fields[key] = field
+
+        return self._fields[key]
+
+    def for_times(self, times, lat, lon, how='sum'):
+
+        '''Climatology accumulated (how='sum') or averaged (how='mean') over the periods of the given times'''
+
+        import numpy as np
+
+        periods = self.period_of(np.atleast_1d(times))
+        total = np.zeros((len(lat), len(lon)))
+        for period in periods:
+            total += self.field(period, lat, lon)
+
+        return total / len(periods) if how == 'mean' else total
+
+def load_climatology(path, variable=None, **kwargs):
+
+    '''Load a climatology file once per process and modification time (later calls return the same memory-mapped Climatology)'''
+
+    import os
+
+    path = os.path.abspath(path)
+    key = (path, os.path.getmtime(path), variable)
+    if key not in _CLIMATOLOGIES:
+        _CLIMATOLOGIES[key] = Climatology(path, variable=variable, **kwargs)
+
+    return _CLIMATOLOGIES[key]
+
+def compute_anomaly(xarray_data, climatology, dim_time='time', dim_lat='latitude', dim_lon='longitude', how=None, variable=None):
+
+    '''
+    Anomaly of a field against a climatology (path, DataArray or Climatology).
+
+    how=None: anomaly of each time step; how='sum': accumulation over the time
+    dimension minus the accumulated climatology (precipitation, tp_anomalia);
+    how='mean': mean over time minus the mean climatology (temperature, geopotential, SST).
+    Data without a time dimension needs a `time` coordinate to select the climatology.
+    '''
+
+    import numpy as np
+    import xarray as xr
+
+    if not isinstance(climatology, Climatology):
+        climatology = Climatology(climatology) if isinstance(climatology, xr.DataArray) else load_climatology(climatology, variable=variable)
+
+    lat, lon = xarray_data[dim_lat].values, xarray_data[dim_lon].values
+    times = np.atleast_1d(xarray_data[dim_time].values)
+
+    if dim_time not in xarray_data.dims:
+        field = xarray_data.transpose(dim_lat, dim_lon)
+        return field - climatology.for_times(times, lat, lon, how='mean')
+
+    if how is None:
+        data = xarray_data.transpose(dim_time, dim_lat, dim_lon)
+        clim = np.stack([climatology.field(period, lat, lon) for period in climatology.period_of(times)])
+        return data - clim
+
+    if how == 'sum':
+        field = CumulativeSum(xarray_data, dim_time=dim_time).window(0, len(times))
+    elif how == 'mean':
+        field = xarray_data.mean(dim_time, keep_attrs=True)
+    else:
+        raise ValueError(f"how must be None, 'sum' or 'mean', got {how}")
+
+    anomaly = field.transpose(dim_lat, dim_lon) - climatology.for_times(times, lat, lon, how=how)
+    anomaly.attrs = dict(field.attrs, period_start=str(times[0]), period_end=str(times[-1]))
+
+    return anomaly
+
+def iter_accumulated(xarray_data, dim_time='time', copy=False):
+
+    '''
+    Walk the lead times yielding (time label, accumulated field since the first step).
+
+    Only one lead time is read per step (lazy/dask data stays lazy) and the running total
+    is updated in place, so compute and memory are O(one field) per map. The yielded
+    DataArray shares the running buffer: render or copy it before advancing (or use copy=True).
+    '''
+
+    import numpy as np
+    import xarray as xr
+
+    template = xarray_data.isel({dim_time: 0}, drop=True)
+    running = np.zeros(template.shape)
+    accumulated = xr.DataArray(running, coords=template.coords, dims=template.dims, attrs=template.attrs)
+
+    for i, label in enumerate(xarray_data[dim_time].values):
+
+        np.add(running, np.asarray(xarray_data.isel({dim_time: i}).values, dtype=float), out=running)
+
+        field = accumulated.assign_coords({dim_time: label})
+        field.attrs['accumulation_steps'] = i + 1
+
+        yield label, field.copy() if copy else field
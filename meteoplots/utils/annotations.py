@@ -0,0 +1,299 @@
+
+from matplotlib.collections import PathCollection
+from meteoplots.utils.utils import LRUCache
+
+# Colunas aceitas para as coordenadas, na ordem de preferência (mesmos nomes de add_text_annotations)
+COORDINATE_COLUMNS = [('x', 'y'), ('lon', 'lat'), ('longitude', 'latitude')]
+
+# Estilos que podem variar por rótulo (demais opções valem para todos)
+PER_LABEL_STYLES = ['color', 'fontsize', 'fontweight', 'alpha', 'rotation']
+
+# Contornos dos textos já convertidos em Path, por (texto, tamanho, peso, ha, va).
+# Limitado: valores de estações mudam a cada rodada e o processo (meteoplots render) pode durar muito
+_TEXT_PATHS = LRUCache(maxsize=4096)
+
+def _text_path(text, fontsize, fontweight, ha, va):
+
+    '''Outline of a string (in points, aligned on the anchor by ha/va), cached per string and style'''
+
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.path import Path
+    from matplotlib.textpath import TextPath
+
+    key = (text, float(fontsize), str(fontweight), ha, va)
+    if key not in _TEXT_PATHS:
+        path = TextPath((0, 0), text, size=fontsize, prop=FontProperties(weight=fontweight), usetex=False)
+        # Caixa dos pontos de controle: um pouco maior que a das curvas, mas sem percorrer cada Bézier
+        (x0, y0), (x1, y1) = (path.vertices.min(axis=0), path.vertices.max(axis=0)) if len(path.vertices) else ((0, 0), (0, 0))
+        dx = {'left': -x0, 'center': -(x0 + x1) / 2, 'right': -x1}[ha]
+        dy = {'bottom': -y0, 'baseline': 0, 'center': -(y0 + y1) / 2, 'top': -y1}[va]
+        _TEXT_PATHS[key] = Path(path.vertices + [dx, dy], path.codes)
+
+    return _TEXT_PATHS[key]
+
+def select_non_overlapping(boxes, priority=None, padding=0):
+
+    '''
+    Greedy overlap removal: boxes (N, 4) as x0, y0, x1, y1 in pixels are visited by decreasing
+    priority (input order when None) and kept when they do not overlap an already kept box.
+    Kept boxes are indexed in a uniform grid (cell = median box size), so each test only looks at
+    the neighbours in the cells a box covers: near-linear in the number of labels. Returns a bool mask.
+    '''
+
+    import numpy as np
+
+    boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+    keep = np.zeros(len(boxes), dtype=bool)
+    if len(boxes) == 0:
+        return keep
+
+    boxes = boxes + np.array([-padding, -padding, padding, padding])
+    order = np.arange(len(boxes)) if priority is None else np.argsort(-np.asarray(priority, dtype=float), kind='stable')
+    valid = np.isfinite(boxes).all(axis=1)
+
+    sizes = np.concatenate([boxes[valid, 2] - boxes[valid, 0], boxes[valid, 3] - boxes[valid, 1]])
+    cell = max(float(np.median(sizes)) if len(sizes) else 1.0, 1.0)
+    first = np.floor(np.where(valid[:, None], boxes[:, :2], 0) / cell).astype(int)
+    last = np.floor(np.where(valid[:, None], boxes[:, 2:], 0) / cell).astype(int)
+
+    grid = {}
+    for k in order:
+        if not valid[k]:
+            continue
+
+        cells = [(i, j) for i in range(first[k, 0], last[k, 0] + 1) for j in range(first[k, 1], last[k, 1] + 1)]
+        x0, y0, x1, y1 = boxes[k]
+        overlaps = False
+        for c in cells:
+            for m in grid.get(c, ()):
+                if x0 < boxes[m, 2] and boxes[m, 0] < x1 and y0 < boxes[m, 3] and boxes[m, 1] < y1:
+                    overlaps = True
+                    break
+            if overlaps:
+                break
+
+        if not overlaps:
+            keep[k] = True
+            for c in cells:
+                grid.setdefault(c, []).append(k)
+
+    return keep
+
+def declutter_texts(texts, priority=None, padding=2):
+
+    '''
+    Hide the Text artists that overlap a higher-priority one (see select_non_overlapping). The
+    bounding boxes are measured once with the figure renderer. Returns the mask of kept texts.
+    '''
+
+    import numpy as np
+
+    texts = list(texts)
+    if not texts:
+        return np.zeros(0, dtype=bool)
+
+    renderer = texts[0].figure.canvas.get_renderer()
+    boxes = np.array([text.get_window_extent(renderer).extents for text in texts])
+    keep = select_non_overlapping(boxes, priority=priority, padding=padding)
+
+    for text, visible in zip(texts, keep):
+        text.set_visible(bool(visible))
+
+    return keep
+
+def _rgba(color, alpha=None):
+
+    '''RGBA array (N, 4) of a color name, per-label colors (names, RGB(A) tuples, N x 3/4 array) and optional per-label alpha'''
+
+    import numpy as np
+    import matplotlib.colors as mcolors
+
+    # Coluna de tuplas (array de objetos) -> lista de cores
+    if isinstance(color, np.ndarray) and color.dtype == object:
+        color = list(color)
+
+    return mcolors.to_rgba_array(color, alpha)
+
+class TextCollection(PathCollection):
+
+    '''
+    Many text labels drawn as a single collection: each distinct string/style is converted once to an
+    outline Path (cached) and all labels are drawn in one draw_path_collection call, with the label
+    positions as offsets transformed to display coordinates in one vectorized call.
+    With declutter=True, overlapping labels are removed at draw time by priority.
+    '''
+
+    def __init__(self, x, y, texts, fontsize=12, fontweight='normal', color='black', rotation=0, ha='center', va='center',
+                 declutter=False, priority=None, padding=2, **kwargs):
+
+        import numpy as np
+        from matplotlib.transforms import Affine2D
+
+        texts = [str(text) for text in texts]
+        n = len(texts)
+        fontsize = np.broadcast_to(fontsize, n)
+        fontweight = np.broadcast_to(np.asarray(fontweight, dtype=object), n)
+        rotation = np.broadcast_to(np.asarray(rotation, dtype=float), n)
+
+        paths = []
+        for text, size, weight, angle in zip(texts, fontsize, fontweight, rotation):
+            path = _text_path(text, size, weight, ha, va)
+            paths.append(path.transformed(Affine2D().rotate_deg(angle)) if angle else path)
+
+        self.texts = texts
+        self.label_paths = paths
+        self.label_offsets = np.column_stack([np.asarray(x, dtype=float), np.asarray(y, dtype=float)]).reshape(-1, 2)
+        # Cores RGBA (N, 4) normalizadas uma vez: um nome, uma cor por rótulo, tuplas RGB(A) ou array N x 4
+        colors = _rgba(color)
+        self.label_colors = np.broadcast_to(colors, (n, 4)).copy() if len(colors) == 1 else colors
+        self._label_extents = None
+        self.declutter = declutter
+        self.priority = priority
+        self.padding = padding
+
+        kwargs.setdefault('zorder', 3)
+        super().__init__(paths, offsets=self.label_offsets, facecolors=self.label_colors, edgecolors='none', linewidths=0, **kwargs)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def set_figure(self, fig):
+
+        from matplotlib.transforms import Affine2D
+
+        super().set_figure(fig)
+
+        # Contornos em pontos -> pixels (acompanha o dpi do savefig)
+        if fig is not None:
+            self.set_transform(Affine2D().scale(1 / 72) + fig.dpi_scale_trans)
+
+    def get_display_offsets(self):
+
+        '''Positions of all labels in display coordinates (one transform call)'''
+
+        return self.get_offset_transform().transform(self.label_offsets)
+
+    def get_label_boxes(self):
+
+        '''Bounding boxes (N, 4) of all labels in display coordinates'''
+
+        import numpy as np
+
+        # Extensões (em pontos) medidas uma vez, só quando necessárias
+        if self._label_extents is None:
+            self._label_extents = np.array([np.concatenate([path.vertices.min(axis=0), path.vertices.max(axis=0)]) if len(path.vertices) else [0, 0, 0, 0]
+                                            for path in self.label_paths]).reshape(-1, 4)
+
+        scale = self.figure.dpi / 72 if self.figure is not None else 1
+        return np.tile(self.get_display_offsets(), 2) + self._label_extents * scale
+
+    def draw(self, renderer):
+
+        import numpy as np
+
+        if self.declutter and len(self):
+            # Só os rótulos dentro dos eixos disputam espaço
+            boxes = self.get_label_boxes()
+            x_min, y_min, x_max, y_max = self.axes.bbox.extents if self.axes is not None else self.figure.bbox.extents
+            inside = (boxes[:, 2] >= x_min) & (boxes[:, 0] <= x_max) & (boxes[:, 3] >= y_min) & (boxes[:, 1] <= y_max)
+            boxes[~inside] = np.nan
+            self.set_visible_labels(select_non_overlapping(boxes, priority=self.priority, padding=self.padding))
+
+        super().draw(renderer)
+
+    def set_visible_labels(self, mask):
+
+        '''Keep only the labels where mask is True (e.g. after collision removal)'''
+
+        import numpy as np
+
+        mask = np.asarray(mask, dtype=bool)
+        self.set_paths([path for path, keep in zip(self.label_paths, mask) if keep])
+        self.set_offsets(self.label_offsets[mask])
+        if len(self.label_colors) == len(mask):
+            self.set_facecolors(self.label_colors[mask])
+        self.stale = True
+
+def _columns(data):
+
+    '''Columnar input (DataFrame or dict of arrays) as a dict of numpy arrays'''
+
+    import numpy as np
+
+    if hasattr(data, 'columns'):
+        return {column: data[column].to_numpy() for column in data.columns}
+
+    return {key: np.asarray(value) if not np.isscalar(value) else value for key, value in data.items()}
+
+def add_text_collection(ax, texts, extent=None, **text_kwargs):
+
+    '''
+    Add many text labels at once from columnar data: a DataFrame or dict of arrays with x/y, lon/lat
+    or longitude/latitude, text and optional per-label color, fontsize, fontweight, alpha, rotation and
+    priority. Coordinates are projected in one vectorized call and labels outside `extent` are dropped;
+    text_declutter=True removes overlapping labels at draw time (higher priority first).
+    Default styles use the same text_* kwargs as add_text_annotations (text boxes are not supported
+    in bulk). Returns the TextCollection.
+    '''
+
+    import numpy as np
+
+    columns = _columns(texts)
+
+    for x_name, y_name in COORDINATE_COLUMNS:
+        if x_name in columns and y_name in columns:
+            break
+    else:
+        raise ValueError('texts must have x/y, lon/lat or longitude/latitude columns')
+
+    if 'text' not in columns:
+        raise ValueError("texts must have a 'text' column")
+
+    lon = np.asarray(columns[x_name], dtype=float)
+    lat = np.asarray(columns[y_name], dtype=float)
+    labels = np.asarray(columns['text']).astype(str)
+
+    if 'weight' in columns and 'fontweight' not in columns:
+        columns['fontweight'] = columns['weight']
+
+    # Recorte no extent antes de projetar
+    keep = np.isfinite(lon) & np.isfinite(lat)
+    if extent is not None:
+        lon_min, lon_max, lat_min, lat_max = extent
+        # Distância a leste de lon_min (módulo 360): vale para extents em 0-360 ou -180-180
+        keep &= ((lon - lon_min) % 360 <= lon_max - lon_min) & (lat >= lat_min) & (lat <= lat_max)
+
+    text_props = {
+        'fontsize': text_kwargs.get('text_fontsize', 12),
+        'color': text_kwargs.get('text_color', 'black'),
+        'fontweight': text_kwargs.get('text_fontweight', 'normal'),
+        'rotation': 0,
+    }
+    for key in PER_LABEL_STYLES:
+        if key in columns:
+            text_props[key] = columns[key] if np.isscalar(columns[key]) else np.asarray(columns[key])[keep]
+
+    x, y = lon[keep], lat[keep]
+
+    # GeoAxes: projeta todos os pontos de uma vez para as coordenadas do mapa
+    projection = getattr(ax, 'projection', None)
+    if projection is not None:
+        import cartopy.crs as ccrs
+        projected = projection.transform_points(ccrs.PlateCarree(), x, y)
+        x, y = projected[:, 0], projected[:, 1]
+
+    priority = np.asarray(columns['priority'], dtype=float)[keep] if 'priority' in columns else None
+
+    # Transparência por rótulo vai para as cores RGBA, que acompanham o declutter
+    alpha = text_props.pop('alpha', None)
+    if alpha is not None and not np.isscalar(alpha):
+        text_props['color'], alpha = _rgba(text_props['color'], alpha), None
+
+    collection = TextCollection(x, y, labels[keep], ha=text_kwargs.get('text_ha', 'center'), va=text_kwargs.get('text_va', 'center'),
+                                declutter=text_kwargs.get('text_declutter', False), priority=priority,
+                                offset_transform=ax.transData, zorder=text_kwargs.get('text_zorder', 5), **text_props)
+    if alpha is not None:
+        collection.set_alpha(alpha)
+    ax.add_collection(collection, autolim=False)
+
+    return collection
@@ -0,0 +1,51 @@
+import numpy as np
+from matplotlib.contour import ContourSet
+from matplotlib.path import Path
+
+# Grade projetada compartilhada pelos workers de plot_small_multiples_from_xarray (um processo = uma grade)
+_CONTOUR_GRID = {}
+
+def _init_contour_worker(x, y, algorithm, corner_mask):
+
+    '''Store the projected grid once per worker process'''
+
+    _CONTOUR_GRID.update(x=x, y=y, algorithm=algorithm, corner_mask=corner_mask)
+
+def _filled_contour_paths(z, lowers, uppers):
+
+    '''Filled contour polygons (vertices and path codes of each layer) of one panel'''
+
+    import contourpy
+
+    cg = contourpy.contour_generator(_CONTOUR_GRID['x'], _CONTOUR_GRID['y'], np.ma.masked_invalid(z),
+                                     name=_CONTOUR_GRID['algorithm'], corner_mask=_CONTOUR_GRID['corner_mask'],
+                                     fill_type=contourpy.FillType.OuterCode)
+
+    layers = []
+    for lower, upper in zip(lowers, uppers):
+        points, codes = cg.filled(lower, upper)
+        layers.append((points, codes))
+
+    return layers
+
+class FilledContourSet(ContourSet):
+
+    '''
+    ContourSet of filled layers already computed (e.g. by _filled_contour_paths in worker processes),
+    drawn like contourf(x, y, z, levels, extend='both'): `layers` goes from below the first level to
+    above the last one. Use FilledContourSet(ax, x, y, levels, layers, filled=True, extend='both', ...).
+    '''
+
+    def _process_args(self, x, y, levels, layers, **kwargs):
+
+        self.levels = np.asarray(levels, dtype=float)
+        self.zmin, self.zmax = self.levels.min(), self.levels.max()
+        if len(layers) != len(self.levels) + 1:
+            raise ValueError(f'Expected {len(self.levels) + 1} layers (extend=both) for {len(self.levels)} levels, got {len(layers)}')
+
+        # Um path composto por camada, como o ContourSet do contourf
+        self._paths = [Path(np.concatenate(points), np.concatenate(codes)) if len(points) else Path(np.empty((0, 2)))
+                       for points, codes in layers]
+        self._mins, self._maxs = [np.min(x), np.min(y)], [np.max(x), np.max(y)]
+
+        return kwargs
@@ -0,0 +1,182 @@
+
+# Raio médio da Terra (m) e gravidade (m/s²)
+EARTH_RADIUS = 6371220.0
+GRAVITY = 9.80665
+
+def _is_dask(data):
+    return type(getattr(data, 'data', data)).__module__.startswith('dask')
+
+def wind_speed(u, v, out=None):
+
+    '''Wind speed sqrt(u² + v²) without intermediate squares (np.hypot), for numpy arrays, DataArrays and dask'''
+
+    import numpy as np
+    import xarray as xr
+
+    if isinstance(u, xr.DataArray):
+        if _is_dask(u) or _is_dask(v):
+            speed = xr.apply_ufunc(np.hypot, u, v, dask='allowed')
+        else:
+            speed = u.copy(data=np.hypot(u.values, v.values, out=out))
+        speed.name = 'wind_speed'
+        return speed
+
+    return np.hypot(u, v, out=out)
+
+def _gradient(values, coord, axis, out, periodic=False):
+
+    '''Centered differences of `values` along `axis` (one-sided at the edges, wrap-around if periodic) written into `out`'''
+
+    import numpy as np
+
+    def take(array, index):
+        slices = [slice(None)] * array.ndim
+        slices[axis] = index
+        return array[tuple(slices)]
+
+    def spacing(index):
+        shape = [1] * values.ndim
+        shape[axis] = -1
+        return index.reshape(shape)
+
+    n = values.shape[axis]
+
+    interior = take(out, slice(1, -1))
+    np.subtract(take(values, slice(2, None)), take(values, slice(None, -2)), out=interior)
+    interior /= spacing(coord[2:] - coord[:-2])
+
+    if periodic:
+        step = 2 * (coord[1] - coord[0])
+        np.subtract(take(values, slice(1, 2)), take(values, slice(n - 1, n)), out=take(out, slice(0, 1)))
+        np.subtract(take(values, slice(0, 1)), take(values, slice(n - 2, n - 1)), out=take(out, slice(n - 1, n)))
+        take(out, slice(0, 1))[...] /= step
+        take(out, slice(n - 1, n))[...] /= step
+    else:
+        np.subtract(take(values, slice(1, 2)), take(values, slice(0, 1)), out=take(out, slice(0, 1)))
+        np.subtract(take(values, slice(n - 1, n)), take(values, slice(n - 2, n - 1)), out=take(out, slice(n - 1, n)))
+        take(out, slice(0, 1))[...] /= coord[1] - coord[0]
+        take(out, slice(n - 1, n))[...] /= coord[n - 1] - coord[n - 2]
+
+    return out
+
+def _kinematics_kernel(u, v, lat, lon, kind):
+
+    '''
+    Vorticity/divergence on the last two axes (lat, lon) of numpy blocks with spherical metric:
+
+    vorticity  = (dv/dlambda - d(u cos(phi))/dphi) / (a cos(phi))
+    divergence = (du/dlambda + d(v cos(phi))/dphi) / (a cos(phi))
+    '''
+
+    import numpy as np
+
+    phi, lam = np.deg2rad(lat), np.deg2rad(lon)
+    cos_phi = np.cos(phi)[:, None]
+
+    # Grade global: diferenças centradas também na costura da longitude
+    periodic = len(lon) > 2 and np.isclose((lon[1] - lon[0]) * len(lon), 360)
+
+    zonal, meridional = (v, u) if kind == 'vorticity' else (u, v)
+
+    out = np.empty(np.broadcast_shapes(u.shape, v.shape))
+    scratch = np.empty_like(out)
+    weighted = np.empty_like(out)
+
+    _gradient(zonal, lam, axis=-1, out=out, periodic=periodic)
+
+    np.multiply(meridional, cos_phi, out=weighted)
+    _gradient(weighted, phi, axis=-2, out=scratch)
+
+    if kind == 'vorticity':
+        out -= scratch
+    else:
+        out += scratch
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out /= EARTH_RADIUS * cos_phi
+
+    # Nos polos a métrica é singular
+    out[..., np.isclose(np.abs(lat), 90), :] = np.nan
+
+    return out
+
+def _kinematics(u, v, dim_lat, dim_lon, kind):
+
+    import xarray as xr
+
+    u, v = xr.broadcast(u, v)
+    dims = [dim for dim in u.dims if dim not in (dim_lat, dim_lon)] + [dim_lat, dim_lon]
+    u, v = u.transpose(*dims), v.transpose(*dims)
+    lat, lon = u[dim_lat].values.astype(float), u[dim_lon].values.astype(float)
+
+    if _is_dask(u) or _is_dask(v):
+        import dask.array as da
+
+        # Cada bloco precisa da grade horizontal inteira; os chunks ficam só nas dimensões externas
+        chunks = {u.ndim - 2: -1, u.ndim - 1: -1}
+        u_data = da.asarray(u.data).rechunk(chunks)
+        v_data = da.asarray(v.data).rechunk(chunks)
+        values = da.map_blocks(_kinematics_kernel, u_data, v_data, lat=lat, lon=lon, kind=kind, dtype=float)
+    else:
+        values = _kinematics_kernel(u.values, v.values, lat, lon, kind)
+
+    return xr.DataArray(values, coords=u.coords, dims=u.dims, name=kind)
+
+def vorticity(u, v, dim_lat='latitude', dim_lon='longitude'):
+
+    '''Relative vorticity (1/s) of the wind on a lat/lon grid (palette 'vorticidade' expects 1e-5/s: multiply by 1e5)'''
+
+    return _kinematics(u, v, dim_lat, dim_lon, 'vorticity')
+
+def divergence(u, v, dim_lat='latitude', dim_lon='longitude'):
+
+    '''Horizontal divergence (1/s) of the wind on a lat/lon grid (palette 'divergencia850' expects 1e-5/s: multiply by 1e5)'''
+
+    return _kinematics(u, v, dim_lat, dim_lon, 'divergence')
+
+def integrated_vapor_transport(q, u, v, dim_level='level', level_units='hPa'):
+
+    '''
+    Integrated vapor transport (kg/m/s): (1/g) * integral of q*V dp over the pressure levels
+    (trapezoidal rule). Returns a Dataset with ivtu, ivtv and ivt (magnitude, palette 'ivt').
+    '''
+
+    import numpy as np
+    import xarray as xr
+
+    pressure = q[dim_level].values.astype(float) * (100.0 if level_units == 'hPa' else 1.0)
+    weights = np.zeros(len(pressure))
+
+    # Pesos do trapézio: cada nível recebe metade das camadas vizinhas
+    layers = np.abs(np.diff(pressure)) / (2 * GRAVITY)
+    weights[:-1] += layers
+    weights[1:] += layers
+
+    # Mesma ordem de dimensões de q (transpose é uma view): o eixo dos níveis vale para as três
+    q, u, v = xr.broadcast(q, u, v)
+    u, v = u.transpose(*q.dims), v.transpose(*q.dims)
+    template = q.isel({dim_level: 0}, drop=True)
+
+    if any(_is_dask(data) for data in (q, u, v)):
+        w = xr.DataArray(weights, coords={dim_level: q[dim_level]}, dims=dim_level)
+        ivtu = (q * u * w).sum(dim_level)
+        ivtv = (q * v * w).sum(dim_level)
+        ivt = xr.apply_ufunc(np.hypot, ivtu, ivtv, dask='allowed')
+    else:
+        axis = q.get_axis_num(dim_level)
+        ivtu_values, ivtv_values, flux = np.zeros(template.shape), np.zeros(template.shape), np.empty(template.shape)
+
+        # Níveis na primeira dimensão (views, sem cópia) e um nível por vez: memória O(um campo) além das entradas
+        q_values, u_values, v_values = (np.moveaxis(data.values, axis, 0) for data in (q, u, v))
+        for k, weight in enumerate(weights):
+            np.multiply(q_values[k], u_values[k], out=flux)
+            flux *= weight
+            ivtu_values += flux
+            np.multiply(q_values[k], v_values[k], out=flux)
+            flux *= weight
+            ivtv_values += flux
+
+        ivtu, ivtv = template.copy(data=ivtu_values), template.copy(data=ivtv_values)
+        ivt = template.copy(data=np.hypot(ivtu_values, ivtv_values, out=flux))
+
+    return xr.Dataset({'ivtu': ivtu, 'ivtv': ivtv, 'ivt': ivt})
@@ -0,0 +1,241 @@
+
+# Paleta do custom_colorbar usada para cada estatística do ensemble
+STATISTIC_PALETTES = {
+    'probability': 'probabilidade',
+    'std': 'desvpad',
+    'pct_climatology': 'pct_climatologia',
+}
+
+class EnsembleStatistics:
+
+    '''
+    Running ensemble statistics updated one member at a time.
+
+    Keeps the mean and variance (Welford), exceedance counts for each threshold and
+    approximate percentiles (P² algorithm, 5 markers per grid point), so memory stays
+    at O(one member) regardless of the ensemble size.
+
+    >>> stats = EnsembleStatistics(thresholds=[10, 50], percentiles=[10, 50, 90])
+    >>> for member in members:
+    ...     stats.update(member)
+    >>> stats.probability(50)   # % of members above 50 mm
+    '''
+
+    def __init__(self, thresholds=(), percentiles=()):
+
+        self.thresholds = list(thresholds)
+        self.percentiles = list(percentiles)
+        self.n = 0
+        self._template = None
+
+    def _init_state(self, member):
+
+        import numpy as np
+
+        self._template = member
+        shape = np.shape(member)
+
+        self._mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+        # Buffers reutilizados a cada membro: a atualização não aloca arrays do tamanho da grade
+        self._delta = np.empty(shape)
+        self._work = np.empty(shape)
+        self._above = np.empty(shape, dtype=bool)
+        self._exceedance = {threshold: np.zeros(shape, dtype=np.int32) for threshold in self.thresholds}
+
+        # P²: os 5 primeiros membros são guardados para inicializar os marcadores
+        self._first_members = []
+        self._markers = {}
+
+    def update(self, member):
+
+        '''Add one member (DataArray or array with the grid dimensions) to the statistics'''
+
+        import numpy as np
+
+        if self._template is None:
+            self._init_state(member)
+
+        x = np.asarray(getattr(member, 'values', member), dtype=float)
+        if x.shape != self._mean.shape:
+            raise ValueError(f'Member shape {x.shape} does not match the ensemble grid {self._mean.shape}')
+
+        self.n += 1
+
+        # Welford: média e soma dos quadrados dos desvios, operações in-place nos buffers delta/work
+        np.subtract(x, self._mean, out=self._delta)
+        np.divide(self._delta, self.n, out=self._work)
+        self._mean += self._work
+        np.subtract(x, self._mean, out=self._work)
+        self._work *= self._delta
+        self._m2 += self._work
+
+        for threshold, count in self._exceedance.items():
+            np.greater(x, threshold, out=self._above)
+            count += self._above
+
+        if self.percentiles:
+            self._update_percentiles(x)
+
+    def update_block(self, block):
+
+        '''Add a block of members stacked on the first axis'''
+
+        for member in block:
+            self.update(member)
+
+    def _update_percentiles(self, x):
+
+        import numpy as np
+
+        if self.n <= 5:
+            self._first_members.append(x.copy())
+            if self.n == 5:
+                q = np.sort(np.stack(self._first_members), axis=0)
+                positions = np.broadcast_to(np.arange(1.0, 6.0)[(...,) + (None,) * x.ndim], q.shape).copy()
+                for percentile in self.percentiles:
+                    self._markers[percentile] = [q.copy(), positions.copy()]
+                self._first_members = []
+            return
+
+        for percentile, (q, positions) in self._markers.items():
+            _p2_update(q, positions, x, percentile / 100, self.n)
+
+    def _to_xarray(self, values, name):
+
+        import xarray as xr
+
+        if isinstance(self._template, xr.DataArray):
+            return xr.DataArray(values, coords=self._template.coords, dims=self._template.dims, name=name)
+
+        return values
+
+    def mean(self):
+
+        '''Ensemble mean'''
+
+        return self._to_xarray(self._mean.copy(), 'mean')
+
+    def variance(self, ddof=1):
+
+        '''Ensemble variance (sample variance by default)'''
+
+        return self._to_xarray(self._m2 / max(self.n - ddof, 1), 'variance')
+
+    def std(self, ddof=1):
+
+        '''Ensemble standard deviation (spread)'''
+
+        import numpy as np
+
+        return self._to_xarray(np.sqrt(self._m2 / max(self.n - ddof, 1)), 'std')
+
+    def probability(self, threshold):
+
+        '''Probability (%) of exceeding a threshold, as expected by the 'probabilidade' palette'''
+
+        if threshold not in self._exceedance:
+            raise ValueError(f'Threshold {threshold} was not tracked. Available: {self.thresholds}')
+
+        return self._to_xarray(100 * self._exceedance[threshold] / self.n, f'probability_{threshold}')
+
+    def percentile(self, q):
+
+        '''Approximate percentile q (0-100); exact when the ensemble has up to 5 members'''
+
+        import numpy as np
+
+        if q not in self.percentiles:
+            raise ValueError(f'Percentile {q} was not tracked. Available: {self.percentiles}')
+
+        if self.n < 5 or (self.n == 5 and not self._markers):
+            values = np.percentile(np.stack(self._first_members), q, axis=0)
+        elif self.n == 5:
+            values = np.percentile(self._markers[q][0], q, axis=0)
+        else:
+            values = self._markers[q][0][2].copy()
+
+        return self._to_xarray(values, f'percentile_{q}')
+
+    def pct_climatology(self, climatology):
+
+        '''Ensemble mean as a percentage of the climatology, as expected by the 'pct_climatologia' palette'''
+
+        import numpy as np
+
+        climatology = np.asarray(getattr(climatology, 'values', climatology), dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = np.where(climatology > 0, 100 * self._mean / climatology, np.nan)
+
+        return self._to_xarray(values, 'pct_climatology')
+
+def _p2_update(q, positions, x, p, n):
+
+    '''Vectorized P² update of the 5 markers (heights q, positions) of every grid point with a new observation x'''
+
+    import numpy as np
+
+    # Célula k onde x cai (ajustando os extremos)
+    np.minimum(q[0], x, out=q[0])
+    np.maximum(q[4], x, out=q[4])
+    k = (x >= q[1]).astype(np.int8) + (x >= q[2]) + (x >= q[3])
+
+    for i in range(1, 5):
+        positions[i] += k < i
+
+    desired = 1 + (n - 1) * np.array([0, p / 2, p, (1 + p) / 2, 1])
+
+    for i in range(1, 4):
+        d = desired[i] - positions[i]
+        step_up = (d >= 1) & (positions[i + 1] - positions[i] > 1)
+        step_down = (d <= -1) & (positions[i - 1] - positions[i] < -1)
+        adjust = step_up | step_down
+        if not adjust.any():
+            continue
+
+        ds = np.where(step_up, 1.0, -1.0)
+        n_prev, n_i, n_next = positions[i - 1], positions[i], positions[i + 1]
+        q_prev, q_i, q_next = q[i - 1], q[i], q[i + 1]
+
+        # Interpolação parabólica; cai para linear quando sai do intervalo dos vizinhos
+        with np.errstate(divide='ignore', invalid='ignore'):
+            parabolic = q_i + ds / (n_next - n_prev) * ((n_i - n_prev + ds) * (q_next - q_i) / (n_next - n_i)
+                                                        + (n_next - n_i - ds) * (q_i - q_prev) / (n_i - n_prev))
+            linear = np.where(step_up, q_i + (q_next - q_i) / (n_next - n_i), q_i - (q_prev - q_i) / (n_prev - n_i))
+
+        new_q = np.where((q_prev < parabolic) & (parabolic < q_next), parabolic, linear)
+        q[i] = np.where(adjust, new_q, q_i)
+        positions[i] += np.where(adjust, ds, 0)
+
+def ensemble_statistics(members, member_dim='member', thresholds=(), percentiles=()):
+
+    '''
+    Compute streaming ensemble statistics from a DataArray with a member dimension or from an
+    iterable of members (e.g. a generator reading one file per member).
+
+    Dask-backed DataArrays are computed one chunk of members at a time, numpy-backed ones
+    one member at a time, so only O(one chunk) is ever loaded.
+    '''
+
+    import xarray as xr
+
+    stats = EnsembleStatistics(thresholds=thresholds, percentiles=percentiles)
+
+    if isinstance(members, xr.DataArray):
+
+        if members.chunks is not None:
+            start = 0
+            for size in members.chunks[members.get_axis_num(member_dim)]:
+                block = members.isel({member_dim: slice(start, start + size)})
+                for member in block.compute().transpose(member_dim, ...):
+                    stats.update(member.drop_vars(member_dim, errors='ignore'))
+                start += size
+        else:
+            for i in range(members.sizes[member_dim]):
+                stats.update(members.isel({member_dim: i}).drop_vars(member_dim, errors='ignore'))
+
+    else:
+        for member in members:
+            stats.update(member)
+
+    return stats
@@ -0,0 +1,427 @@
+
+from meteoplots.utils.utils import LRUCache
+
+# Shapefiles já lidos (EPSG:4326), por (caminho absoluto, data de modificação)
+_SHAPEFILES = LRUCache(maxsize=16)
+
+# Geometrias recortadas/simplificadas (só a geometria e as posições das linhas mantidas: os atributos são lidos do
+# GeoDataFrame vivo) e seus vértices/códigos de Path, por (fonte, tolerância, caixa de recorte).
+# Limitado: workers de longa duração (meteoplots render) veem muitos extents diferentes
+_SIMPLIFIED = LRUCache(maxsize=128)
+
+# Índices espaciais, por fonte
+_INDEXES = LRUCache(maxsize=32)
+
+def read_shapefile(path):
+
+    '''Read a shapefile once (cached per path and modification time) in EPSG:4326. The cached GeoDataFrame is shared: copy it before modifying'''
+
+    import os
+    import geopandas as gpd
+
+    path = os.path.abspath(str(path))
+    key = (path, os.path.getmtime(path))
+
+    if key not in _SHAPEFILES:
+        gdf = gpd.read_file(path)
+        # Sem CRS definido: assume coordenadas geográficas, como o restante do pacote
+        if gdf.crs is not None and gdf.crs.to_epsg() != 4326:
+            gdf = gdf.to_crs(epsg=4326)
+        _SHAPEFILES[key] = gdf
+
+    return _SHAPEFILES[key]
+
+def land_geometries(resolution='110m'):
+
+    '''Natural Earth land polygons (lon/lat) at resolution '110m', '50m' or '10m', from the local Natural Earth cache'''
+
+    from meteoplots.utils.natural_earth import natural_earth_geometries
+
+    return natural_earth_geometries('land', resolution)
+
+def simplify_tolerance(extent, figsize, dpi=100, pixels=0.5):
+
+    '''Simplification tolerance (degrees) of `pixels` display pixels, rounded to 2 significant digits so close map sizes share the cache'''
+
+    from meteoplots.utils.utils import display_resolution
+
+    tolerance = min(display_resolution(extent, figsize, dpi)) * pixels
+
+    return float(f'{tolerance:.2g}') if tolerance > 0 else 0.0
+
+def _rings(geometry):
+
+    '''Coordinates (n, 2) of the rings/lines of a geometry, with a flag for closed rings (polygons oriented exterior CCW, holes CW)'''
+
+    import numpy as np
+    from shapely.geometry.polygon import orient
+
+    if geometry is None or geometry.is_empty:
+        return []
+
+    kind = geometry.geom_type
+    if kind == 'Polygon':
+        geometry = orient(geometry, 1.0)
+        return [(np.asarray(ring.coords)[:, :2], True) for ring in [geometry.exterior, *geometry.interiors]]
+    if kind in ('LineString', 'LinearRing'):
+        return [(np.asarray(geometry.coords)[:, :2], kind == 'LinearRing')]
+    if hasattr(geometry, 'geoms'):
+        return [ring for part in geometry.geoms for ring in _rings(part)]
+
+    # Pontos não têm contorno
+    return []
+
+def _path_arrays(geometries):
+
+    '''All vertices (N, 2) and Path codes of a sequence of geometries, with the start index of each geometry'''
+
+    import numpy as np
+    from matplotlib.path import Path
+
+    vertices, codes, starts, count = [], [], [], 0
+    for geometry in geometries:
+        starts.append(count)
+        for coords, closed in _rings(geometry):
+            if len(coords) < 2:
+                continue
+            ring_codes = np.full(len(coords), Path.LINETO, dtype=Path.code_type)
+            ring_codes[0] = Path.MOVETO
+            if closed:
+                ring_codes[-1] = Path.CLOSEPOLY
+            vertices.append(coords)
+            codes.append(ring_codes)
+            count += len(coords)
+    starts.append(count)
+
+    if not vertices:
+        return np.empty((0, 2)), np.empty(0, dtype=Path.code_type), np.asarray(starts)
+
+    return np.concatenate(vertices).astype(float), np.concatenate(codes), np.asarray(starts)
+
+def _central_longitude(projection):
+
+    '''Central longitude of a cartopy projection: lon_0, or the prime meridian (pm) of cartopy's 'latlong' PlateCarree'''
+
+    params = projection.proj4_params
+
+    return float(params.get('lon_0', params.get('pm', 0)))
+
+def _crossing_seam(vertices, starts, projection):
+
+    '''Boolean per geometry: True when its longitude range crosses the seam (central longitude ± 180) of the projection'''
+
+    import numpy as np
+
+    seam = (_central_longitude(projection) + 360) % 360 - 180
+    crossing = np.zeros(len(starts) - 1, dtype=bool)
+    filled = np.flatnonzero(starts[1:] > starts[:-1])
+    if len(filled) == 0:
+        return crossing
+
+    lon_min = np.minimum.reduceat(vertices[:, 0], starts[filled])
+    lon_max = np.maximum.reduceat(vertices[:, 0], starts[filled])
+    crossing[filled] = np.any([(lon_min < line) & (lon_max > line) for line in (seam - 360, seam, seam + 360)], axis=0)
+
+    return crossing
+
+def _project_paths(vertices, codes, starts, projection=None, geometries=None):
+
+    '''
+    One Path per geometry, with all vertices projected from lon/lat in a single transform_points call.
+    With `geometries` (the lon/lat geometries of the arrays), those crossing the seam of the projection
+    go through cartopy's project_geometry instead, which cuts them there instead of drawing a streak
+    across the map.
+    '''
+
+    import numpy as np
+    from matplotlib.path import Path
+
+    seam_paths = {}
+    if projection is not None and len(vertices):
+        import cartopy.crs as ccrs
+        if geometries is not None:
+            crossing = np.flatnonzero(_crossing_seam(vertices, starts, projection))
+            if len(crossing):
+                geometries = list(geometries)
+                for position in crossing:
+                    projected = projection.project_geometry(geometries[position], ccrs.PlateCarree())
+                    seam_paths[position] = Path(*_path_arrays([projected])[:2])
+        vertices = projection.transform_points(ccrs.PlateCarree(), vertices[:, 0], vertices[:, 1])[:, :2]
+
+    return [seam_paths[position] if position in seam_paths else Path(vertices[start:end], codes[start:end])
+            for position, (start, end) in enumerate(zip(starts[:-1], starts[1:]))]
+
+def geometry_paths(geometries, projection=None):
+
+    '''
+    Matplotlib Paths (one compound path per geometry: polygons with holes, lines) of lon/lat
+    geometries, projected to `projection` (a cartopy CRS) in one vectorized call. Geometries
+    crossing the seam of the projection are cut there with cartopy's project_geometry.
+    '''
+
+    geometries = list(geometries)
+
+    return _project_paths(*_path_arrays(geometries), projection=projection, geometries=geometries)
+
+def _source(source):
+
+    '''
+    GeoDataFrame (EPSG:4326) and cache key of a shapefile path or GeoDataFrame: (path, modification
+    time) for files, a hash of the WKB of every geometry for GeoDataFrames, so geometries edited in
+    place (or a new frame at a reused id) do not get cached results of other geometries
+    '''
+
+    import hashlib
+    import os
+
+    if isinstance(source, (str, os.PathLike)):
+        return read_shapefile(source), ('path', os.path.abspath(str(source)), os.path.getmtime(source))
+
+    gdf = source
+    if gdf.crs is not None and gdf.crs.to_epsg() != 4326:
+        gdf = gdf.to_crs(epsg=4326)
+
+    # Conteúdo das geometrias, na ordem das linhas: posições em cache valem para qualquer frame com as mesmas geometrias
+    digest = hashlib.sha1()
+    for value in gdf.geometry.to_wkb():
+        digest.update(b'-' if value is None else value)
+
+    return gdf, ('geodataframe', len(gdf), digest.hexdigest())
+
+def _cache(cache, source, source_key, key, build):
+
+    '''Get or build cache[key]; entries of in-memory GeoDataFrames leave the cache with the object that built them'''
+
+    import weakref
+
+    if key not in cache:
+        cache[key] = build()
+        if source_key[0] == 'geodataframe':
+            weakref.finalize(source, cache.pop, key, None)
+
+    return cache[key]
+
+def _clip_box(extent, margin=0.1):
+
+    '''lon/lat box (x0, y0, x1, y1) of the extent widened by `margin` (fraction of its size), None when it cannot be clipped (crosses the antimeridian)'''
+
+    from meteoplots.utils.utils import normalize_extent
+
+    if float(extent[0]) >= float(extent[1]) or float(extent[2]) >= float(extent[3]):
+        return None
+
+    # Geometrias em -180-180: extents em 0-360 (mapas centrados no Pacífico) são trazidos para a mesma janela
+    lon_min, lon_max, lat_min, lat_max = [float(value) for value in normalize_extent(extent)]
+    if lon_max > 180:
+        return None
+
+    pad_lon, pad_lat = margin * (lon_max - lon_min), margin * (lat_max - lat_min)
+
+    return (round(lon_min - pad_lon, 6), round(max(lat_min - pad_lat, -90), 6), round(lon_max + pad_lon, 6), round(min(lat_max + pad_lat, 90), 6))
+
+def _features_in_box(source, clip_box):
+
+    import numpy as np
+
+    gdf, source_key = _source(source)
+
+    def build():
+        # R-tree do geopandas quando rtree/pygeos estão instalados; senão as caixas envolventes (numpy)
+        try:
+            return gdf.sindex
+        except ImportError:
+            return gdf.geometry.bounds.to_numpy()
+
+    index = _cache(_INDEXES, source, source_key, source_key, build)
+    x0, y0, x1, y1 = clip_box
+
+    if isinstance(index, np.ndarray):
+        return np.flatnonzero((index[:, 0] <= x1) & (index[:, 2] >= x0) & (index[:, 1] <= y1) & (index[:, 3] >= y0))
+
+    from shapely.geometry import box
+    return np.sort(np.asarray(index.query(box(x0, y0, x1, y1)), dtype=int))
+
+def features_in_extent(source, extent, margin=0.1):
+
+    '''
+    Integer positions of the geometries of a shapefile path or GeoDataFrame whose bounding box
+    intersects the extent plus `margin` (fraction of its size). The spatial index is built once per
+    shapefile: the geopandas R-tree when rtree/pygeos is installed, else the bounding boxes.
+    '''
+
+    import numpy as np
+
+    clip_box = _clip_box(extent, margin)
+    if clip_box is None:
+        return np.arange(len(_source(source)[0]))
+
+    return _features_in_box(source, clip_box)
+
+def _clip(geometry, positions, clip_box):
+
+    '''Geometries at `positions` and those positions, with the geometries that cross the box edge cut to the box (empty results dropped)'''
+
+    import geopandas as gpd
+    from shapely.geometry import box
+    from shapely.validation import make_valid
+
+    geometry = geometry.iloc[positions]
+    x0, y0, x1, y1 = clip_box
+    bounds = geometry.bounds.to_numpy()
+    crossing = ~((bounds[:, 0] >= x0) & (bounds[:, 1] >= y0) & (bounds[:, 2] <= x1) & (bounds[:, 3] <= y1))
+
+    if not crossing.any():
+        return geometry, positions
+
+    # Só as geometrias que cruzam a borda são cortadas; inválidas são corrigidas antes da interseção
+    # (nova GeoSeries: atribuir por máscara booleana falha em GeoSeries de um único elemento)
+    clip_polygon = box(x0, y0, x1, y1)
+    parts = [(part if part.is_valid else make_valid(part)).intersection(clip_polygon) if cross else part for part, cross in zip(geometry, crossing)]
+    geometry = gpd.GeoSeries(parts, index=geometry.index, crs=geometry.crs, name=geometry.name)
+    kept = ~geometry.is_empty.to_numpy()
+
+    return geometry[kept], positions[kept]
+
+def _polygon_parts(geometry):
+
+    '''Polygons of a Polygon/MultiPolygon, None for any other geometry type'''
+
+    if geometry is None or geometry.is_empty:
+        return None
+    if geometry.geom_type == 'Polygon':
+        return [geometry]
+    if geometry.geom_type == 'MultiPolygon':
+        return list(geometry.geoms)
+
+    return None
+
+def _split_ring(ring, junction):
+
+    '''Arcs (vertex id arrays, first and last vertex repeated at the joints) of a closed ring of vertex ids cut at its junctions'''
+
+    import numpy as np
+
+    cuts = np.flatnonzero(junction[ring])
+    if len(cuts) == 0:
+        # Anel sem junções (ilha, ou anel idêntico a outro): começa no menor id, igual para todos que o compartilham
+        start = int(np.argmin(ring))
+        ring = np.roll(ring, -start)
+        return [np.append(ring, ring[0])]
+
+    ring = np.roll(ring, -cuts[0])
+    cuts = np.append(cuts - cuts[0], len(ring))
+    closed = np.append(ring, ring[0])
+
+    return [closed[start:end + 1] for start, end in zip(cuts[:-1], cuts[1:])]
+
+def _simplify_shared(geometry, tolerance):
+
+    '''
+    GeoSeries with its polygons simplified to `tolerance` keeping the shared borders shared: the rings are
+    cut into arcs at the vertices where neighbouring rings meet or split (junctions), and every arc is
+    simplified once (Douglas-Peucker, ends kept) and reused by all the rings that contain it, so
+    neighbouring polygons get no gaps or overlaps. Other geometry types are simplified one by one.
+    '''
+
+    import geopandas as gpd
+    import numpy as np
+    from shapely.geometry import LineString, MultiPolygon, Polygon
+    from shapely.validation import make_valid
+
+    # Anéis (sem o vértice de fechamento nem vértices repetidos em sequência) de todos os polígonos
+    parts = [_polygon_parts(item) for item in geometry]
+    rings = []
+    for item_parts in parts:
+        for polygon in item_parts or []:
+            for ring in [polygon.exterior, *polygon.interiors]:
+                coords = np.asarray(ring.coords)[:-1, :2]
+                coords = coords[np.r_[True, np.any(coords[1:] != coords[:-1], axis=1)]]
+                rings.append(coords)
+
+    if not rings:
+        return geometry.simplify(tolerance, preserve_topology=True)
+
+    # Ids de vértice pelas coordenadas exatas: fronteiras compartilhadas repetem os mesmos vértices
+    vertices, ids = np.unique(np.concatenate(rings), axis=0, return_inverse=True)
+    ids = np.asarray(ids).ravel()
+    bounds = np.cumsum([0] + [len(ring) for ring in rings])
+    ring_ids = [ids[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+    # Junção: vértice com vizinhos (anterior, seguinte) diferentes em algum dos anéis que passam por ele
+    previous = np.concatenate([np.roll(ring, 1) for ring in ring_ids])
+    following = np.concatenate([np.roll(ring, -1) for ring in ring_ids])
+    pairs = np.unique(np.column_stack([ids, np.minimum(previous, following), np.maximum(previous, following)]), axis=0)
+    junction = np.bincount(pairs[:, 0], minlength=len(vertices)) > 1
+
+    # Cada arco é simplificado uma vez, no sentido canônico, e invertido para os anéis que o percorrem ao contrário
+    arcs = {}
+
+    def simplified_arc(arc):
+        key = tuple(arc) if tuple(arc) <= tuple(arc[::-1]) else tuple(arc[::-1])
+        if key not in arcs:
+            coords = vertices[list(key)]
+            arcs[key] = np.asarray(LineString(coords).simplify(tolerance, preserve_topology=False).coords) if len(coords) > 2 else coords
+        return arcs[key] if key == tuple(arc) else arcs[key][::-1]
+
+    def simplified_ring(ring, original):
+        coords = np.concatenate([simplified_arc(arc)[:-1] for arc in _split_ring(ring, junction)])
+        # Anéis menores que a tolerância colapsam: mantém o original
+        return np.vstack([coords, coords[:1]]) if len(coords) >= 3 else np.vstack([original, original[:1]])
+
+    result, position = [], 0
+    for item, item_parts in zip(geometry, parts):
+        if item_parts is None:
+            result.append(item.simplify(tolerance, preserve_topology=True) if item is not None and not item.is_empty else item)
+            continue
+        polygons = []
+        for polygon in item_parts:
+            count = 1 + len(polygon.interiors)
+            shell, *holes = [simplified_ring(ring_ids[position + i], rings[position + i]) for i in range(count)]
+            polygons.append(Polygon(shell, holes))
+            position += count
+        simplified = polygons[0] if item.geom_type == 'Polygon' else MultiPolygon(polygons)
+        # Arcos simplificados podem se cruzar em casos raros: só esses são corrigidos
+        result.append(simplified if simplified.is_valid else make_valid(simplified))
+
+    return gpd.GeoSeries(result, index=geometry.index, crs=geometry.crs, name=geometry.name)
+
+def _simplified(source, tolerance, extent=None, margin=0.1):
+
+    '''
+    Cache entry of a shapefile path or GeoDataFrame: geometries, row positions and the arrays of their
+    paths, limited to the extent plus margin (spatial index, then clipping) and simplified to `tolerance` degrees
+    '''
+
+    import numpy as np
+
+    gdf, source_key = _source(source)
+    clip_box = _clip_box(extent, margin) if extent is not None else None
+
+    def build():
+        geometry, positions = gdf.geometry, np.arange(len(gdf))
+        if clip_box is not None:
+            geometry, positions = _clip(geometry, _features_in_box(source, clip_box), clip_box)
+        if tolerance > 0:
+            geometry = _simplify_shared(geometry, tolerance)
+        return {'geometry': geometry, 'positions': positions, 'arrays': _path_arrays(geometry)}
+
+    return _cache(_SIMPLIFIED, source, source_key, (source_key, float(tolerance), clip_box), build)
+
+def _rows(source, entry):
+
+    '''Rows of the source kept in a cache entry, with its cached geometries and the current values of the other columns'''
+
+    gdf, _ = _source(source)
+
+    return gdf.iloc[entry['positions']].set_geometry(entry['geometry'].to_numpy(), crs=gdf.crs)
+
+def simplified_geometries(source, tolerance, extent=None, margin=0.1):
+
+    '''
+    GeoDataFrame (EPSG:4326) of a shapefile path or GeoDataFrame with its geometries simplified to
+    `tolerance` degrees, cached per source and tolerance. Borders shared by neighbouring polygons are
+    simplified once, so they still match (no gaps or overlaps). With `extent`, only the geometries
+    within the extent plus `margin` are kept, clipped to it.
+    '''
+
+    return _rows(source, _simplified(source, tolerance, extent, margin))
@@ -0,0 +1,207 @@
+
+from matplotlib.collections import PathCollection
+
+from meteoplots.utils.utils import LRUCache
+
+# Camadas do mapa base: nome -> (categoria, nome no Natural Earth)
+BASE_FEATURES = {
+    'coastline': ('physical', 'coastline'),
+    'borders': ('cultural', 'admin_0_boundary_lines_land'),
+    'land': ('physical', 'land'),
+    'ocean': ('physical', 'ocean'),
+}
+
+NATURAL_EARTH_RESOLUTIONS = ['110m', '50m', '10m']
+
+# Resolução automática: maior lado do extent (graus) até o qual cada resolução é usada; acima disso, 110m
+AUTO_RESOLUTION_LIMITS = [('10m', 10), ('50m', 30)]
+
+# Resoluções recortadas ao extent do mapa (o 110m inteiro tem poucos milhares de vértices: recortar custa mais do que desenhar)
+CLIPPED_RESOLUTIONS = ['50m', '10m']
+
+# Geometrias, arrays de Path e GeoDataFrames (recortes em cache) já carregados no processo, por (camada, resolução, longitude central)
+_GEOMETRIES = LRUCache(maxsize=24)
+_PATH_ARRAYS = LRUCache(maxsize=24)
+_FRAMES = LRUCache(maxsize=12)
+
+def _cache_path(feature, resolution, central_longitude):
+
+    import os
+    from meteoplots.utils.utils import get_cache_dir
+
+    return os.path.join(get_cache_dir('natural_earth'), f'{feature}_{resolution}_lon{float(central_longitude):g}.wkb')
+
+def _read_natural_earth(feature, resolution, central_longitude):
+
+    '''Geometries of a Natural Earth shapefile (downloaded by cartopy if needed) projected to PlateCarree(central_longitude)'''
+
+    import cartopy.crs as ccrs
+    import cartopy.io.shapereader as shpreader
+
+    category, name = BASE_FEATURES[feature]
+    reader = shpreader.Reader(shpreader.natural_earth(resolution=resolution, category=category, name=name))
+    projection, source = ccrs.PlateCarree(central_longitude=central_longitude), ccrs.PlateCarree()
+
+    # Projetar uma vez aqui (corte na costura da longitude central) evita o project_geometry a cada mapa
+    geometries = [projection.project_geometry(geometry, source) for geometry in reader.geometries() if geometry is not None]
+
+    return [geometry for geometry in geometries if not geometry.is_empty]
+
+def natural_earth_geometries(feature, resolution='110m', central_longitude=0):
+
+    '''
+    Geometries of a base map feature ('coastline', 'borders', 'land', 'ocean') in the coordinates of
+    PlateCarree(central_longitude), cut at its seam. They are loaded from a local binary (WKB) cache in
+    get_cache_dir('natural_earth'); on a cache miss the Natural Earth shapefile is read through
+    cartopy (downloading it if needed) and written to the cache. See `meteoplots warmup`.
+    '''
+
+    import os
+    from shapely import wkb
+    from shapely.geometry import GeometryCollection
+
+    if feature not in BASE_FEATURES:
+        raise ValueError(f"Feature {feature} not supported. Options: {list(BASE_FEATURES)}")
+    if resolution not in NATURAL_EARTH_RESOLUTIONS:
+        raise ValueError(f"Resolution {resolution} not supported. Options: {NATURAL_EARTH_RESOLUTIONS}")
+
+    key = (feature, resolution, float(central_longitude))
+    if key not in _GEOMETRIES:
+        path = _cache_path(feature, resolution, central_longitude)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                geometries = list(wkb.loads(f.read()).geoms)
+        else:
+            geometries = _read_natural_earth(feature, resolution, central_longitude)
+
+            # Escrita atômica: vários workers podem aquecer o cache ao mesmo tempo
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(wkb.dumps(GeometryCollection(geometries)))
+            os.replace(tmp_path, path)
+        _GEOMETRIES[key] = geometries
+
+    return _GEOMETRIES[key]
+
+def warmup_natural_earth(resolutions=None, features=None, central_longitudes=(0,)):
+
+    '''Fill the local Natural Earth cache for the given resolutions (default: all, as resolution='auto' may use any), features and central longitudes. Returns the cache files'''
+
+    paths = []
+    for resolution in resolutions or NATURAL_EARTH_RESOLUTIONS:
+        for feature in features or list(BASE_FEATURES):
+            for central_longitude in central_longitudes:
+                natural_earth_geometries(feature, resolution, central_longitude)
+                paths.append(_cache_path(feature, resolution, central_longitude))
+                print(f'✅ {feature} {resolution} (central_longitude={float(central_longitude):g}) cached in {paths[-1]}')
+
+    return paths
+
+def natural_earth_resolution(extent):
+
+    '''Natural Earth resolution for a map extent [lon_min, lon_max, lat_min, lat_max]: '10m' up to 10°, '50m' up to 30°, else '110m' (largest side)'''
+
+    span = max(abs(float(extent[1]) - float(extent[0])), abs(float(extent[3]) - float(extent[2])))
+
+    for resolution, limit in AUTO_RESOLUTION_LIMITS:
+        if span <= limit:
+            return resolution
+
+    return '110m'
+
+def _frame(feature, resolution, central_longitude):
+
+    '''GeoDataFrame of the cached feature; kept alive here so its clipped geometries stay in the geometry caches (they leave with it)'''
+
+    import geopandas as gpd
+
+    key = (feature, resolution, float(central_longitude))
+    if key not in _FRAMES:
+        _FRAMES[key] = gpd.GeoDataFrame(geometry=natural_earth_geometries(*key))
+
+    return _FRAMES[key]
+
+def _shift_extent(extent, central_longitude):
+
+    '''Extent in the coordinates of PlateCarree(central_longitude), None when it crosses the seam of the projection'''
+
+    lon_min, lon_max, lat_min, lat_max = [float(value) for value in extent]
+    x0 = (lon_min - central_longitude + 180) % 360 - 180
+    x1 = x0 + (lon_max - lon_min)
+
+    return [x0, x1, lat_min, lat_max] if 0 < x1 - x0 and x1 <= 180 else None
+
+def _natural_earth_paths(feature, resolution, projection, extent=None, margin=0.1):
+
+    import cartopy.crs as ccrs
+    from meteoplots.utils.geometry import _central_longitude, _path_arrays, _project_paths, _simplified
+
+    if resolution not in CLIPPED_RESOLUTIONS:
+        extent = None
+
+    if type(projection) is ccrs.PlateCarree:
+        # Geometrias já nas coordenadas do mapa: arrays de Path em cache (recortados ao extent + margem)
+        central_longitude = _central_longitude(projection)
+        if extent is not None:
+            extent = _shift_extent(extent, central_longitude)
+        if extent is not None:
+            return _project_paths(*_simplified(_frame(feature, resolution, central_longitude), 0, extent, margin)['arrays'])
+        key = (feature, resolution, central_longitude)
+        if key not in _PATH_ARRAYS:
+            _PATH_ARRAYS[key] = _path_arrays(natural_earth_geometries(*key))
+        return _project_paths(*_PATH_ARRAYS[key])
+
+    geometries = _simplified(_frame(feature, resolution, 0), 0, extent, margin)['geometry'] if extent is not None else natural_earth_geometries(feature, resolution)
+    geometries = [projection.project_geometry(geometry, ccrs.PlateCarree()) for geometry in geometries]
+    return _project_paths(*_path_arrays(geometries))
+
+class NaturalEarthCollection(PathCollection):
+
+    '''
+    PathCollection of a cached Natural Earth feature whose paths are only loaded when drawn (like
+    cartopy's FeatureArtist). With `share`, another collection of the same feature, projection and
+    extent, its Path objects are reused instead of loaded again.
+    '''
+
+    def __init__(self, feature, resolution, projection, extent=None, margin=0.1, share=None, **kwargs):
+
+        super().__init__([], **kwargs)
+        self.feature, self.resolution, self.projection = feature, resolution, projection
+        self.extent, self.margin, self.share = extent, margin, share
+        self._paths = None
+
+    def get_paths(self):
+
+        if self._paths is None:
+            if self.share is not None:
+                self.set_paths(self.share.get_paths())
+            else:
+                self.set_paths(_natural_earth_paths(self.feature, self.resolution, self.projection, self.extent, self.margin))
+        return self._paths
+
+def add_natural_earth(ax, feature, resolution='110m', extent=None, margin=0.1, share=None, **kwargs):
+
+    '''
+    Draw a base map feature from the local cache as one PathCollection (kwargs: facecolor, edgecolor,
+    linewidth, zorder...). As with cartopy features, the geometries are only loaded when the figure is
+    drawn. resolution='auto' picks it from the map extent (natural_earth_resolution). With `extent`,
+    50m and 10m features are limited to the extent plus `margin`, clipped and cached per resolution
+    and extent. On PlateCarree axes the cached geometries are already in map coordinates; other
+    projections go through cartopy's project_geometry. `share` is a collection returned by an earlier
+    call for the same feature, projection and extent (e.g. another panel): its paths are reused.
+    '''
+
+    import cartopy.crs as ccrs
+
+    if resolution == 'auto':
+        resolution = natural_earth_resolution(extent if extent is not None else ax.get_extent(crs=ccrs.PlateCarree()))
+    if resolution not in NATURAL_EARTH_RESOLUTIONS:
+        raise ValueError(f"Resolution {resolution} not supported. Options: {NATURAL_EARTH_RESOLUTIONS + ['auto']}")
+
+    # Mesmos padrões das features do cartopy (linhas sem preenchimento, acima dos dados com zorder padrão)
+    kwargs.setdefault('facecolor', 'none')
+    kwargs.setdefault('zorder', 1.5)
+    collection = NaturalEarthCollection(feature, resolution, ax.projection, extent, margin, share, transform=ax.transData, **kwargs)
+    ax.add_collection(collection, autolim=False)
+
+    return collection
@@ -0,0 +1,146 @@
+
+# Nomes aceitos para as colunas de coordenadas das estações, na ordem de preferência
+STATION_COORDINATES = [('lon', 'lat'), ('longitude', 'latitude'), ('x', 'y')]
+
+def _station_arrays(data, value_column='valor'):
+
+    '''lon, lat and value arrays from a DataFrame / dict of arrays, without missing values'''
+
+    import numpy as np
+
+    for lon_name, lat_name in STATION_COORDINATES:
+        if lon_name in data and lat_name in data:
+            break
+    else:
+        raise ValueError('Station data must have lon/lat, longitude/latitude or x/y columns')
+
+    if value_column not in data:
+        raise ValueError(f"Station data has no column '{value_column}'")
+
+    lon = np.asarray(data[lon_name], dtype=float)
+    lat = np.asarray(data[lat_name], dtype=float)
+    values = np.asarray(data[value_column], dtype=float)
+    valid = np.isfinite(lon) & np.isfinite(lat) & np.isfinite(values)
+
+    return lon[valid], lat[valid], values[valid]
+
+def _to_xyz(lon, lat):
+
+    '''Points on the unit sphere: chord distances keep the nearest-neighbour order of great-circle distances'''
+
+    import numpy as np
+
+    lon, lat = np.deg2rad(lon), np.deg2rad(lat)
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def _nearest_stations(stations, targets, k, chunk_size=20000):
+
+    '''Distances and indexes (n_targets, k) of the k nearest stations: scipy cKDTree if available, else chunked numpy'''
+
+    import numpy as np
+
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        cKDTree = None
+
+    if cKDTree is not None:
+        distances, indexes = cKDTree(stations).query(targets, k=k)
+        return distances.reshape(len(targets), k), indexes.reshape(len(targets), k)
+
+    # Sem scipy: força bruta por blocos de pontos da grade (memória O(chunk_size * n_estações))
+    distances, indexes = np.empty((len(targets), k)), np.empty((len(targets), k), dtype=int)
+    for start in range(0, len(targets), chunk_size):
+        block = targets[start:start + chunk_size]
+        squared = np.maximum(2 - 2 * block @ stations.T, 0)
+        nearest = np.argpartition(squared, k - 1, axis=1)[:, :k] if k < len(stations) else np.tile(np.arange(len(stations)), (len(block), 1))
+        nearest_sq = np.take_along_axis(squared, nearest, axis=1)
+        order = np.argsort(nearest_sq, axis=1)
+        indexes[start:start + len(block)] = np.take_along_axis(nearest, order, axis=1)
+        distances[start:start + len(block)] = np.sqrt(np.take_along_axis(nearest_sq, order, axis=1))
+
+    return distances, indexes
+
+def _grid_coords(lon, lat, resolution, extent):
+
+    import numpy as np
+
+    if extent is None:
+        extent = [lon.min(), lon.max(), lat.min(), lat.max()]
+    lon_min, lon_max, lat_min, lat_max = extent
+
+    return np.arange(lon_min, lon_max + resolution / 2, resolution), np.arange(lat_min, lat_max + resolution / 2, resolution)
+
+def idw_to_grid(lon, lat, values, grid_lon, grid_lat, power=2, k=8, max_distance=None):
+
+    '''
+    Inverse distance weighting of station values onto a regular lat/lon grid using the k nearest
+    stations of each grid point (KD-tree on the unit sphere). Grid points farther than
+    `max_distance` degrees from every station are NaN. Returns a (lat, lon) DataArray.
+    '''
+
+    import numpy as np
+    import xarray as xr
+
+    values = np.asarray(values, dtype=float)
+    k = min(k, len(values))
+    lon_2d, lat_2d = np.meshgrid(grid_lon, grid_lat)
+
+    distances, indexes = _nearest_stations(_to_xyz(lon, lat), _to_xyz(lon_2d.ravel(), lat_2d.ravel()), k)
+    # Corda -> ângulo (graus) para que max_distance e a potência usem distâncias sobre a esfera
+    distances = np.degrees(2 * np.arcsin(np.clip(distances / 2, 0, 1)))
+
+    with np.errstate(divide='ignore'):
+        weights = 1.0 / distances ** power
+    if max_distance is not None:
+        weights[distances > max_distance] = 0
+
+    # Ponto da grade sobre uma estação: usa o valor da estação
+    exact = distances[:, 0] == 0
+    weights[exact] = 0
+    weights[exact, 0] = 1
+
+    total = weights.sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        field = (weights * values[indexes]).sum(axis=1) / total
+    field[total == 0] = np.nan
+
+    return xr.DataArray(field.reshape(lon_2d.shape), coords=[('latitude', np.asarray(grid_lat)), ('longitude', np.asarray(grid_lon))])
+
+def delaunay_to_grid(lon, lat, values, grid_lon, grid_lat):
+
+    '''
+    Linear interpolation of station values on their Delaunay triangulation (matplotlib.tri), evaluated
+    on the whole grid in one vectorized call. Points outside the convex hull of the stations are NaN.
+    '''
+
+    import numpy as np
+    import xarray as xr
+    import matplotlib.tri as mtri
+
+    triangulation = mtri.Triangulation(lon, lat)
+    lon_2d, lat_2d = np.meshgrid(grid_lon, grid_lat)
+    field = mtri.LinearTriInterpolator(triangulation, np.asarray(values, dtype=float))(lon_2d, lat_2d)
+
+    return xr.DataArray(np.ma.filled(field, np.nan), coords=[('latitude', np.asarray(grid_lat)), ('longitude', np.asarray(grid_lon))])
+
+def stations_to_grid(data, value_column='valor', method='idw', resolution=0.1, extent=None, **kwargs):
+
+    '''
+    Interpolate station data (DataFrame or dict of arrays with lon/lat and value_column) to a regular
+    grid of `resolution` degrees over `extent` (default: bounding box of the stations).
+    method: 'idw' (k nearest, power, max_distance kwargs) or 'linear' (Delaunay).
+    '''
+
+    lon, lat, values = _station_arrays(data, value_column)
+    grid_lon, grid_lat = _grid_coords(lon, lat, resolution, extent)
+
+    if method == 'idw':
+        field = idw_to_grid(lon, lat, values, grid_lon, grid_lat, power=kwargs.get('power', 2), k=kwargs.get('k', 8), max_distance=kwargs.get('max_distance', None))
+    elif method == 'linear':
+        field = delaunay_to_grid(lon, lat, values, grid_lon, grid_lat)
+    else:
+        raise ValueError(f"Interpolation method {method} not supported. Options: idw, linear")
+
+    field.name = value_column
+    return field
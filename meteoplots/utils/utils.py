@@ -1,4 +1,6 @@
 
+from collections import OrderedDict
+
 def calculate_mean_basin_value_from_shapefile(dataset, basin, shp, dim_lat='lat', dim_lon='lon'):
 
     import regionmask
@@ -13,6 +15,434 @@ def calculate_mean_basin_value_from_shapefile(dataset, basin, shp, dim_lat='lat'
 
     return mean_mask
 
+class LRUCache(OrderedDict):
+
+    '''Dict keeping at most `maxsize` entries: reading or writing a key makes it the most recent, the least recently used is dropped'''
+
+    def __init__(self, maxsize=128):
+
+        super().__init__()
+        self.maxsize = maxsize
+
+    def __getitem__(self, key):
+
+        value = super().__getitem__(key)
+        self.move_to_end(key)
+        return value
+
+    def __setitem__(self, key, value):
+
+        super().__setitem__(key, value)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+# Cache das permutações de longitude por (array de coordenadas, longitude central) -> (shift, índice, nova longitude)
+_LONGITUDE_PERMUTATIONS = LRUCache(maxsize=32)
+
+def _wrap_longitude(lon, central_longitude=0):
+
+    '''Longitudes moved by multiples of 360 into [central_longitude-180, central_longitude+180); values already inside are kept exactly'''
+
+    import numpy as np
+
+    west = central_longitude - 180
+
+    return lon - 360 * np.floor((np.asarray(lon, dtype=float) - west) / 360)
+
+def _longitude_permutation(lon, central_longitude=0):
+
+    '''Return (shift, index, new_lon) to take a longitude array to sorted [central_longitude-180, central_longitude+180), cached per coordinate array'''
+
+    import numpy as np
+
+    key = (lon.dtype.str, lon.tobytes(), float(central_longitude))
+    if key not in _LONGITUDE_PERMUTATIONS:
+
+        new_lon = _wrap_longitude(lon, central_longitude)
+
+        # Grade crescente: o corte da janela aparece como uma única queda, basta rotacionar o array
+        # (shift 0 quando nenhuma reordenação é necessária)
+        drops = np.flatnonzero(np.diff(new_lon) < 0)
+        shift = (len(lon) - drops[0] - 1) % len(lon) if len(drops) == 1 else 0
+        rolled = np.roll(new_lon, shift)
+
+        if np.all(np.diff(rolled) > 0):
+            _LONGITUDE_PERMUTATIONS[key] = (shift, None, rolled)
+        else:
+            # Grade irregular/desordenada: cai para a ordenação completa
+            index = np.argsort(new_lon, kind='stable')
+            _LONGITUDE_PERMUTATIONS[key] = (None, index, new_lon[index])
+
+    return _LONGITUDE_PERMUTATIONS[key]
+
+def normalize_longitude(xarray_data, dim_lon='longitude', central_longitude=0):
+
+    '''
+    Convert the longitude of a DataArray/Dataset to sorted [central_longitude-180, central_longitude+180),
+    so the data seam falls on the seam of a PlateCarree(central_longitude) map (-180-180 for the default
+    0, 0-360 for Pacific-centred maps with 180).
+
+    Data already inside the window (ends included) is returned as is, the same object. When only the
+    coordinate has to move (e.g. a 280-330 regional grid), the result is a new object with the new
+    coordinate over the same data arrays (assign_coords is a shallow copy). Grids that cross the
+    window edge are copied once: rotated (np.roll) when regular, gathered with argsort otherwise.
+    The permutation is cached per coordinate array, so every layer sharing the same grid
+    pays for it only once.
+    '''
+
+    lon = xarray_data[dim_lon].values
+
+    if lon.size == 0 or (lon.min() >= central_longitude - 180 and lon.max() <= central_longitude + 180):
+        return xarray_data
+
+    shift, index, new_lon = _longitude_permutation(lon, central_longitude)
+
+    if index is not None:
+        xarray_data = xarray_data.isel({dim_lon: index})
+    elif shift:
+        xarray_data = xarray_data.roll({dim_lon: shift}, roll_coords=False)
+
+    return xarray_data.assign_coords({dim_lon: new_lon})
+
+def normalize_extent(extent, central_longitude=0):
+
+    '''
+    Convert the longitudes of an extent [lon_min, lon_max, lat_min, lat_max] to the window
+    [central_longitude-180, central_longitude+180) used by normalize_longitude. lon_max is written as
+    lon_min plus the width of the extent, so extents crossing the dateline (e.g. [160, 200] or
+    [160, -160]) stay increasing; they fit inside the window (and match the data) when the map is
+    centred on the Pacific. Full-width extents become the whole window.
+    '''
+
+    lon_min, lon_max, lat_min, lat_max = extent
+
+    if lon_max - lon_min >= 360:
+        return (central_longitude - 180, central_longitude + 180, lat_min, lat_max)
+
+    # Desloca as duas bordas pelo mesmo múltiplo de 360 (lon_max < lon_min: extent escrito cruzando 180°)
+    offset = float(_wrap_longitude(lon_min, central_longitude)) - lon_min
+    if lon_max < lon_min:
+        lon_max = lon_max + 360
+
+    return (lon_min + offset, lon_max + offset, lat_min, lat_max)
+
+# Paletas de precipitação: ao reduzir a resolução usa o máximo do bloco para não suavizar os núcleos de chuva
+PRECIPITATION_PALETTES = ['tp', 'precipitation', 'acumulado_total', 'chuva_acumualada_merge', 'chuva_ons', 'chuva_pnmm', 'chuva_boletim_consumidores']
+
+def display_resolution(extent, figsize, dpi=100):
+
+    '''Degrees per pixel (lon, lat) of a map of extent [lon_min, lon_max, lat_min, lat_max] drawn on a figure of figsize inches at dpi'''
+
+    lon_min, lon_max, lat_min, lat_max = normalize_extent(extent)
+    width = (lon_max - lon_min) % 360 or 360
+
+    return width / (figsize[0] * dpi), (lat_max - lat_min) / (figsize[1] * dpi)
+
+def coarsen_to_display(xarray_data, extent, figsize, dpi=100, method='mean', dim_lat='latitude', dim_lon='longitude', pixels_per_cell=3, central_longitude=0):
+
+    '''
+    Crop a field to the map extent and block-reduce it (mean, or max for precipitation) to the
+    display resolution given by figsize, dpi and extent: cells smaller than `pixels_per_cell`
+    pixels add contouring cost but no visible detail. Grids already coarser are returned as is.
+    The field longitudes are expected from normalize_longitude with the same central_longitude.
+    '''
+
+    import numpy as np
+
+    if method not in ['mean', 'max']:
+        raise ValueError(f"method must be 'mean' or 'max', got {method}")
+
+    lat, lon = xarray_data[dim_lat].values, xarray_data[dim_lon].values
+    if len(lat) < 2 or len(lon) < 2:
+        return xarray_data
+
+    res_lon, res_lat = abs(float(lon[1] - lon[0])), abs(float(lat[1] - lat[0]))
+    pixel_lon, pixel_lat = display_resolution(extent, figsize, dpi)
+    # Tolerância para razões como 0.15 / 0.05 = 2.9999999999999996
+    factor_lon = max(1, int(pixel_lon * pixels_per_cell / res_lon + 1e-9))
+    factor_lat = max(1, int(pixel_lat * pixels_per_cell / res_lat + 1e-9))
+
+    if factor_lon == 1 and factor_lat == 1:
+        return xarray_data
+
+    # Recorta ao extent (com margem de 2 células grossas) antes de reduzir; longitudes na mesma janela de normalize_longitude
+    lon_min, lon_max, lat_min, lat_max = normalize_extent(extent, central_longitude)
+    if lon_min < lon_max:
+        margin_lon, margin_lat = 2 * factor_lon * res_lon, 2 * factor_lat * res_lat
+        rows = (lat >= lat_min - margin_lat) & (lat <= lat_max + margin_lat)
+        columns = (lon >= lon_min - margin_lon) & (lon <= lon_max + margin_lon)
+        if rows.any() and columns.any():
+            xarray_data = xarray_data.isel({dim_lat: np.flatnonzero(rows), dim_lon: np.flatnonzero(columns)})
+
+    factor_lat, factor_lon = min(factor_lat, xarray_data.sizes[dim_lat]), min(factor_lon, xarray_data.sizes[dim_lon])
+    coarse = xarray_data.coarsen({dim_lat: factor_lat, dim_lon: factor_lon}, boundary='trim', coord_func='mean')
+
+    return getattr(coarse, method)(keep_attrs=True)
+
+# Máscaras terra/mar já rasterizadas, por (resolução, grade)
+_LAND_SEA_MASKS = LRUCache(maxsize=16)
+
+def land_sea_mask(lon, lat, resolution='110m'):
+
+    '''
+    Boolean (lat, lon) array, True over land, of the Natural Earth land polygons rasterized on the grid
+    with regionmask. Computed once per grid and resolution: cached in memory and in
+    get_cache_dir('masks'), so new processes load it instead of rasterizing again.
+    '''
+
+    import hashlib
+    import os
+    import numpy as np
+
+    lon, lat = np.asarray(lon, dtype=float), np.asarray(lat, dtype=float)
+    key = hashlib.sha1(lon.tobytes() + b'|' + lat.tobytes()).hexdigest()
+
+    if (resolution, key) not in _LAND_SEA_MASKS:
+        path = os.path.join(get_cache_dir('masks'), f'land_{resolution}_{key}.npy')
+        if os.path.exists(path):
+            mask = np.load(path)
+        else:
+            import regionmask
+            from meteoplots.utils.geometry import land_geometries
+
+            mask = regionmask.Regions(land_geometries(resolution)).mask(lon, lat).notnull().values
+
+            # Escrita atômica: vários processos podem criar a mesma máscara ao mesmo tempo
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                np.save(f, mask)
+            os.replace(tmp_path, path)
+        _LAND_SEA_MASKS[(resolution, key)] = mask
+
+    return _LAND_SEA_MASKS[(resolution, key)]
+
+def mask_land_sea(xarray_data, mask='land', dim_lat='latitude', dim_lon='longitude', resolution='110m'):
+
+    '''Set the land (mask='land') or ocean (mask='ocean') cells of a field to NaN, using the cached land_sea_mask of its grid'''
+
+    import xarray as xr
+
+    if mask not in ['land', 'ocean']:
+        raise ValueError(f"mask must be 'land' or 'ocean', got {mask}")
+
+    land = land_sea_mask(xarray_data[dim_lon].values, xarray_data[dim_lat].values, resolution=resolution)
+    land = xr.DataArray(land, coords={dim_lat: xarray_data[dim_lat], dim_lon: xarray_data[dim_lon]}, dims=(dim_lat, dim_lon))
+
+    return xarray_data.where(~land if mask == 'land' else land)
+
+def gaussian_smooth(xarray_data, sigma, dim_lat='latitude', dim_lon='longitude'):
+
+    '''
+    Gaussian filter (sigma in grid cells) over the lat/lon dims, as separable 1D passes in numpy.
+    Missing values are ignored by the filter (normalized convolution) and kept as NaN.
+    '''
+
+    import numpy as np
+
+    if not sigma:
+        return xarray_data
+
+    radius = int(np.ceil(3 * sigma))
+    weights = np.exp(-0.5 * (np.arange(-radius, radius + 1) / sigma) ** 2)
+    weights /= weights.sum()
+
+    data = xarray_data.transpose(..., dim_lat, dim_lon)
+    values = np.asarray(data.values, dtype=float)
+    valid = np.isfinite(values)
+    smoothed, norm = np.where(valid, values, 0.0), valid.astype(float)
+
+    def convolve(array, axis):
+        pad = [(0, 0)] * array.ndim
+        pad[axis] = (radius, radius)
+        padded = np.pad(array, pad, mode='reflect' if array.shape[axis] > radius else 'edge')
+        out = np.zeros_like(array)
+        for k, weight in enumerate(weights):
+            out += weight * np.take(padded, np.arange(k, k + array.shape[axis]), axis=axis)
+        return out
+
+    for axis in (-2, -1):
+        smoothed, norm = convolve(smoothed, axis), convolve(norm, axis)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        smoothed /= norm
+    smoothed[~valid] = np.nan
+
+    return data.copy(data=smoothed).transpose(*xarray_data.dims)
+
+def _chaikin(points, iterations, closed):
+
+    '''Chaikin corner cutting of a polyline (N, 2); open lines keep their end points'''
+
+    import numpy as np
+
+    for _ in range(iterations):
+        if len(points) < 3:
+            break
+        following = np.roll(points, -1, axis=0) if closed else points[1:]
+        current = points if closed else points[:-1]
+        cut = np.empty((2 * len(current), 2))
+        cut[0::2] = 0.75 * current + 0.25 * following
+        cut[1::2] = 0.25 * current + 0.75 * following
+        points = cut if closed else np.vstack([points[:1], cut, points[-1:]])
+
+    return points
+
+def smooth_contour_paths(contour_set, iterations=2):
+
+    '''
+    Smooth the lines of a ContourSet in place with Chaikin corner cutting (each iteration
+    doubles the vertices). Only the generated paths are touched, not the field.
+    '''
+
+    import numpy as np
+    from matplotlib.path import Path
+
+    if not iterations:
+        return contour_set
+
+    new_paths = []
+    for path in contour_set.get_paths():
+
+        if path.codes is None or len(path.vertices) == 0:
+            new_paths.append(path)
+            continue
+
+        starts = np.flatnonzero(path.codes == Path.MOVETO)
+        vertices, codes = [], []
+        for start, end in zip(starts, list(starts[1:]) + [len(path.codes)]):
+
+            closed = path.codes[end - 1] == Path.CLOSEPOLY
+            points = path.vertices[start:end - 1] if closed else path.vertices[start:end]
+            points = _chaikin(points, iterations, closed)
+
+            segment_codes = np.full(len(points), Path.LINETO, dtype=Path.code_type)
+            segment_codes[0] = Path.MOVETO
+            if closed:
+                points = np.vstack([points, points[:1]])
+                segment_codes = np.append(segment_codes, Path.CLOSEPOLY)
+
+            vertices.append(points)
+            codes.append(segment_codes)
+
+        new_paths.append(Path(np.vstack(vertices), np.concatenate(codes)))
+
+    contour_set.set_paths(new_paths)
+
+    return contour_set
+
+def _grid_add(grid, cell, point):
+
+    '''Index a point (x, y) in a uniform grid: dict of cell -> points'''
+
+    grid.setdefault((int(point[0] // cell), int(point[1] // cell)), []).append(point)
+
+def _grid_near(grid, cell, point, distance):
+
+    '''Whether a point of the grid (see _grid_add) is closer than `distance` to `point`, looking only at the cells within reach'''
+
+    import math
+
+    reach = math.ceil(distance / cell)
+    i, j = int(point[0] // cell), int(point[1] // cell)
+    for a in range(i - reach, i + reach + 1):
+        for b in range(j - reach, j + reach + 1):
+            for x, y in grid.get((a, b), ()):
+                if math.hypot(x - point[0], y - point[1]) < distance:
+                    return True
+
+    return False
+
+def place_contour_labels(contour_set, fmt='%.0f', fontsize=15, colors=None, spacing=250, zorder=None):
+
+    '''
+    Fast alternative to clabel: labels at evenly spaced positions along each contour line, at least
+    `spacing` pixels apart on screen within a level (one label width between levels). Positions and angles are computed vectorized per level from
+    the path vertices; lines are not broken, the text gets a white halo instead. Placed labels are indexed
+    in uniform grids (as in select_non_overlapping), so each spacing test only looks at the neighbouring cells.
+    '''
+
+    import numpy as np
+    import matplotlib.patheffects as path_effects
+    from matplotlib.colors import to_rgba_array
+    from matplotlib.path import Path
+
+    ax = contour_set.axes
+    transform = contour_set.get_transform()
+    label_colors = to_rgba_array(colors if colors is not None else contour_set.get_edgecolor())
+    x_min, y_min, x_max, y_max = ax.bbox.extents
+    halo = [path_effects.withStroke(linewidth=3, foreground='white')]
+
+    labels = [fmt % level if isinstance(fmt, str) else fmt(level) for level in contour_set.levels]
+    widths = [len(label) * fontsize * 0.6 * ax.figure.dpi / 72 for label in labels]
+
+    # Rótulos já colocados: todos os níveis (célula = maior largura) e o nível atual (célula = spacing)
+    placed, placed_cell = {}, max(widths + [1.0])
+    level_cell = max(float(spacing), 1.0)
+
+    texts = []
+    for i, (label, width, path) in enumerate(zip(labels, widths, contour_set.get_paths())):
+
+        if len(path.vertices) < 2:
+            continue
+
+        screen = transform.transform(path.vertices)
+        codes = path.codes if path.codes is not None else np.full(len(screen), Path.LINETO)
+        starts = np.flatnonzero(codes == Path.MOVETO) if codes[0] == Path.MOVETO else np.array([0])
+        ends = np.append(starts[1:], len(screen))
+
+        # Comprimento acumulado em pixels, sem contar o salto entre linhas (MOVETO)
+        step = np.hypot(*np.diff(screen, axis=0).T)
+        step[starts[1:] - 1] = 0
+        arc = np.concatenate([[0], np.cumsum(step)])
+        length = arc[ends - 1] - arc[starts]
+
+        # Linhas curtas demais para o texto ficam sem rótulo; as demais recebem round(L / spacing) rótulos
+        counts = np.where(length >= 1.5 * width, np.maximum(1, np.round(length / spacing)), 0).astype(int)
+        if counts.sum() == 0:
+            continue
+
+        piece = np.repeat(np.arange(len(starts)), counts)
+        order = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        target = arc[starts[piece]] + (order + 0.5) * length[piece] / counts[piece]
+
+        index = np.clip(np.searchsorted(arc, target, side='right') - 1, starts[piece], ends[piece] - 2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.nan_to_num((target - arc[index]) / step[index])[:, None]
+        position = screen[index] + fraction * (screen[index + 1] - screen[index])
+        anchor = path.vertices[index] + fraction * (path.vertices[index + 1] - path.vertices[index])
+        delta = screen[index + 1] - screen[index]
+        angle = (np.degrees(np.arctan2(delta[:, 1], delta[:, 0])) + 90) % 180 - 90
+
+        inside = (position[:, 0] >= x_min) & (position[:, 0] <= x_max) & (position[:, 1] >= y_min) & (position[:, 1] <= y_max)
+        color = label_colors[i % len(label_colors)]
+
+        # Espaçamento `spacing` entre rótulos do mesmo nível e de uma largura de rótulo entre níveis
+        same_level = {}
+        for k in np.flatnonzero(inside):
+            point = tuple(position[k])
+            if _grid_near(same_level, level_cell, point, spacing) or _grid_near(placed, placed_cell, point, width):
+                continue
+            _grid_add(same_level, level_cell, point)
+            _grid_add(placed, placed_cell, point)
+            texts.append(ax.text(anchor[k, 0], anchor[k, 1], label, transform=transform, fontsize=fontsize, color=color,
+                                 rotation=angle[k], rotation_mode='anchor', ha='center', va='center', clip_on=True,
+                                 path_effects=halo, zorder=zorder if zorder is not None else contour_set.get_zorder() + 0.1))
+
+    return texts
+
+def get_cache_dir(*subdirs):
+
+    '''Return (creating it) the meteoplots cache directory: $METEOPLOTS_CACHE_DIR or ~/.cache/meteoplots'''
+
+    import os
+
+    base = os.environ.get('METEOPLOTS_CACHE_DIR') or os.path.join(os.path.expanduser('~'), '.cache', 'meteoplots')
+    path = os.path.join(base, *subdirs)
+    os.makedirs(path, exist_ok=True)
+
+    return path
+
 def figures_panel(path_figs, output_file='panel.png', path_to_save='./tmp/paineis/', img_size=(6,6), ncols=None, nrows=None):
 
     import matplotlib.pyplot as plt 
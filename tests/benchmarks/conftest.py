@@ -0,0 +1,187 @@
+"""
+Fixtures and harness for the meteoplots benchmark suite.
+
+The benchmarks run offline on synthetic data. Each benchmark records the median
+wall time and the peak traced memory (tracemalloc) and compares them with the
+values stored in ``baselines.json``:
+
+    pytest tests/benchmarks --run-benchmarks --no-cov
+    pytest tests/benchmarks --run-benchmarks --no-cov --update-benchmark-baselines
+"""
+
+import json
+import os
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pytest
+import xarray as xr
+
+BASELINES_FILE = Path(__file__).parent / 'baselines.json'
+
+# Grid resolutions (degrees) covered by the suite
+RESOLUTIONS = [1.0, 0.25, 0.1]
+
+# Default region of the plots (South America)
+BENCHMARK_EXTENT = [-75, -30, -35, 10]
+
+# State-level region of the zoomed map benchmarks
+ZOOMED_EXTENT = [-53, -44, -26, -19]
+
+_RESULTS = {}
+
+
+def make_grid(resolution, extent=BENCHMARK_EXTENT, seed=0):
+    """Create smooth synthetic meteorological fields on a regular lat/lon grid."""
+    rng = np.random.default_rng(seed)
+    lat = np.arange(extent[2], extent[3] + resolution / 2, resolution)
+    lon = np.arange(extent[0], extent[1] + resolution / 2, resolution)
+    lon_grid, lat_grid = np.meshgrid(np.deg2rad(lon), np.deg2rad(lat))
+
+    wave = np.sin(3 * lon_grid) * np.cos(2 * lat_grid)
+    noise = rng.standard_normal(lon_grid.shape) * 0.05
+    coords = [('latitude', lat), ('longitude', lon)]
+
+    return {
+        'temperature': xr.DataArray(25 + 8 * wave + noise, coords=coords),
+        'pressure': xr.DataArray(1013 + 12 * np.cos(2 * lon_grid) * np.sin(3 * lat_grid) + noise, coords=coords),
+        'precipitation': xr.DataArray(np.clip(60 * wave + 20 * noise, 0, None), coords=coords),
+        'u': xr.DataArray(10 * np.cos(2 * lat_grid) * np.sin(lon_grid) + noise, coords=coords),
+        'v': xr.DataArray(10 * np.sin(2 * lon_grid) * np.cos(lat_grid) + noise, coords=coords),
+    }
+
+
+def load_baselines():
+    if BASELINES_FILE.exists():
+        return json.loads(BASELINES_FILE.read_text())
+    return {}
+
+
+class BenchmarkRunner:
+    """Time (median of rounds) and memory-profile (peak traced memory) a callable."""
+
+    def __init__(self, request):
+        self.name = request.node.name
+        self.config = request.config
+        self.baselines = load_baselines()
+
+    def __call__(self, func, setup=None, rounds=3):
+
+        times = []
+        for _ in range(rounds):
+            args = setup() if setup is not None else ()
+            start = time.perf_counter()
+            func(*args)
+            times.append(time.perf_counter() - start)
+
+        # Rodada separada para memória (tracemalloc deixa a execução mais lenta)
+        args = setup() if setup is not None else ()
+        tracemalloc.start()
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        result = {'time_s': round(statistics.median(times), 4), 'peak_mb': round(peak / 2**20, 2)}
+        _RESULTS[self.name] = result
+        self.check_regression(result)
+
+        return result
+
+    def check_regression(self, result):
+
+        baseline = self.baselines.get(self.name)
+        if baseline is None or self.config.getoption('--update-benchmark-baselines'):
+            return
+
+        time_threshold = self.config.getoption('--benchmark-time-threshold')
+        memory_threshold = self.config.getoption('--benchmark-memory-threshold')
+
+        assert result['time_s'] <= baseline['time_s'] * time_threshold, (
+            f"{self.name}: {result['time_s']:.3f}s is slower than baseline {baseline['time_s']:.3f}s x {time_threshold}")
+        assert result['peak_mb'] <= baseline['peak_mb'] * memory_threshold + 1, (
+            f"{self.name}: peak {result['peak_mb']:.1f} MB exceeds baseline {baseline['peak_mb']:.1f} MB x {memory_threshold}")
+
+
+@pytest.fixture
+def bench(request):
+    """Provide the benchmark runner for the current test."""
+    return BenchmarkRunner(request)
+
+
+@pytest.fixture(params=RESOLUTIONS, ids=lambda res: f'{res}deg')
+def grid(request):
+    """Synthetic fields at 1°, 0.25° and 0.1° resolution."""
+    return make_grid(request.param)
+
+
+@pytest.fixture
+def offline_ax(matplotlib_backend):
+    """Factory for a GeoAxes without Natural Earth features (no network needed)."""
+    import cartopy.crs as ccrs
+    import matplotlib.pyplot as plt
+
+    def factory():
+        fig = plt.figure(figsize=(12, 12))
+        ax = plt.axes(projection=ccrs.PlateCarree())
+        ax.set_extent(BENCHMARK_EXTENT, crs=ccrs.PlateCarree())
+        return fig, ax
+
+    yield factory
+    plt.close('all')
+
+
+@pytest.fixture
+def zoomed_ax(matplotlib_backend):
+    """Factory for a GeoAxes zoomed to ZOOMED_EXTENT, without Natural Earth features."""
+    import cartopy.crs as ccrs
+    import matplotlib.pyplot as plt
+
+    def factory():
+        fig = plt.figure(figsize=(12, 12))
+        ax = plt.axes(projection=ccrs.PlateCarree())
+        ax.set_extent(ZOOMED_EXTENT, crs=ccrs.PlateCarree())
+        return fig, ax
+
+    yield factory
+    plt.close('all')
+
+
+@pytest.fixture
+def natural_earth_cache(tmp_path, monkeypatch):
+    """Factory writing a synthetic Natural Earth feature (random global lines) to a temporary meteoplots cache."""
+    from shapely import wkb
+    from shapely.geometry import GeometryCollection, LineString
+
+    monkeypatch.setenv('METEOPLOTS_CACHE_DIR', str(tmp_path))
+    path = tmp_path / 'natural_earth'
+    path.mkdir()
+    rng = np.random.default_rng(0)
+
+    def factory(feature, resolution, n_lines, n_vertices, step):
+        lines = [LineString(np.cumsum(rng.normal(0, step, (n_vertices, 2)), axis=0) + rng.uniform([-180, -60], [180, 60])) for _ in range(n_lines)]
+        (path / f'{feature}_{resolution}_lon0.wkb').write_bytes(wkb.dumps(GeometryCollection(lines)))
+
+    return factory
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+
+    if not _RESULTS:
+        return
+
+    baselines = load_baselines()
+    terminalreporter.section('meteoplots benchmarks')
+    terminalreporter.write_line(f"{'benchmark':<45} {'time (s)':>9} {'base (s)':>9} {'peak (MB)':>10} {'base (MB)':>10}")
+    for name, result in sorted(_RESULTS.items()):
+        baseline = baselines.get(name, {})
+        terminalreporter.write_line(
+            f"{name:<45} {result['time_s']:>9.3f} {baseline.get('time_s', float('nan')):>9.3f} "
+            f"{result['peak_mb']:>10.1f} {baseline.get('peak_mb', float('nan')):>10.1f}")
+
+    if config.getoption('--update-benchmark-baselines'):
+        baselines.update(_RESULTS)
+        BASELINES_FILE.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + os.linesep)
+        terminalreporter.write_line(f'Baselines updated in {BASELINES_FILE}')
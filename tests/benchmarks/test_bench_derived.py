@@ -0,0 +1,43 @@
+"""
+Benchmarks of the derived fields at 0.25° global resolution (721 x 1440).
+"""
+
+import pytest
+import xarray as xr
+
+from meteoplots.utils.derived import wind_speed, vorticity, divergence, integrated_vapor_transport
+
+from .conftest import make_grid
+
+pytestmark = pytest.mark.benchmark
+
+GLOBAL_EXTENT = [0, 359.75, -90, 90]
+
+LEVELS = [1000, 925, 850, 700, 500, 300]
+
+
+@pytest.fixture(scope='module')
+def global_grid():
+    """Synthetic fields on the 0.25° global grid."""
+    return make_grid(0.25, extent=GLOBAL_EXTENT)
+
+
+class TestBenchmarkDerived:
+    """Benchmarks of the derived-fields module."""
+
+    def test_wind_speed_global(self, bench, global_grid):
+        bench(lambda: wind_speed(global_grid['u'], global_grid['v']))
+
+    def test_vorticity_global(self, bench, global_grid):
+        bench(lambda: vorticity(global_grid['u'], global_grid['v']))
+
+    def test_divergence_global(self, bench, global_grid):
+        bench(lambda: divergence(global_grid['u'], global_grid['v']))
+
+    def test_ivt_global(self, bench, global_grid):
+        level = xr.DataArray(LEVELS, dims='level', coords={'level': LEVELS})
+        q = (global_grid['temperature'] / 2500) * (level / 1000)
+        u = global_grid['u'] * (1 + level / 1000)
+        v = global_grid['v'] * (1 + level / 1000)
+
+        bench(lambda: integrated_vapor_transport(q, u, v), rounds=2)
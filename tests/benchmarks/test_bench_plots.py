@@ -0,0 +1,346 @@
+"""
+Benchmarks of the meteoplots plotting functions at 1°, 0.25° and 0.1° resolutions.
+"""
+
+import numpy as np
+import pytest
+import geopandas as gpd
+import matplotlib.pyplot as plt
+import cartopy.crs as ccrs
+from shapely.geometry import box
+
+from meteoplots.plots import (
+    add_box_to_plot,
+    add_text_annotations,
+    plot_contourf_from_xarray,
+    plot_contour_from_xarray,
+    plot_quiver_from_xarray,
+    plot_streamplot_from_xarray,
+    plot_multipletypes_from_xarray,
+)
+from meteoplots.utils.utils import calculate_mean_basin_value_from_shapefile, figures_panel
+
+from .conftest import BENCHMARK_EXTENT, ZOOMED_EXTENT, make_grid
+
+pytestmark = pytest.mark.benchmark
+
+
+class TestBenchmarkPlots:
+    """Benchmarks of the plot functions (plot + save to PNG)."""
+
+    def test_contourf(self, bench, grid, offline_ax, tmp_path):
+        bench(lambda fig, ax: plot_contourf_from_xarray(grid['precipitation'], plot_var_colorbar='tp', fig=fig, ax=ax, path_save=str(tmp_path)),
+              setup=offline_ax)
+
+    def test_contour(self, bench, grid, offline_ax, tmp_path):
+        bench(lambda fig, ax: plot_contour_from_xarray(grid['pressure'], contour_levels=[range(1000, 1026, 2)], fig=fig, ax=ax, path_save=str(tmp_path)),
+              setup=offline_ax)
+
+    def test_quiver(self, bench, grid, offline_ax, tmp_path):
+        skip = max(1, round(1 / float(grid['u'].longitude[1] - grid['u'].longitude[0])))
+        bench(lambda fig, ax: plot_quiver_from_xarray(grid['u'], grid['v'], quiver_skip=skip, fig=fig, ax=ax, path_save=str(tmp_path)),
+              setup=offline_ax)
+
+    def test_streamplot(self, bench, grid, offline_ax, tmp_path):
+        bench(lambda fig, ax: plot_streamplot_from_xarray(grid['u'], grid['v'], fig=fig, ax=ax, path_save=str(tmp_path)),
+              setup=offline_ax, rounds=1)
+
+    def test_multipletypes(self, bench, grid, offline_ax, tmp_path):
+        data = {'contourf': grid['temperature'], 'contour': grid['pressure'], 'u_quiver': grid['u'], 'v_quiver': grid['v']}
+        skip = max(1, round(1 / float(grid['u'].longitude[1] - grid['u'].longitude[0])))
+        bench(lambda fig, ax: plot_multipletypes_from_xarray(data, plot_var_colorbar='temperature', plot_types=['contourf', 'contour', 'quiver'],
+                                                             contour_levels=[range(1000, 1026, 2)], quiver_skip=skip,
+                                                             fig=fig, ax=ax, path_save=str(tmp_path)),
+              setup=offline_ax)
+
+
+@pytest.fixture(scope='module')
+def merge_grid():
+    """0.05° precipitation field, as the MERGE product."""
+    return make_grid(0.05)['precipitation']
+
+
+def render_contourf(data, fig, ax, **kwargs):
+    plot_contourf_from_xarray(data, plot_var_colorbar='tp', extent=BENCHMARK_EXTENT, fig=fig, ax=ax, savefigure=False, **kwargs)
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[..., :3]
+
+
+class TestBenchmarkCoarsen:
+    """Contourf of a 0.05° grid with and without coarsening to the display resolution."""
+
+    @pytest.mark.parametrize('coarsen', [False, True], ids=['full', 'coarsened'])
+    def test_contourf_merge(self, bench, merge_grid, offline_ax, coarsen):
+        bench(lambda fig, ax: render_contourf(merge_grid, fig, ax, coarsen=coarsen), setup=offline_ax)
+
+    def test_coarsen_visual_difference(self, merge_grid, offline_ax):
+        # Tempos medidos por test_contourf_merge[full|coarsened] e comparados aos baselines
+        images = {}
+        for coarsen in [False, True]:
+            fig, ax = offline_ax()
+            images[coarsen] = render_contourf(merge_grid, fig, ax, coarsen=coarsen)
+
+        # Fração de pixels com cor diferente entre a figura completa e a reduzida
+        difference = np.any(images[False] != images[True], axis=-1).mean()
+        print(f'\npixels changed by coarsening: {100 * difference:.1f}%')
+
+        assert difference < 0.05
+
+
+class TestBenchmarkContourSmoothing:
+    """Smoothed pressure contours: field filter or path smoothing vs upsampling the whole grid."""
+
+    @pytest.mark.parametrize('smoothing', ['raw', 'gaussian', 'chaikin', 'upsampled'])
+    def test_contour_smoothing(self, bench, grid, offline_ax, smoothing):
+        data, kwargs = grid['pressure'], {}
+        if smoothing == 'gaussian':
+            kwargs['smooth_sigma'] = 1
+        elif smoothing == 'chaikin':
+            kwargs['smooth_paths'] = 2
+        elif smoothing == 'upsampled':
+            # Alternativa antiga: interpolar a grade inteira para 4x a resolução
+            step = float(data.longitude[1] - data.longitude[0]) / 4
+            data = data.interp(latitude=np.arange(float(data.latitude[0]), float(data.latitude[-1]), step),
+                               longitude=np.arange(float(data.longitude[0]), float(data.longitude[-1]), step), method='cubic')
+
+        bench(lambda fig, ax: plot_contour_from_xarray(data, contour_levels=[range(1000, 1026, 2)], extent=BENCHMARK_EXTENT,
+                                                       fig=fig, ax=ax, savefigure=False, **kwargs),
+              setup=offline_ax)
+
+
+class TestBenchmarkContourLabels:
+    """Pressure contours labelled with clabel (inline) vs the precomputed label positions."""
+
+    @pytest.mark.parametrize('label_method', ['clabel', 'fast'])
+    def test_contour_labels(self, bench, grid, offline_ax, label_method):
+        def render(fig, ax):
+            plot_contour_from_xarray(grid['pressure'], contour_levels=[range(1000, 1026, 2)], extent=BENCHMARK_EXTENT,
+                                     label_method=label_method, fig=fig, ax=ax, savefigure=False)
+            fig.canvas.draw()
+
+        bench(render, setup=offline_ax)
+
+
+@pytest.fixture(scope='module')
+def stations():
+    """3000 rain-gauge stations over the benchmark region."""
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    n = 3000
+    return pd.DataFrame({'lon': rng.uniform(BENCHMARK_EXTENT[0], BENCHMARK_EXTENT[1], n),
+                         'lat': rng.uniform(BENCHMARK_EXTENT[2], BENCHMARK_EXTENT[3], n),
+                         'text': rng.integers(0, 150, n).astype(str)})
+
+
+class TestBenchmarkAnnotations:
+    """3000 station labels: list of dicts (one Text each) vs columnar input (single collection)."""
+
+    @pytest.mark.parametrize('columnar', [False, True], ids=['list', 'columnar'])
+    def test_station_labels(self, bench, stations, offline_ax, columnar):
+        texts = stations if columnar else stations.to_dict('records')
+
+        def render(fig, ax):
+            add_text_annotations(ax, texts, text_fontsize=6)
+            fig.canvas.draw()
+
+        bench(render, setup=offline_ax)
+
+    @pytest.mark.parametrize('n_labels', [3000, 30000])
+    def test_select_non_overlapping(self, bench, n_labels):
+        from meteoplots.utils.annotations import select_non_overlapping
+
+        rng = np.random.default_rng(0)
+        origin = rng.uniform(0, 1200, (n_labels, 2))
+        boxes = np.hstack([origin, origin + [18, 8]])
+
+        bench(lambda: select_non_overlapping(boxes, priority=rng.random(n_labels)))
+
+
+class TestBenchmarkBoxes:
+    """Grid of 900 verification boxes with per-box colors and labels."""
+
+    def test_verification_boxes(self, bench, offline_ax):
+        extent_boxes = [[lon, lon + 1.5, lat, lat + 1.5] for lon in np.arange(-75, -30, 1.5) for lat in np.arange(-35, 10, 1.5)]
+        colors = plt.cm.RdBu(np.linspace(0, 1, len(extent_boxes)))
+
+        def render(fig, ax):
+            add_box_to_plot(ax, extent_boxes, facecolor_box=colors, labels_box=[str(i) for i in range(len(extent_boxes))])
+            fig.canvas.draw()
+
+        bench(render, setup=offline_ax)
+
+
+@pytest.fixture(scope='module')
+def dense_basins():
+    """200 basins with 2000-vertex boundaries, as detailed hydrographic shapefiles."""
+    from shapely.geometry import Point
+
+    centers = [(lon, lat) for lon in np.arange(-72, -32, 4) for lat in np.arange(-33, 7, 2)]
+    rng = np.random.default_rng(0)
+    return gpd.GeoDataFrame({'Nome_Bacia': [f'bacia_{i}' for i in range(len(centers))], 'valor': rng.gamma(2, 15, len(centers))},
+                            geometry=[Point(center).buffer(0.9, resolution=500) for center in centers], crs='EPSG:4326')
+
+
+class TestBenchmarkChoropleth:
+    """Basin choropleth: GeoDataFrame.plot at full resolution vs one collection of cached simplified paths."""
+
+    @pytest.mark.parametrize('method', ['geopandas', 'choropleth'])
+    def test_basin_choropleth(self, bench, dense_basins, offline_ax, method):
+        from meteoplots.colorbar.colorbars import custom_colorbar, palette_norm
+        from meteoplots.plots import plot_choropleth_from_geodataframe
+
+        def render(fig, ax):
+            if method == 'geopandas':
+                levels, colors, cmap, _ = custom_colorbar('chuva_ons_geodataframe')
+                cmap, norm = palette_norm(levels, colors, cmap)
+                dense_basins.plot(ax=ax, column='valor', cmap=cmap, norm=norm, edgecolor='black', linewidth=0.5, transform=ccrs.PlateCarree())
+            else:
+                plot_choropleth_from_geodataframe(dense_basins, 'chuva_ons_geodataframe', extent=BENCHMARK_EXTENT, fig=fig, ax=ax, savefigure=False)
+            fig.canvas.draw()
+
+        bench(render, setup=offline_ax)
+
+
+class TestBenchmarkOverlays:
+    """Overlay shapefile with 400k vertices: GeoDataFrame.plot vs display-scale simplification."""
+
+    @pytest.mark.parametrize('simplify', [False, True], ids=['full', 'simplified'])
+    def test_shapefile_overlay(self, bench, dense_basins, offline_ax, tmp_path, simplify):
+        from meteoplots.plots import add_shapefiles_to_plot
+
+        path = tmp_path / 'bacias.shp'
+        dense_basins.to_file(path)
+
+        def render(fig, ax):
+            if simplify:
+                add_shapefiles_to_plot(ax, [str(path)], extent=BENCHMARK_EXTENT)
+            else:
+                gpd.read_file(path).plot(ax=ax, facecolor='none', edgecolor='black', linewidths=1, alpha=0.5, transform=ccrs.PlateCarree())
+            fig.savefig(tmp_path / 'overlay.png')
+
+        bench(render, setup=offline_ax)
+
+
+class TestBenchmarkClipping:
+    """Zoomed state-level map with the whole-region overlay: drawn in full vs indexed and clipped to the extent."""
+
+    @pytest.mark.parametrize('clip', [False, True], ids=['full', 'clipped'])
+    def test_zoomed_overlay(self, bench, dense_basins, zoomed_ax, tmp_path, clip):
+        from meteoplots.plots import add_shapefiles_to_plot
+
+        path = tmp_path / 'bacias.shp'
+        dense_basins.to_file(path)
+
+        def render(fig, ax):
+            add_shapefiles_to_plot(ax, [str(path)], extent=ZOOMED_EXTENT, clip_shapefiles=clip)
+            fig.savefig(tmp_path / 'zoomed.png')
+            plt.close(fig)
+
+        bench(render, setup=zoomed_ax)
+
+
+class TestBenchmarkLandSeaMask:
+    """contourf with the oceans masked on the data side (cached rasterized mask) instead of an OCEAN feature layer."""
+
+    def test_contourf_masked_oceans(self, bench, grid, offline_ax, tmp_path, monkeypatch):
+        from shapely.geometry import Point
+        from meteoplots.utils import geometry
+
+        # Continente sintético (sem Natural Earth offline), com a densidade de vértices do 110m
+        continent = Point(-55, -12).buffer(18, resolution=250)
+        monkeypatch.setattr(geometry, 'land_geometries', lambda resolution='110m': [continent])
+        monkeypatch.setenv('METEOPLOTS_CACHE_DIR', str(tmp_path))
+
+        bench(lambda fig, ax: plot_contourf_from_xarray(grid['precipitation'], plot_var_colorbar='tp', mask_oceans=True, mask_method='data',
+                                                        fig=fig, ax=ax, path_save=str(tmp_path)),
+              setup=offline_ax)
+
+
+class TestBenchmarkBaseMap:
+    """Base map of a fresh worker process from the local Natural Earth cache (no shapefile parsing, no network)."""
+
+    def test_base_ax_cold_cache(self, bench, matplotlib_backend, natural_earth_cache):
+        from meteoplots.plots import get_base_ax
+        from meteoplots.utils import natural_earth
+
+        # Cache com a ordem de grandeza do 110m (≈ 5 mil vértices de costa, 1 mil de fronteiras)
+        natural_earth_cache('coastline', '110m', n_lines=130, n_vertices=40, step=0.5)
+        natural_earth_cache('borders', '110m', n_lines=180, n_vertices=6, step=0.5)
+
+        def cold_start():
+            # Processo novo: caches em memória vazios
+            natural_earth._GEOMETRIES.clear()
+            natural_earth._PATH_ARRAYS.clear()
+            natural_earth._FRAMES.clear()
+            return ()
+
+        def render():
+            fig, ax = get_base_ax(extent=BENCHMARK_EXTENT, figsize=(12, 12))
+            fig.canvas.draw()
+            plt.close(fig)
+
+        bench(render, setup=cold_start)
+
+    @pytest.mark.parametrize('clip', [False, True], ids=['global', 'clipped'])
+    def test_zoomed_coastline_10m(self, bench, zoomed_ax, natural_earth_cache, tmp_path, clip):
+        from meteoplots.utils.natural_earth import add_natural_earth
+
+        # Costa global com a ordem de grandeza do 10m (≈ 400 mil vértices)
+        natural_earth_cache('coastline', '10m', n_lines=2000, n_vertices=200, step=0.05)
+
+        def render(fig, ax):
+            add_natural_earth(ax, 'coastline', '10m', extent=ZOOMED_EXTENT if clip else None, edgecolor='black')
+            fig.savefig(tmp_path / 'zoomed.png')
+            plt.close(fig)
+
+        bench(render, setup=zoomed_ax)
+
+
+class TestBenchmarkStations:
+    """Gridding of station data (IDW with KD-tree and Delaunay linear) at the suite resolutions."""
+
+    @pytest.mark.parametrize('method', ['idw', 'linear'])
+    def test_stations_to_grid(self, bench, grid, method):
+        import pandas as pd
+        from meteoplots.utils.stations import stations_to_grid
+
+        rng = np.random.default_rng(0)
+        n = 20000
+        stations = pd.DataFrame({'lon': rng.uniform(BENCHMARK_EXTENT[0], BENCHMARK_EXTENT[1], n),
+                                 'lat': rng.uniform(BENCHMARK_EXTENT[2], BENCHMARK_EXTENT[3], n),
+                                 'valor': rng.gamma(2, 10, n)})
+        resolution = float(grid['precipitation'].longitude[1] - grid['precipitation'].longitude[0])
+
+        bench(lambda: stations_to_grid(stations, method=method, resolution=resolution, extent=BENCHMARK_EXTENT))
+
+
+class TestBenchmarkUtils:
+    """Benchmarks of basin means and panels."""
+
+    def test_basin_means(self, bench, grid):
+        # 5 x 4 bacias retangulares cobrindo a região
+        basins = [box(lon, lat, lon + 5, lat + 5) for lon in range(-60, -35, 5) for lat in range(-30, -10, 5)]
+        shp = gpd.GeoDataFrame({'Nome_Bacia': [f'bacia_{i}' for i in range(len(basins))], 'geometry': basins}, crs='EPSG:4326')
+
+        def basin_means():
+            for basin in shp['Nome_Bacia']:
+                calculate_mean_basin_value_from_shapefile(grid['precipitation'], basin=basin, shp=shp, dim_lat='latitude', dim_lon='longitude')
+
+        bench(basin_means)
+
+    @pytest.mark.parametrize('n_images', [4, 8])
+    def test_figures_panel(self, bench, tmp_path, n_images):
+        paths = []
+        for i in range(n_images):
+            fig, ax = plt.subplots(figsize=(6, 6))
+            ax.imshow([[i, 1], [1, i]])
+            paths.append(str(tmp_path / f'img_{i}.png'))
+            fig.savefig(paths[-1], dpi=100)
+            plt.close(fig)
+
+        def panel():
+            figures_panel(paths, output_file='panel.png', path_to_save=str(tmp_path))
+            plt.close('all')
+
+        bench(panel, rounds=2)
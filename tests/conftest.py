@@ -93,6 +93,41 @@ def sample_wind_components():
     return u_component, v_component
 
 
+@pytest.fixture
+def sample_ensemble_data():
+    """Create sample ensemble precipitation data with a member dimension."""
+    lat = np.arange(-35, 10, 1.0)
+    lon = np.arange(-75, -30, 1.0)
+    member = np.arange(5)
+
+    precip_data = np.random.exponential(10, (len(member), len(lat), len(lon)))
+
+    precipitation = xr.DataArray(
+        precip_data,
+        coords=[('member', member), ('latitude', lat), ('longitude', lon)],
+        attrs={'units': 'mm', 'long_name': 'Total Precipitation'}
+    )
+
+    return precipitation
+
+
+@pytest.fixture(scope='session')
+def palette_names():
+    """Names of every palette configured in custom_colorbar (as listed by help=True)."""
+    import contextlib
+    import io
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from meteoplots.colorbar.colorbars import custom_colorbar
+
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        custom_colorbar(help=True)
+    plt.close('all')
+
+    return [line[2:] for line in output.getvalue().splitlines() if line.startswith('- ')]
+
+
 @pytest.fixture
 def sample_extent():
     """Standard extent for Brazil region."""
@@ -190,4 +225,27 @@ def assert_plot_has_data(ax):
     has_lines = len(ax.lines) > 0
     has_patches = len(ax.patches) > 0
     
-    assert has_collections or has_lines or has_patches, "Plot should contain some visual elements"
\ No newline at end of file
+    assert has_collections or has_lines or has_patches, "Plot should contain some visual elements"
+
+
+# Benchmark suite options (tests/benchmarks)
+def pytest_addoption(parser):
+    group = parser.getgroup('meteoplots benchmarks')
+    group.addoption('--run-benchmarks', action='store_true', default=False,
+                    help='Run the performance benchmarks in tests/benchmarks (skipped by default)')
+    group.addoption('--update-benchmark-baselines', action='store_true', default=False,
+                    help='Store the measured times/memory as the new benchmark baselines')
+    group.addoption('--benchmark-time-threshold', type=float, default=1.5,
+                    help='Fail a benchmark slower than baseline * threshold (default: 1.5)')
+    group.addoption('--benchmark-memory-threshold', type=float, default=1.25,
+                    help='Fail a benchmark using more peak memory than baseline * threshold (default: 1.25)')
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption('--run-benchmarks'):
+        return
+
+    skip_benchmark = pytest.mark.skip(reason='benchmark: use --run-benchmarks to run')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip_benchmark)
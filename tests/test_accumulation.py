@@ -0,0 +1,216 @@
+"""
+Tests for meteoplots.utils.accumulation module.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import xarray as xr
+
+from meteoplots.utils import accumulation
+from meteoplots.utils.accumulation import CumulativeSum, Climatology, load_climatology, compute_anomaly
+from meteoplots.plots import plot_accumulated_lead_times
+
+
+@pytest.fixture
+def daily_precipitation():
+    """Create 10 days of precipitation on a small grid."""
+    rng = np.random.default_rng(0)
+    time = pd.date_range('2024-01-01', periods=10)
+    lat = np.arange(-10, 0, 1.0)
+    lon = np.arange(-50, -40, 1.0)
+    return xr.DataArray(
+        rng.exponential(5, (len(time), len(lat), len(lon))),
+        coords=[('time', time), ('latitude', lat), ('longitude', lon)],
+        attrs={'units': 'mm'},
+    )
+
+
+@pytest.fixture
+def climatology_file(tmp_path, monkeypatch):
+    """Write a daily climatology (value = day of year) in 0-360 longitudes."""
+    monkeypatch.setenv('METEOPLOTS_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(accumulation, '_CLIMATOLOGIES', {})
+
+    doy = np.arange(1, 367)
+    clim = xr.DataArray(
+        np.ones((len(doy), 20, 20)) * doy[:, None, None],
+        coords=[('dayofyear', doy), ('latitude', np.arange(-20, 0, 1.0)), ('longitude', np.arange(300, 320, 1.0))],
+    )
+    path = tmp_path / 'clim.nc'
+    clim.to_dataset(name='tp').to_netcdf(path)
+    return str(path)
+
+
+class TestCumulativeSum:
+    """Tests for window accumulations from the cumulative sum."""
+
+    def test_window_matches_sum(self, daily_precipitation):
+        """Test that a window is the sum of its time steps."""
+        cumsum = CumulativeSum(daily_precipitation)
+
+        expected = daily_precipitation.isel(time=slice(2, 7)).sum('time')
+        np.testing.assert_allclose(cumsum.window(2, 7), expected)
+
+    def test_window_by_time_label(self, daily_precipitation):
+        """Test windows selected by time labels."""
+        cumsum = CumulativeSum(daily_precipitation)
+        time = daily_precipitation.time.values
+
+        np.testing.assert_allclose(cumsum.window(time[0], time[3]), cumsum.window(0, 3))
+
+    def test_rolling(self, daily_precipitation):
+        """Test that every moving window is returned, labelled by its last step."""
+        rolling = CumulativeSum(daily_precipitation).rolling(3)
+        expected = daily_precipitation.rolling(time=3).sum().isel(time=slice(2, None))
+
+        assert rolling.sizes['time'] == 8
+        np.testing.assert_allclose(rolling, expected)
+
+    def test_missing_values_do_not_spread(self, daily_precipitation):
+        """Test that a NaN only affects the windows that contain it."""
+        data = daily_precipitation.copy()
+        data[1, 0, 0] = np.nan
+        cumsum = CumulativeSum(data)
+
+        assert np.isnan(cumsum.window(0, 3)[0, 0])
+        assert np.isfinite(cumsum.window(2, 10)[0, 0])
+
+    def test_invalid_window(self, daily_precipitation):
+        """Test that windows outside the data raise ValueError."""
+        with pytest.raises(ValueError):
+            CumulativeSum(daily_precipitation).window(5, 20)
+
+
+class TestClimatology:
+    """Tests for the cached, memory-mapped climatology."""
+
+    def test_loaded_once_and_memory_mapped(self, climatology_file):
+        """Test that the climatology is loaded once per process and memory-mapped."""
+        clim = load_climatology(climatology_file)
+
+        assert load_climatology(climatology_file) is clim
+        assert isinstance(clim.values, np.memmap)
+        assert clim.dim_period == 'dayofyear'
+
+    def test_rewritten_file_is_reloaded(self, climatology_file):
+        """Test that a climatology file rewritten on disk is not served from the cache."""
+        import os
+
+        clim = load_climatology(climatology_file)
+        with xr.open_dataset(climatology_file) as ds:
+            doubled = (ds['tp'] * 2).load()
+        doubled.to_dataset(name='tp').to_netcdf(climatology_file)
+        os.utime(climatology_file, (os.path.getatime(climatology_file), os.path.getmtime(climatology_file) + 10))
+
+        reloaded = load_climatology(climatology_file)
+
+        assert reloaded is not clim
+        assert np.all(reloaded.field(15, [-10.0], [-50.0]) == 30)
+
+    def test_climatology_cache_bounded(self, climatology_file, monkeypatch):
+        """Test that the process keeps a bounded number of loaded climatologies."""
+        from meteoplots.utils.utils import LRUCache
+
+        monkeypatch.setattr(accumulation, '_CLIMATOLOGIES', LRUCache(maxsize=1))
+        clim = load_climatology(climatology_file)
+        load_climatology(climatology_file, variable='tp')
+
+        assert len(accumulation._CLIMATOLOGIES) == 1
+        assert load_climatology(climatology_file) is not clim
+
+    def test_field_cached_per_grid_and_day(self, climatology_file, daily_precipitation):
+        """Test regridding to -180-180 longitudes and the per (grid, day) cache."""
+        clim = load_climatology(climatology_file)
+        lat, lon = daily_precipitation.latitude.values, daily_precipitation.longitude.values
+
+        field = clim.field(15, lat, lon)
+
+        assert field.shape == (len(lat), len(lon))
+        assert np.all(field == 15)
+        assert clim.field(15, lat, lon) is field
+
+    def test_from_dataarray_with_time(self):
+        """Test a climatology given as a DataArray with a monthly time axis."""
+        time = pd.date_range('2000-01-01', periods=12, freq='MS')
+        data = xr.DataArray(np.arange(12.0)[:, None, None] * np.ones((12, 2, 2)),
+                            coords=[('time', time), ('latitude', [0.0, 1.0]), ('longitude', [0.0, 1.0])])
+
+        clim = Climatology(data)
+
+        assert clim.dim_period == 'month'
+        assert clim.field(3, [0.0, 1.0], [0.0, 1.0])[0, 0] == 2.0
+
+
+class TestComputeAnomaly:
+    """Tests for anomalies against the climatology."""
+
+    def test_accumulated_anomaly(self, climatology_file, daily_precipitation):
+        """Test the anomaly of the accumulated precipitation (tp_anomalia)."""
+        anomaly = compute_anomaly(daily_precipitation, climatology_file, how='sum')
+
+        # Climatologia acumulada de 1 a 10 de janeiro = 1 + ... + 10
+        np.testing.assert_allclose(anomaly, daily_precipitation.sum('time') - 55)
+        assert anomaly.dims == ('latitude', 'longitude')
+
+    def test_mean_and_per_step_anomaly(self, climatology_file, daily_precipitation):
+        """Test mean anomalies and anomalies of each time step."""
+        mean_anomaly = compute_anomaly(daily_precipitation, climatology_file, how='mean')
+        step_anomaly = compute_anomaly(daily_precipitation, climatology_file)
+
+        np.testing.assert_allclose(mean_anomaly, daily_precipitation.mean('time') - 5.5)
+        np.testing.assert_allclose(step_anomaly[3], daily_precipitation[3] - 4)
+
+    def test_invalid_how(self, climatology_file, daily_precipitation):
+        """Test that an unknown reduction raises ValueError."""
+        with pytest.raises(ValueError):
+            compute_anomaly(daily_precipitation, climatology_file, how='max')
+
+
+class TestIterAccumulated:
+    """Tests for the incremental accumulation across lead times."""
+
+    def test_each_step_is_running_total(self, daily_precipitation):
+        """Test that each yielded map is the accumulation since the first lead time."""
+        expected = daily_precipitation.cumsum('time')
+
+        for i, (label, field) in enumerate(accumulation.iter_accumulated(daily_precipitation)):
+            assert label == daily_precipitation.time.values[i]
+            assert field.attrs['accumulation_steps'] == i + 1
+            np.testing.assert_allclose(field, expected[i])
+
+    def test_running_buffer_is_reused(self, daily_precipitation):
+        """Test that the running field is updated in place unless copy=True."""
+        fields = [field for _, field in accumulation.iter_accumulated(daily_precipitation)]
+        copies = [field for _, field in accumulation.iter_accumulated(daily_precipitation, copy=True)]
+
+        assert np.shares_memory(fields[0].values, fields[-1].values)
+        assert not np.shares_memory(copies[0].values, copies[-1].values)
+
+    def test_dask_input(self, daily_precipitation):
+        """Test lazy input read one lead time at a time."""
+        pytest.importorskip('dask')
+        *_, (_, last) = accumulation.iter_accumulated(daily_precipitation.chunk({'time': 1}))
+
+        np.testing.assert_allclose(last, daily_precipitation.sum('time'))
+
+    def test_plot_accumulated_lead_times(self, daily_precipitation, monkeypatch):
+        """Test that one map per lead time is rendered with formatted titles and filenames."""
+        calls = []
+        monkeypatch.setattr('meteoplots.plots.plot_contourf_from_xarray',
+                            lambda data, plot_var_colorbar=None, **kwargs: calls.append((float(data.sum()), plot_var_colorbar, kwargs)))
+
+        paths = plot_accumulated_lead_times(daily_precipitation.isel(time=slice(0, 3)),
+                                            title='Acumulado {start:%d/%m} - {end:%d/%m}', path_save='out')
+
+        assert paths == ['out/accumulated_01.png', 'out/accumulated_02.png', 'out/accumulated_03.png']
+        assert len(calls) == 3
+        assert all(call[2]['savefigure'] for call in calls)
+        assert calls[0][1] == 'acumulado_total'
+        assert calls[2][2]['title'] == 'Acumulado 01/01 - 03/01'
+        assert calls[2][2]['output_filename'] == 'accumulated_03.png'
+        np.testing.assert_allclose(calls[2][0], float(daily_precipitation.isel(time=slice(0, 3)).sum()))
+
+        # Manter todas as figuras abertas anularia a memória de um campo por vez
+        with pytest.raises(ValueError, match='iter_accumulated'):
+            plot_accumulated_lead_times(daily_precipitation, savefigure=False)
@@ -0,0 +1,169 @@
+"""
+Tests for meteoplots.utils.annotations module.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import cartopy.crs as ccrs
+
+from meteoplots.plots import add_text_annotations
+from meteoplots.utils.annotations import TextCollection, add_text_collection, select_non_overlapping
+
+
+@pytest.fixture
+def stations():
+    """Create 500 rain-gauge stations, some outside the South America extent."""
+    rng = np.random.default_rng(0)
+    n = 500
+    return pd.DataFrame({
+        'lon': rng.uniform(-90, -20, n),
+        'lat': rng.uniform(-45, 15, n),
+        'text': rng.integers(0, 100, n).astype(str),
+        'color': rng.choice(['red', 'blue'], n),
+    })
+
+
+@pytest.fixture
+def geo_ax(matplotlib_backend):
+    """GeoAxes over South America without base features (offline)."""
+    fig = plt.figure(figsize=(6, 6))
+    ax = plt.axes(projection=ccrs.PlateCarree())
+    ax.set_extent([-75, -30, -35, 10], crs=ccrs.PlateCarree())
+    yield ax
+    plt.close(fig)
+
+
+class TestAddTextCollection:
+    """Tests for bulk text annotations from columnar data."""
+
+    def test_single_artist(self, stations, geo_ax):
+        """Test that all labels are drawn by one collection."""
+        n_collections = len(geo_ax.collections)
+        collection = add_text_annotations(geo_ax, stations, text_fontsize=6)
+
+        assert isinstance(collection, TextCollection)
+        assert len(geo_ax.collections) == n_collections + 1
+        assert len(geo_ax.texts) == 0
+        assert len(collection) == len(stations)
+
+        geo_ax.figure.canvas.draw()
+
+    def test_extent_culling(self, stations, geo_ax):
+        """Test that labels outside text_extent are dropped before projecting."""
+        collection = add_text_annotations(geo_ax, stations, text_extent=[-75, -30, -35, 10])
+        inside = stations['lon'].between(-75, -30) & stations['lat'].between(-35, 10)
+
+        assert len(collection) == inside.sum()
+        assert set(collection.texts) <= set(stations['text'])
+
+    def test_positions_match_projection(self, stations, geo_ax):
+        """Test that the vectorized transform matches Text positions."""
+        collection = add_text_collection(geo_ax, stations.iloc[:10])
+        expected = geo_ax.transData.transform(
+            geo_ax.projection.transform_points(ccrs.PlateCarree(), stations['lon'].values[:10], stations['lat'].values[:10])[:, :2])
+
+        np.testing.assert_allclose(collection.get_display_offsets(), expected)
+
+    def test_per_label_colors(self, stations, geo_ax):
+        """Test that a color column gives one face color per label."""
+        collection = add_text_collection(geo_ax, stations)
+
+        assert len(collection.get_facecolor()) == len(stations)
+
+    def test_dict_of_arrays(self, geo_ax):
+        """Test dict-of-arrays input with x/y names."""
+        collection = add_text_collection(geo_ax, {'x': np.array([-50.0, -45.0]), 'y': np.array([-20.0, -10.0]), 'text': ['a', 'b']})
+
+        assert collection.texts == ['a', 'b']
+
+    def test_missing_columns(self, geo_ax):
+        """Test that input without coordinates or text raises ValueError."""
+        with pytest.raises(ValueError, match='columns'):
+            add_text_collection(geo_ax, {'text': ['a']})
+        with pytest.raises(ValueError, match='text'):
+            add_text_collection(geo_ax, {'lon': [0.0], 'lat': [0.0]})
+
+    def test_text_paths_cache_bounded(self, stations, geo_ax, monkeypatch):
+        """Test that the cache of text outlines keeps a bounded number of entries."""
+        from meteoplots.utils import annotations
+        from meteoplots.utils.utils import LRUCache
+
+        monkeypatch.setattr(annotations, '_TEXT_PATHS', LRUCache(maxsize=10))
+        add_text_collection(geo_ax, stations)
+        geo_ax.figure.canvas.draw()
+
+        assert len(annotations._TEXT_PATHS) == 10
+
+    def test_list_input_unchanged(self, geo_ax):
+        """Test that a list of dicts still creates one Text per item."""
+        add_text_annotations(geo_ax, [{'text': 'A', 'lon': -50, 'lat': -20}, {'text': 'B', 'x': -45, 'y': -10}])
+
+        assert len(geo_ax.texts) == 2
+
+
+class TestDeclutter:
+    """Tests for the greedy label collision removal."""
+
+    def test_priority_wins(self):
+        """Test that the higher-priority box is kept when two overlap."""
+        boxes = [[0, 0, 10, 10], [5, 5, 15, 15], [20, 20, 30, 30]]
+
+        np.testing.assert_array_equal(select_non_overlapping(boxes), [True, False, True])
+        np.testing.assert_array_equal(select_non_overlapping(boxes, priority=[1, 2, 0]), [False, True, True])
+
+    def test_kept_boxes_do_not_overlap(self):
+        """Test that no pair of kept boxes overlaps on a dense random layout."""
+        rng = np.random.default_rng(0)
+        origin = rng.uniform(0, 500, (2000, 2))
+        boxes = np.hstack([origin, origin + [30, 12]])
+
+        keep = select_non_overlapping(boxes)
+        kept = boxes[keep]
+
+        assert 0 < keep.sum() < len(boxes)
+        overlap = (kept[:, None, 0] < kept[None, :, 2]) & (kept[None, :, 0] < kept[:, None, 2]) & \
+                  (kept[:, None, 1] < kept[None, :, 3]) & (kept[None, :, 1] < kept[:, None, 3])
+        assert overlap.sum() == len(kept)  # só a diagonal
+
+    def test_nan_boxes_dropped(self):
+        """Test that boxes with missing coordinates are never kept."""
+        keep = select_non_overlapping([[np.nan, 0, 1, 1], [0, 0, 1, 1]])
+
+        np.testing.assert_array_equal(keep, [False, True])
+
+    def test_text_collection_declutter(self, stations, geo_ax):
+        """Test that a decluttered collection draws only non-overlapping labels."""
+        collection = add_text_annotations(geo_ax, stations, text_fontsize=10, text_declutter=True)
+        geo_ax.figure.canvas.draw()
+
+        assert 0 < len(collection.get_paths()) < len(stations)
+
+    def test_priority_column(self, geo_ax):
+        """Test that the priority column decides which of two stacked labels stays."""
+        texts = pd.DataFrame({'lon': [-50.0, -50.0], 'lat': [-20.0, -20.0], 'text': ['low', 'high'], 'priority': [0, 1]})
+        collection = add_text_collection(geo_ax, texts, text_declutter=True)
+        geo_ax.figure.canvas.draw()
+
+        assert len(collection.get_paths()) == 1
+        assert collection.get_offsets().shape == (1, 2)
+
+    def test_declutter_keeps_per_label_colors(self, geo_ax):
+        """Test that per-label RGB tuples stay with their labels after decluttering."""
+        texts = {'lon': [-50.0, -50.0, -40.0], 'lat': [-20.0, -20.0, 0.0], 'text': ['low', 'high', 'far'],
+                 'priority': [0, 1, 0], 'color': [(1, 0, 0), (0, 0, 1), (0, 1, 0)]}
+        collection = add_text_collection(geo_ax, texts, text_declutter=True)
+        geo_ax.figure.canvas.draw()
+
+        np.testing.assert_allclose(collection.get_facecolor(), [(0, 0, 1, 1), (0, 1, 0, 1)])
+
+    def test_declutter_list_texts(self, geo_ax):
+        """Test that overlapping Text artists from a list of dicts are hidden."""
+        texts = [{'text': 'Station A', 'lon': -50, 'lat': -20},
+                 {'text': 'Station B', 'lon': -50.1, 'lat': -20, 'priority': 5},
+                 {'text': 'Far', 'lon': -40, 'lat': 0}]
+
+        artists = add_text_annotations(geo_ax, texts, text_declutter=True)
+
+        assert [artist.get_visible() for artist in artists] == [False, True, True]
@@ -0,0 +1,256 @@
+"""
+Tests for meteoplots.cli module (batch rendering from a product spec).
+"""
+
+import json
+import pytest
+import numpy as np
+import xarray as xr
+
+from meteoplots import cli
+
+
+@pytest.fixture
+def sample_dataset_file(tmp_path):
+    """Write a small NetCDF file with precipitation and wind fields."""
+    lat = np.arange(-35, 10, 1.0)
+    lon = np.arange(280, 330, 1.0)
+    shape = (2, len(lat), len(lon))
+
+    ds = xr.Dataset(
+        {
+            'tp': (('time', 'latitude', 'longitude'), np.random.exponential(0.005, shape)),
+            'u10': (('time', 'latitude', 'longitude'), np.random.random(shape)),
+            'v10': (('time', 'latitude', 'longitude'), np.random.random(shape)),
+        },
+        coords={'time': [0, 1], 'latitude': lat, 'longitude': lon}
+    )
+
+    path = tmp_path / 'sample.nc'
+    ds.to_netcdf(path)
+
+    return str(path)
+
+
+@pytest.fixture
+def sample_spec(tmp_path, sample_dataset_file):
+    """Write a YAML spec with three products over the same dataset."""
+    spec = f"""
+defaults:
+  extent: [-60, -30, -35, 5]
+  figsize: [6, 6]
+  path_save: {tmp_path / 'plots'}
+
+products:
+  - name: tp_d1
+    data: {sample_dataset_file}
+    variable: tp
+    plot_var_colorbar: tp
+    isel: {{time: 0}}
+    scale: 1000
+  - name: tp_d2
+    data: sample.nc
+    variable: tp
+    plot_var_colorbar: tp
+    isel: {{time: 1}}
+    scale: 1000
+    kwargs:
+      title: Dia 2
+  - name: vento
+    data: sample.nc
+    plot: quiver
+    variable: [u10, v10]
+    isel: {{time: 0}}
+    extent: [-80, -30, -40, 10]
+"""
+    path = tmp_path / 'products.yaml'
+    path.write_text(spec)
+
+    return str(path)
+
+
+class TestLoadSpec:
+    """Tests for load_spec function."""
+
+    def test_defaults_are_applied(self, sample_spec, sample_dataset_file):
+        """Test that defaults are merged into every product."""
+        products = cli.load_spec(sample_spec)
+
+        assert len(products) == 3
+        assert products[0]['figsize'] == [6, 6]
+        assert products[2]['extent'] == [-80, -30, -40, 10]
+        assert products[1]['kwargs'] == {'title': 'Dia 2'}
+
+    def test_relative_data_paths(self, sample_spec, sample_dataset_file):
+        """Test that relative data paths are resolved from the spec directory."""
+        products = cli.load_spec(sample_spec)
+
+        assert products[1]['data'] == sample_dataset_file
+
+    def test_json_spec(self, tmp_path, sample_dataset_file):
+        """Test reading a JSON spec with a bare list of products."""
+        path = tmp_path / 'products.json'
+        path.write_text(json.dumps([{'data': sample_dataset_file, 'variable': 'tp'}]))
+
+        products = cli.load_spec(str(path))
+
+        assert products[0]['plot'] == 'contourf'
+        assert products[0]['name'] == 'product_0'
+
+    def test_invalid_plot_type(self, tmp_path, sample_dataset_file):
+        """Test that unknown plot types are rejected."""
+        path = tmp_path / 'products.json'
+        path.write_text(json.dumps([{'data': sample_dataset_file, 'variable': 'tp', 'plot': 'pie'}]))
+
+        with pytest.raises(ValueError, match='not supported'):
+            cli.load_spec(str(path))
+
+    def test_missing_variable(self, tmp_path, sample_dataset_file):
+        """Test that products without variable or layers are rejected."""
+        path = tmp_path / 'products.json'
+        path.write_text(json.dumps([{'data': sample_dataset_file}]))
+
+        with pytest.raises(ValueError, match="'variable' or 'layers'"):
+            cli.load_spec(str(path))
+
+
+class TestRender:
+    """Tests for grouping and rendering products."""
+
+    def test_group_products(self, sample_spec):
+        """Test that products sharing data and base map are grouped together."""
+        groups = cli.group_products(cli.load_spec(sample_spec))
+
+        assert [len(group) for group in groups] == [2, 1]
+
+    @staticmethod
+    def plain_base_ax(calls):
+        """get_base_ax replacement drawing a plain axes (no Natural Earth features) and recording its extent."""
+        import matplotlib.pyplot as plt
+
+        def get_base_ax(extent, figsize, central_longitude=0, resolution='auto'):
+            calls.append(extent)
+            fig, ax = plt.subplots(figsize=figsize)
+            ax.set_xlim(extent[0], extent[1])
+            ax.set_ylim(extent[2], extent[3])
+            return fig, ax
+
+        return get_base_ax
+
+    def test_base_map_drawn_once_per_group(self, sample_spec, monkeypatch):
+        """Test that products of a group are drawn on one base map, cleaned between products and saved."""
+        import os
+        from meteoplots import plots
+
+        base_maps, axes = [], []
+
+        def fake_contourf(data, fig=None, ax=None, **kwargs):
+            assert kwargs['savefigure'] is False
+            # Cada produto deve encontrar o mapa base limpo
+            assert not ax.collections and not ax.get_title(loc='left')
+            axes.append(ax)
+            ax.pcolormesh(data.longitude, data.latitude, data)
+            ax.set_title(kwargs.get('title', ''), loc='left')
+            fig.add_axes([0.1, 0.05, 0.8, 0.02])
+
+        monkeypatch.setattr(plots, 'plot_contourf_from_xarray', fake_contourf)
+        monkeypatch.setattr(plots, 'plot_quiver_from_xarray', lambda u, v, fig=None, ax=None, **kwargs: axes.append(ax))
+        monkeypatch.setattr(plots, 'get_base_ax', self.plain_base_ax(base_maps))
+
+        results = cli.render(sample_spec)
+
+        assert [error for _, _, error in results] == [None, None, None]
+        assert base_maps == [(-60, -30, -35, 5), (-80, -30, -40, 10)]
+        assert axes[0] is axes[1] and axes[2] is not axes[0]
+        assert len(axes[0].figure.axes) == 1
+        products = cli.load_spec(sample_spec)
+        for name in ['tp_d1', 'tp_d2', 'vento']:
+            assert os.path.exists(os.path.join(products[0]['path_save'], f'{name}.png'))
+
+    def test_render_opens_dataset_once(self, sample_spec, monkeypatch):
+        """Test that each dataset is opened once and every product is rendered."""
+        from meteoplots import plots
+
+        calls = []
+        monkeypatch.setattr(plots, 'plot_contourf_from_xarray', lambda data, **kwargs: calls.append(('contourf', data, kwargs)))
+        monkeypatch.setattr(plots, 'plot_quiver_from_xarray', lambda u, v, **kwargs: calls.append(('quiver', u, kwargs)))
+        monkeypatch.setattr(plots, 'get_base_ax', self.plain_base_ax([]))
+        monkeypatch.setattr(cli, '_DATASETS', {})
+
+        results = cli.render(sample_spec)
+
+        assert [error for _, _, error in results] == [None, None, None]
+        assert len(cli._DATASETS) == 1
+        assert [call[0] for call in calls] == ['contourf', 'contourf', 'quiver']
+
+        # Seleção, escala e kwargs do spec
+        name, data, kwargs = calls[1]
+        assert data.dims == ('latitude', 'longitude')
+        assert kwargs['title'] == 'Dia 2'
+        assert kwargs['output_filename'] == 'tp_d2.png'
+        assert kwargs['plot_var_colorbar'] == 'tp'
+
+    def test_dataset_cache_bounded(self, sample_dataset_file, tmp_path, monkeypatch):
+        """Test that a long-running process keeps a bounded number of open datasets."""
+        import shutil
+        from meteoplots.utils.utils import LRUCache
+
+        monkeypatch.setattr(cli, '_DATASETS', LRUCache(maxsize=1))
+        copy = str(shutil.copy(sample_dataset_file, tmp_path / 'copy.nc'))
+        cli.open_dataset(sample_dataset_file)
+        cli.open_dataset(copy)
+
+        assert list(cli._DATASETS) == [copy]
+
+    def test_render_with_field_store(self, sample_spec, tmp_path, monkeypatch):
+        """Test that with store: true fields are decoded once and then memory-mapped."""
+        from meteoplots import plots
+
+        monkeypatch.setenv('METEOPLOTS_CACHE_DIR', str(tmp_path / 'cache'))
+        monkeypatch.setattr(plots, 'plot_contourf_from_xarray', lambda data, **kwargs: None)
+        monkeypatch.setattr(plots, 'plot_quiver_from_xarray', lambda u, v, **kwargs: None)
+
+        product = cli.load_spec(sample_spec)[0]
+        product['store'] = True
+
+        decoded = []
+        select_field = cli.select_field
+        monkeypatch.setattr(cli, 'select_field', lambda *args: decoded.append(1) or select_field(*args))
+
+        first = cli.load_field('tp', product)
+        second = cli.load_field('tp', product)
+
+        assert len(decoded) == 1
+        assert not second.values.flags.writeable
+        np.testing.assert_allclose(first, second)
+
+    def test_render_reports_failures(self, sample_spec, monkeypatch):
+        """Test that a failing product is reported without stopping the batch."""
+        from meteoplots import plots
+
+        def failing_plot(data, **kwargs):
+            raise RuntimeError('boom')
+
+        monkeypatch.setattr(plots, 'plot_contourf_from_xarray', failing_plot)
+        monkeypatch.setattr(plots, 'plot_quiver_from_xarray', lambda u, v, **kwargs: None)
+
+        assert cli.main(['render', sample_spec]) == 1
+
+    def test_backend_set_by_entry_points_only(self, sample_spec, monkeypatch):
+        """Test that the Agg backend is set by main/worker initializer, not on every group."""
+        import matplotlib
+        from meteoplots import plots
+
+        calls = []
+        monkeypatch.setattr(matplotlib, 'use', lambda backend: calls.append(backend))
+        monkeypatch.setattr(plots, 'get_base_ax', self.plain_base_ax([]))
+        monkeypatch.setattr(plots, 'plot_contourf_from_xarray', lambda data, **kwargs: None)
+        monkeypatch.setattr(plots, 'plot_quiver_from_xarray', lambda u, v, **kwargs: None)
+
+        for group in cli.group_products(cli.load_spec(sample_spec)):
+            cli.render_group(group)
+        assert calls == []
+
+        cli.init_worker()
+        assert cli.main(['render', sample_spec]) == 0
+        assert calls == ['Agg', 'Agg']
@@ -0,0 +1,128 @@
+"""
+Tests for meteoplots.utils.derived module.
+"""
+
+import pytest
+import numpy as np
+import xarray as xr
+
+from meteoplots.utils.derived import EARTH_RADIUS, GRAVITY, wind_speed, vorticity, divergence, integrated_vapor_transport
+
+
+@pytest.fixture
+def global_grid():
+    """Create a 2° global grid with latitude from north to south."""
+    lat = np.arange(90, -90.1, -2.0)
+    lon = np.arange(0, 360, 2.0)
+    lon_grid, lat_grid = np.meshgrid(np.deg2rad(lon), np.deg2rad(lat))
+    return lat, lon, lon_grid, lat_grid
+
+
+def as_dataarray(values, lat, lon):
+    return xr.DataArray(values, coords=[('latitude', lat), ('longitude', lon)])
+
+
+class TestWindSpeed:
+    """Tests for wind_speed."""
+
+    def test_numpy_and_xarray(self, sample_wind_components):
+        """Test wind speed for arrays and DataArrays."""
+        u, v = sample_wind_components
+
+        np.testing.assert_allclose(wind_speed(np.array([3.0]), np.array([4.0])), [5.0])
+        np.testing.assert_allclose(wind_speed(u, v), np.sqrt(u**2 + v**2))
+        assert wind_speed(u, v).dims == u.dims
+
+    def test_dask(self, sample_wind_components):
+        """Test that dask input stays lazy."""
+        pytest.importorskip('dask')
+        u, v = sample_wind_components
+
+        speed = wind_speed(u.chunk(), v.chunk())
+
+        assert speed.chunks is not None
+        np.testing.assert_allclose(speed.compute(), np.sqrt(u**2 + v**2))
+
+
+class TestKinematics:
+    """Tests for vorticity and divergence with spherical metric."""
+
+    def test_solid_body_rotation(self, global_grid):
+        """Test that u = U cos(phi) has vorticity 2U sin(phi)/a and no divergence."""
+        lat, lon, _, lat_grid = global_grid
+        u = as_dataarray(10 * np.cos(lat_grid), lat, lon)
+        v = xr.zeros_like(u)
+
+        expected = 2 * 10 * np.sin(lat_grid) / EARTH_RADIUS
+
+        inner = np.abs(lat) < 90
+        np.testing.assert_allclose(vorticity(u, v).values[inner], expected[inner], atol=1e-8)
+        np.testing.assert_allclose(divergence(u, v).values[inner], 0, atol=1e-12)
+        assert np.isnan(vorticity(u, v).values[0]).all()
+
+    def test_divergence_periodic_longitude(self, global_grid):
+        """Test divergence of u = cos(lambda) including the longitude seam."""
+        lat, lon, lon_grid, lat_grid = global_grid
+        u = as_dataarray(np.cos(lon_grid), lat, lon)
+        v = xr.zeros_like(u)
+
+        expected = -np.sin(lon_grid) / (EARTH_RADIUS * np.cos(lat_grid))
+        inner = np.abs(lat) <= 80
+
+        np.testing.assert_allclose(divergence(u, v).values[inner], expected[inner], rtol=1e-3, atol=1e-12)
+
+    def test_extra_dimensions_and_dask(self, global_grid):
+        """Test fields with a leading dimension, computed with numpy and dask."""
+        pytest.importorskip('dask')
+        lat, lon, lon_grid, lat_grid = global_grid
+        u = as_dataarray(np.sin(lon_grid) * np.cos(lat_grid), lat, lon).expand_dims(time=3)
+        v = as_dataarray(np.cos(2 * lon_grid), lat, lon).expand_dims(time=3)
+
+        eager = vorticity(u, v)
+        lazy = vorticity(u.chunk({'time': 1}), v.chunk({'time': 1}))
+
+        assert lazy.chunks is not None
+        assert eager.dims == ('time', 'latitude', 'longitude')
+        np.testing.assert_allclose(lazy.compute(), eager)
+
+
+class TestIntegratedVaporTransport:
+    """Tests for integrated_vapor_transport."""
+
+    def test_constant_profile(self):
+        """Test IVT of constant q and wind: q * |V| * (p_bottom - p_top) / g."""
+        levels = [1000, 850, 700, 500, 300]
+        coords = [('level', levels), ('latitude', [0.0, 1.0]), ('longitude', [0.0, 1.0])]
+        q = xr.DataArray(np.full((5, 2, 2), 0.01), coords=coords)
+        u = xr.full_like(q, 6.0)
+        v = xr.full_like(q, 8.0)
+
+        ivt = integrated_vapor_transport(q, u, v)
+
+        expected = 0.01 * 70000 / GRAVITY
+        np.testing.assert_allclose(ivt['ivtu'], 6 * expected)
+        np.testing.assert_allclose(ivt['ivtv'], 8 * expected)
+        np.testing.assert_allclose(ivt['ivt'], 10 * expected)
+        assert ivt['ivt'].dims == ('latitude', 'longitude')
+
+    def test_wind_in_other_dim_order(self):
+        """Test that u and v with another dimension order are integrated over their level axis."""
+        rng = np.random.default_rng(0)
+        coords = [('level', [1000, 925, 850, 700]), ('latitude', np.arange(3.0)), ('longitude', np.arange(4.0))]
+        q, u, v = (xr.DataArray(rng.random((4, 3, 4)), coords=coords) for _ in range(3))
+
+        expected = integrated_vapor_transport(q, u, v)
+        result = integrated_vapor_transport(q, u.transpose('latitude', 'longitude', 'level'), v.transpose('longitude', 'level', 'latitude'))
+
+        for name in ['ivtu', 'ivtv', 'ivt']:
+            np.testing.assert_allclose(result[name], expected[name])
+
+    def test_dask_matches_numpy(self):
+        """Test that dask input gives the same IVT."""
+        pytest.importorskip('dask')
+        rng = np.random.default_rng(0)
+        coords = [('level', [1000, 925, 850, 700]), ('latitude', np.arange(3.0)), ('longitude', np.arange(4.0))]
+        q, u, v = (xr.DataArray(rng.random((4, 3, 4)), coords=coords) for _ in range(3))
+
+        np.testing.assert_allclose(integrated_vapor_transport(q.chunk(), u.chunk(), v.chunk())['ivt'].compute(),
+                                   integrated_vapor_transport(q, u, v)['ivt'])
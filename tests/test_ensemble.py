@@ -0,0 +1,118 @@
+"""
+Tests for meteoplots.utils.ensemble module.
+"""
+
+import pytest
+import numpy as np
+import xarray as xr
+
+from meteoplots.utils.ensemble import EnsembleStatistics, ensemble_statistics
+from meteoplots.plots import plot_ensemble_statistic
+
+
+@pytest.fixture
+def large_ensemble():
+    """Create a 51-member ensemble on a small grid."""
+    rng = np.random.default_rng(0)
+    lat = np.arange(-10, 0, 1.0)
+    lon = np.arange(-50, -40, 1.0)
+    return xr.DataArray(
+        rng.gamma(2, 10, (51, len(lat), len(lon))),
+        coords=[('member', np.arange(51)), ('latitude', lat), ('longitude', lon)],
+    )
+
+
+class TestEnsembleStatistics:
+    """Tests for the streaming ensemble statistics."""
+
+    def test_mean_and_std_match_numpy(self, large_ensemble):
+        """Test that Welford mean/std match the full-array computation."""
+        stats = ensemble_statistics(large_ensemble)
+
+        np.testing.assert_allclose(stats.mean(), large_ensemble.mean('member'))
+        np.testing.assert_allclose(stats.std(), large_ensemble.std('member', ddof=1))
+        np.testing.assert_allclose(stats.variance(ddof=0), large_ensemble.var('member'))
+
+    def test_probability_matches_numpy(self, large_ensemble):
+        """Test exceedance probabilities in percent."""
+        stats = ensemble_statistics(large_ensemble, thresholds=[10, 30])
+
+        for threshold in [10, 30]:
+            expected = 100 * (large_ensemble > threshold).mean('member')
+            np.testing.assert_allclose(stats.probability(threshold), expected)
+
+    def test_output_keeps_coordinates(self, large_ensemble):
+        """Test that statistics are DataArrays on the member grid."""
+        stats = ensemble_statistics(large_ensemble, thresholds=[10])
+        result = stats.probability(10)
+
+        assert isinstance(result, xr.DataArray)
+        assert result.dims == ('latitude', 'longitude')
+        np.testing.assert_array_equal(result.longitude, large_ensemble.longitude)
+
+    def test_percentiles_exact_for_small_ensemble(self, sample_ensemble_data):
+        """Test that percentiles are exact with up to 5 members."""
+        stats = ensemble_statistics(sample_ensemble_data, percentiles=[50, 90])
+
+        np.testing.assert_allclose(stats.percentile(50), sample_ensemble_data.quantile(0.5, 'member'))
+        np.testing.assert_allclose(stats.percentile(90), sample_ensemble_data.quantile(0.9, 'member'))
+
+    def test_percentiles_approximate(self):
+        """Test the P² estimate against the exact percentile of a large sample."""
+        rng = np.random.default_rng(1)
+        members = rng.standard_normal((2000, 4, 4))
+
+        stats = ensemble_statistics(iter(members), percentiles=[50, 90])
+
+        assert abs(stats.percentile(50).mean()) < 0.05
+        assert abs(stats.percentile(90).mean() - np.percentile(members, 90, axis=0).mean()) < 0.05
+
+    def test_dask_chunks_match_numpy(self, large_ensemble):
+        """Test that dask-backed input gives the same result as numpy input."""
+        pytest.importorskip('dask')
+
+        stats_numpy = ensemble_statistics(large_ensemble, thresholds=[20], percentiles=[50])
+        stats_dask = ensemble_statistics(large_ensemble.chunk({'member': 10}), thresholds=[20], percentiles=[50])
+
+        np.testing.assert_allclose(stats_dask.mean(), stats_numpy.mean())
+        np.testing.assert_allclose(stats_dask.probability(20), stats_numpy.probability(20))
+        np.testing.assert_allclose(stats_dask.percentile(50), stats_numpy.percentile(50))
+
+    def test_shape_mismatch_raises(self):
+        """Test that members on a different grid are rejected."""
+        stats = EnsembleStatistics()
+        stats.update(np.zeros((3, 3)))
+
+        with pytest.raises(ValueError, match='does not match'):
+            stats.update(np.zeros((4, 4)))
+
+    def test_untracked_threshold_raises(self, sample_ensemble_data):
+        """Test that asking for an untracked threshold raises ValueError."""
+        stats = ensemble_statistics(sample_ensemble_data, thresholds=[10])
+
+        with pytest.raises(ValueError, match='not tracked'):
+            stats.probability(50)
+
+
+class TestPlotEnsembleStatistic:
+    """Tests for plot_ensemble_statistic palette selection."""
+
+    @pytest.mark.parametrize('statistic, palette', [('probability', 'probabilidade'), ('std', 'desvpad')])
+    def test_default_palette(self, sample_ensemble_data, monkeypatch, statistic, palette):
+        """Test that each statistic is plotted with its custom_colorbar palette."""
+        calls = {}
+        monkeypatch.setattr('meteoplots.plots.plot_contourf_from_xarray',
+                            lambda data, plot_var_colorbar=None, **kwargs: calls.update(data=data, palette=plot_var_colorbar))
+
+        stats = ensemble_statistics(sample_ensemble_data, thresholds=[10])
+        plot_ensemble_statistic(stats, statistic, threshold=10)
+
+        assert calls['palette'] == palette
+        assert calls['data'].dims == ('latitude', 'longitude')
+
+    def test_percentile_requires_palette(self, sample_ensemble_data):
+        """Test that statistics without a default palette require plot_var_colorbar."""
+        stats = ensemble_statistics(sample_ensemble_data, percentiles=[50])
+
+        with pytest.raises(ValueError, match='no default palette'):
+            plot_ensemble_statistic(stats, 'percentile', q=50)
@@ -0,0 +1,280 @@
+"""
+Tests for meteoplots.utils.geometry module and the choropleth plot.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import matplotlib.pyplot as plt
+import cartopy.crs as ccrs
+from matplotlib.path import Path
+from shapely.geometry import LineString, Point, Polygon, box
+
+from meteoplots.utils.geometry import read_shapefile, simplify_tolerance, simplified_geometries, geometry_paths, features_in_extent
+from meteoplots.plots import plot_choropleth_from_geodataframe
+
+
+@pytest.fixture
+def wavy_basins():
+    """Two adjacent basins sharing a densely sampled wavy border, one of them with a hole."""
+    border_lat = np.linspace(-30, -10, 2001)
+    border = np.column_stack([-50 + 0.02 * np.sin(border_lat * 40), border_lat])
+    west = Polygon([(-60, -30), *border, (-60, -10)])
+    east = Polygon([(-40, -10), *border[::-1], (-40, -30)], holes=[[(-45, -25), (-43, -25), (-43, -23), (-45, -23)]])
+    return gpd.GeoDataFrame({'Nome_Bacia': ['Oeste', 'Leste'], 'valor': [5.0, 70.0]}, geometry=[west, east], crs='EPSG:4326')
+
+
+class TestGeometryCache:
+    """Tests for the shapefile and simplified geometry caches."""
+
+    def test_read_shapefile_cached(self, sample_shapefile):
+        """Test that a shapefile is read once and returned in EPSG:4326."""
+        gdf = read_shapefile(sample_shapefile)
+
+        assert read_shapefile(sample_shapefile) is gdf
+        assert gdf.crs.to_epsg() == 4326
+
+    def test_simplify_tolerance(self):
+        """Test that the tolerance is half a display pixel, rounded to 2 significant digits."""
+        # 50° em 10 polegadas a 100 dpi: 0.05°/pixel
+        assert simplify_tolerance([-80, -30, -35, 15], (10, 10), dpi=100) == pytest.approx(0.025)
+        assert simplify_tolerance([-80, -30, -35, 15], (10, 10), dpi=101) == simplify_tolerance([-80, -30, -35, 15], (10, 10), dpi=100.5)
+
+    def test_simplified_geometries(self, wavy_basins):
+        """Test that simplification reduces vertices, keeps the polygons valid and is cached."""
+        from meteoplots.utils.geometry import _simplified
+
+        simplified = simplified_geometries(wavy_basins, 0.05)
+
+        assert _simplified(wavy_basins, 0.05) is _simplified(wavy_basins, 0.05)
+        assert max(len(geometry.exterior.coords) for geometry in simplified.geometry) < 100
+        assert simplified.geometry.is_valid.all()
+        assert len(simplified.geometry[1].interiors) == 1
+        assert simplified_geometries(wavy_basins, 0).geometry[0].equals(wavy_basins.geometry[0])
+
+    def test_shared_border_simplified_once(self, wavy_basins):
+        """Test that neighbouring polygons keep a common border after simplification (no gaps or overlaps)."""
+        west, east = simplified_geometries(wavy_basins, 0.05).geometry
+
+        assert west.intersection(east).area == pytest.approx(0, abs=1e-12)
+        # Uma fresta entre as bacias apareceria como outro buraco na união
+        union = west.union(east)
+        assert union.geom_type == 'Polygon' and len(union.interiors) == 1
+        assert union.area == pytest.approx(west.area + east.area)
+
+    def test_simplified_values_current(self, wavy_basins):
+        """Test that only geometries are cached: columns changed in place are read from the GeoDataFrame."""
+        simplified_geometries(wavy_basins, 0.05)
+        wavy_basins['valor'] = [100.0, 200.0]
+
+        assert simplified_geometries(wavy_basins, 0.05)['valor'].tolist() == [100.0, 200.0]
+
+    def test_geometries_edited_in_place(self, wavy_basins):
+        """Test that geometries replaced in place are simplified again instead of served from the cache."""
+        simplified_geometries(wavy_basins, 0.05)
+        wavy_basins.loc[0, 'geometry'] = box(-60, -20, -55, -15)
+
+        assert simplified_geometries(wavy_basins, 0.05).geometry.iloc[0].equals(box(-60, -20, -55, -15))
+
+    def test_geometry_paths(self, wavy_basins):
+        """Test one compound path per geometry, with holes, lines and empty geometries."""
+        geometries = list(wavy_basins.geometry) + [LineString([(0, 0), (1, 1)]), Point(0, 0)]
+        paths = geometry_paths(geometries)
+
+        assert len(paths) == 4
+        # Polígono com buraco: dois anéis no mesmo path
+        assert list(paths[1].codes).count(Path.MOVETO) == 2
+        assert paths[1].contains_point((-41, -11))
+        assert len(paths[2].vertices) == 2
+        assert len(paths[3].vertices) == 0
+
+    def test_geometry_paths_projected(self):
+        """Test that vertices are projected to the given CRS."""
+        paths = geometry_paths([box(-10, -10, 10, 10)], projection=ccrs.Mercator())
+
+        assert np.abs(paths[0].vertices).max() == pytest.approx(1113194.9, rel=1e-3)
+
+    def test_geometry_paths_cut_at_seam(self):
+        """Test that geometries crossing the seam of a Pacific-centred map are cut there instead of streaking across it."""
+        paths = geometry_paths([box(-10, -10, 10, 10), box(20, -10, 30, 10)], projection=ccrs.PlateCarree(central_longitude=180))
+
+        # Duas partes, uma em cada borda do mapa (|x| >= 170), sem vértices no meio
+        assert list(paths[0].codes).count(Path.MOVETO) == 2
+        assert np.abs(paths[0].vertices[:, 0]).min() >= 170 - 1e-6
+        np.testing.assert_allclose(np.sort(np.unique(paths[1].vertices[:, 0])), [-160, -150])
+
+
+class TestClipToExtent:
+    """Tests for the spatial filtering and clipping of geometries to the map extent."""
+
+    @pytest.fixture
+    def states(self):
+        """Grid of 10 x 10 one-degree squares."""
+        return gpd.GeoDataFrame({'Nome_Bacia': [f'{lon}_{lat}' for lon in range(-60, -50) for lat in range(-30, -20)]},
+                                geometry=[box(lon, lat, lon + 1, lat + 1) for lon in range(-60, -50) for lat in range(-30, -20)], crs='EPSG:4326')
+
+    def test_features_in_extent(self, states):
+        """Test that only geometries intersecting the extent plus margin are selected."""
+        positions = features_in_extent(states, [-55.5, -53.5, -25.5, -23.5], margin=0)
+
+        assert len(positions) == 9
+        assert set(states['Nome_Bacia'].iloc[positions]) == {f'{lon}_{lat}' for lon in (-56, -55, -54) for lat in (-26, -25, -24)}
+        assert len(features_in_extent(states, [-55.5, -53.5, -25.5, -23.5], margin=0.5)) == 25
+
+    def test_features_in_extent_antimeridian(self, states):
+        """Test that an extent crossing the antimeridian keeps every geometry."""
+        assert len(features_in_extent(states, [170, -170, -30, -20])) == len(states)
+
+    def test_clipped_geometries(self, states):
+        """Test that geometries crossing the extent plus margin are cut to it."""
+        clipped = simplified_geometries(states, 0, extent=[-55.5, -53.5, -25.5, -23.5], margin=0)
+
+        assert len(clipped) == 9
+        np.testing.assert_allclose(clipped.total_bounds, [-55.5, -25.5, -53.5, -23.5])
+        assert clipped.geometry.area.sum() == pytest.approx(4)
+
+    def test_clipped_cache_bounded(self, states, monkeypatch):
+        """Test that clipping many distinct extents keeps a bounded number of cached entries."""
+        from meteoplots.utils import geometry
+        from meteoplots.utils.utils import LRUCache
+
+        monkeypatch.setattr(geometry, '_SIMPLIFIED', LRUCache(maxsize=4))
+        for shift in np.arange(10) * 0.1:
+            simplified_geometries(states, 0, extent=[-55.5 + shift, -53.5 + shift, -25.5, -23.5], margin=0)
+
+        assert len(geometry._SIMPLIFIED) == 4
+
+    def test_overlay_clipped(self, states, matplotlib_backend):
+        """Test that overlays only carry the geometries of the zoomed map."""
+        from meteoplots.plots import add_shapefiles_to_plot
+
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.PlateCarree())
+
+        zoomed, = add_shapefiles_to_plot(ax, [states], extent=[-55.5, -53.5, -25.5, -23.5])
+        full, = add_shapefiles_to_plot(ax, [states], extent=[-55.5, -53.5, -25.5, -23.5], clip_shapefiles=False)
+
+        assert len(zoomed.get_paths()) == 9
+        assert len(full.get_paths()) == 100
+        plt.close(fig)
+
+    def test_basin_labels_in_extent(self, states, sample_temperature_data, tmp_path, matplotlib_backend):
+        """Test that basin means and labels are only computed for basins with the centroid inside the map."""
+        from meteoplots.plots import plot_contourf_from_xarray
+
+        path = tmp_path / 'bacias.shp'
+        states.to_file(path)
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.PlateCarree())
+
+        fig, ax = plot_contourf_from_xarray(sample_temperature_data, plot_var_colorbar='temperature', shp_path_bacias=str(path), add_values_from_shapefile=True,
+                                            extent=[-55.2, -53.2, -25.2, -23.2], fig=fig, ax=ax, savefigure=False)
+
+        assert sorted(text.get_position() for text in ax.texts) == [(lon + 0.5, lat + 0.5) for lon in (-55, -54) for lat in (-25, -24)]
+        plt.close(fig)
+
+
+class TestPlotChoropleth:
+    """Tests for plot_choropleth_from_geodataframe."""
+
+    def test_palette_colors(self, wavy_basins, matplotlib_backend):
+        """Test that all basins are drawn as one collection with the palette colors."""
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.PlateCarree())
+
+        fig, ax = plot_choropleth_from_geodataframe(wavy_basins, 'chuva_ons_geodataframe', fig=fig, ax=ax, savefigure=False)
+
+        collection = ax.collections[-1]
+        fig.canvas.draw()
+        assert len(collection.get_paths()) == 2
+        assert not np.allclose(collection.get_facecolors()[0], collection.get_facecolors()[1])
+        plt.close(fig)
+
+    def test_join_basin_means(self, wavy_basins, matplotlib_backend):
+        """Test that values are joined by basin name and missing basins use missing_color."""
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.PlateCarree())
+        means = pd.DataFrame({'valor': [30.0], 'basin': ['Leste']})
+
+        fig, ax = plot_choropleth_from_geodataframe(wavy_basins.drop(columns='valor'), 'chuva_ons_geodataframe', values=means,
+                                                    missing_color='white', add_values=True, fig=fig, ax=ax, savefigure=False)
+
+        collection = ax.collections[0]
+        fig.canvas.draw()
+        assert np.ma.getmaskarray(collection.get_array()).tolist() == [True, False]
+        assert tuple(collection.get_facecolors()[0]) == (1, 1, 1, 1)
+        assert ax.collections[-1].texts == ['30']
+        plt.close(fig)
+
+    def test_every_palette(self, wavy_basins, palette_names, matplotlib_backend):
+        """Test that every custom_colorbar palette (named/short cmaps, few colors) can color the basins."""
+        for palette in palette_names:
+            fig = plt.figure()
+            ax = plt.axes(projection=ccrs.PlateCarree())
+
+            fig, ax = plot_choropleth_from_geodataframe(wavy_basins, palette, fig=fig, ax=ax, savefigure=False)
+            fig.canvas.draw()
+
+            assert len(ax.collections[0].get_facecolors()) == 2, palette
+            plt.close('all')
+
+    def test_values_changed_in_place(self, wavy_basins, matplotlib_backend):
+        """Test that a second plot of the same GeoDataFrame uses its current values, not the cached ones."""
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.PlateCarree())
+        plot_choropleth_from_geodataframe(wavy_basins, 'chuva_ons_geodataframe', fig=fig, ax=ax, savefigure=False)
+
+        wavy_basins['valor'] = [100.0, 200.0]
+        fig, ax = plot_choropleth_from_geodataframe(wavy_basins, 'chuva_ons_geodataframe', fig=fig, ax=ax, savefigure=False)
+
+        assert ax.collections[-1].get_array().tolist() == [100.0, 200.0]
+        plt.close(fig)
+
+    def test_requires_palette(self, wavy_basins):
+        """Test that plotting without palette or levels raises ValueError."""
+        with pytest.raises(ValueError, match='levels'):
+            plot_choropleth_from_geodataframe(wavy_basins)
+
+
+class TestAddShapefilesToPlot:
+    """Tests for the simplified overlay shapefiles."""
+
+    @pytest.fixture
+    def wavy_shapefile(self, wavy_basins, tmp_path):
+        path = tmp_path / 'bacias_detalhadas.shp'
+        wavy_basins.to_file(path)
+        return str(path)
+
+    def test_simplified_to_display(self, wavy_shapefile, matplotlib_backend):
+        """Test that overlays are drawn as one outline collection simplified to the map scale, reusing the cache."""
+        from meteoplots.plots import add_shapefiles_to_plot
+
+        fig = plt.figure(figsize=(6, 6))
+        ax = plt.axes(projection=ccrs.PlateCarree())
+        ax.set_extent([-80, -30, -35, 10], crs=ccrs.PlateCarree())
+
+        collection, = add_shapefiles_to_plot(ax, [wavy_shapefile], extent=[-80, -30, -35, 10])
+        again, = add_shapefiles_to_plot(ax, [wavy_shapefile], extent=[-80, -30, -35, 10])
+        full, = add_shapefiles_to_plot(ax, [wavy_shapefile], simplify_shapefiles=False)
+
+        n_vertices = sum(len(path.vertices) for path in collection.get_paths())
+        assert n_vertices < 200 < sum(len(path.vertices) for path in full.get_paths())
+        assert np.array_equal(again.get_paths()[0].vertices, collection.get_paths()[0].vertices)
+        assert len(collection.get_facecolors()) == 0
+        plt.close(fig)
+
+    def test_plot_functions_use_overlay(self, wavy_shapefile, sample_pressure_data, matplotlib_backend):
+        """Test that the plot functions draw shapefiles= through add_shapefiles_to_plot."""
+        from meteoplots.plots import plot_contour_from_xarray
+
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.PlateCarree())
+
+        fig, ax = plot_contour_from_xarray(sample_pressure_data, contour_levels=[range(1000, 1026, 4)], shapefiles=[wavy_shapefile],
+                                           shapefile_edgecolor='red', fig=fig, ax=ax, savefigure=False)
+
+        overlays = [collection for collection in ax.collections if len(collection.get_paths()) == 2 and len(collection.get_facecolors()) == 0]
+        assert len(overlays) == 1
+        assert tuple(overlays[0].get_edgecolors()[0][:3]) == (1, 0, 0)
+        plt.close(fig)
@@ -0,0 +1,82 @@
+"""
+Tests for the lazy-loading public API and import time of meteoplots.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ['cartopy', 'matplotlib.pyplot', 'geopandas', 'regionmask']
+
+
+def run_python(code):
+    """Run code in a fresh interpreter and return its stdout/stderr."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], capture_output=True, text=True, check=True)
+    return result.stdout, result.stderr
+
+
+def cumulative_import_time(importtime_output, module):
+    """Return the cumulative import time (seconds) of a module from -X importtime output."""
+    for line in importtime_output.splitlines():
+        parts = [part.strip() for part in line.split('|')]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1]) / 1e6
+    raise AssertionError(f'{module} not found in -X importtime output')
+
+
+class TestLazyImports:
+    """Tests for the PEP 562 lazy public API."""
+
+    @pytest.mark.parametrize('statement', [
+        'import meteoplots',
+        'import meteoplots.plots',
+        'from meteoplots import generate_title',
+        'import meteoplots.cli',
+    ])
+    def test_no_heavy_modules_on_import(self, statement):
+        """Test that importing the package does not import cartopy/pyplot/geopandas."""
+        stdout, _ = run_python(f'{statement}; import sys; print(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))')
+
+        assert stdout.strip() == ''
+
+    def test_lazy_attribute_resolves_function(self):
+        """Test that public functions are resolved on first access."""
+        import meteoplots
+        from meteoplots.plots import plot_contourf_from_xarray
+        from meteoplots.utils.titles import generate_title
+
+        assert meteoplots.plot_contourf_from_xarray is plot_contourf_from_xarray
+        assert meteoplots.generate_title is generate_title
+
+    def test_unknown_attribute(self):
+        """Test that unknown names raise AttributeError."""
+        import meteoplots
+
+        with pytest.raises(AttributeError):
+            meteoplots.not_a_function
+
+    def test_dir_lists_public_api(self):
+        """Test that dir() exposes the lazy public API."""
+        import meteoplots
+
+        assert 'plot_streamplot_from_xarray' in dir(meteoplots)
+        assert 'custom_colorbar' in dir(meteoplots)
+
+
+class TestImportTime:
+    """Import-time benchmark of the package."""
+
+    def test_import_time_benchmark(self):
+        """Report the import time of meteoplots and meteoplots.plots compared to pyplot+cartopy."""
+        _, lazy = run_python('import meteoplots.plots')
+        _, heavy = run_python('import matplotlib.pyplot, cartopy.crs, cartopy.feature')
+
+        time_package = cumulative_import_time(lazy, 'meteoplots')
+        time_plots = cumulative_import_time(lazy, 'meteoplots.plots')
+        time_heavy = cumulative_import_time(heavy, 'matplotlib.pyplot') + cumulative_import_time(heavy, 'cartopy.crs')
+
+        print(f'\nimport meteoplots: {time_package*1000:.1f} ms | import meteoplots.plots: {time_plots*1000:.1f} ms | pyplot + cartopy: {time_heavy*1000:.1f} ms')
+
+        # O import do pacote não deve pagar o custo de pyplot/cartopy
+        assert time_package + time_plots < time_heavy
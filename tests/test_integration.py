@@ -184,7 +184,7 @@ class TestCompleteWorkflows:
         )
         
         assert_figure_created(fig)
-        assert len(ax.patches) == len(region_boxes)
+        assert len(ax.collections[-1].get_paths()) == len(region_boxes)
         
         plt.close(fig)
         
@@ -0,0 +1,208 @@
+"""
+Tests for meteoplots.io module.
+"""
+
+import os
+
+import pytest
+import numpy as np
+import xarray as xr
+
+from meteoplots import io
+
+
+def write_grib_message(f, short_name, level, step, values, lat_first=10, lat_last=-10, lon_first=280, lon_last=300):
+    """Write one regular_ll GRIB2 message built from the eccodes samples."""
+    import eccodes
+
+    handle = eccodes.codes_grib_new_from_samples('regular_ll_pl_grib2')
+    nj, ni = values.shape
+    for key, value in [('Ni', ni), ('Nj', nj),
+                       ('latitudeOfFirstGridPointInDegrees', lat_first), ('latitudeOfLastGridPointInDegrees', lat_last),
+                       ('longitudeOfFirstGridPointInDegrees', lon_first), ('longitudeOfLastGridPointInDegrees', lon_last),
+                       ('iDirectionIncrementInDegrees', 1.0), ('jDirectionIncrementInDegrees', 1.0),
+                       ('shortName', short_name), ('level', level), ('step', step)]:
+        eccodes.codes_set(handle, key, value)
+    eccodes.codes_set_values(handle, values.ravel())
+    eccodes.codes_write(handle, f)
+    eccodes.codes_release(handle)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Isolated meteoplots cache directory and empty in-memory index cache."""
+    monkeypatch.setenv('METEOPLOTS_CACHE_DIR', str(tmp_path / 'cache'))
+    monkeypatch.setattr(io, '_GRIB_INDEXES', {})
+    return tmp_path / 'cache'
+
+
+@pytest.fixture
+def grib_file(tmp_path):
+    """GRIB2 file with t/u at 850 and 500 hPa for steps 0 and 6 (value = level + step + cell index)."""
+    # eccodes importado só aqui: carregá-lo na coleta antes do pyproj quebra o PROJ/GDAL dos outros testes
+    pytest.importorskip('eccodes')
+    path = tmp_path / 'model.grib2'
+    with open(path, 'wb') as f:
+        for step in [0, 6]:
+            for level in [850, 500]:
+                for short_name in ['t', 'u']:
+                    write_grib_message(f, short_name, level, step, np.arange(21 * 21, dtype=float).reshape(21, 21) + level + step)
+    return str(path)
+
+
+class TestGribIndex:
+    """Tests for the GRIB message index."""
+
+    def test_index_messages(self, grib_file, cache_dir):
+        """Test that every message is indexed with offset, length and header keys."""
+        index = io.build_grib_index(grib_file)
+
+        assert len(index) == 8
+        assert index[0]['offset'] == 0
+        assert index[1]['offset'] == index[0]['length']
+        assert {message['shortName'] for message in index} == {'t', 'u'}
+
+    def test_index_cached_on_disk(self, grib_file, cache_dir, monkeypatch):
+        """Test that a second process reuses the on-disk index without scanning the file."""
+        index = io.build_grib_index(grib_file)
+        assert len(list((cache_dir / 'grib_index').glob('*.json'))) == 1
+
+        monkeypatch.setattr(io, '_GRIB_INDEXES', {})
+        monkeypatch.setattr('eccodes.codes_grib_new_from_file', lambda *args, **kwargs: pytest.fail('GRIB file scanned again'))
+
+        assert io.build_grib_index(grib_file) == index
+
+    def test_index_cache_bounded(self, grib_file, cache_dir, tmp_path, monkeypatch):
+        """Test that the in-memory index cache keeps a bounded number of files."""
+        import shutil
+        from meteoplots.utils.utils import LRUCache
+
+        monkeypatch.setattr(io, '_GRIB_INDEXES', LRUCache(maxsize=1))
+        copy = shutil.copy(grib_file, tmp_path / 'model_copy.grib2')
+        io.build_grib_index(grib_file)
+        io.build_grib_index(str(copy))
+
+        assert len(io._GRIB_INDEXES) == 1
+
+    def test_select_messages(self, grib_file, cache_dir):
+        """Test filtering by shortName, level and step (values or lists)."""
+        index = io.build_grib_index(grib_file)
+
+        assert len(io.select_grib_messages(index, shortName='t', level=850, step=6)) == 1
+        assert len(io.select_grib_messages(index, shortName='t', level=[850, 500])) == 4
+
+
+class TestReadGrib:
+    """Tests for read_grib."""
+
+    def test_single_message(self, grib_file, cache_dir):
+        """Test that one message returns a 2D DataArray in -180-180 longitudes."""
+        data = io.read_grib(grib_file, 't', level=850, step=6)
+
+        assert data.dims == ('latitude', 'longitude')
+        assert data.shape == (21, 21)
+        assert data.longitude.values[0] == -80
+        assert data.latitude.values[0] == 10
+        assert data[0, 0].item() == 856
+        assert data.step.item() == 6
+
+    def test_extent_crop_and_stacking(self, grib_file, cache_dir):
+        """Test cropping to the plot extent and stacking steps and levels."""
+        data = io.read_grib(grib_file, 't', extent=[-75, -70, -5, 0])
+
+        assert data.dims == ('step', 'level', 'latitude', 'longitude')
+        assert data.shape == (2, 2, 6, 6)
+        np.testing.assert_array_equal(data.longitude, np.arange(-75, -69))
+        assert data.sel(step=6, level=500).max().item() == 500 + 6 + 15 * 21 + 10
+
+    def test_no_matching_message(self, grib_file, cache_dir):
+        """Test that an empty selection raises ValueError."""
+        with pytest.raises(ValueError, match='No GRIB message'):
+            io.read_grib(grib_file, 'z', level=500)
+
+
+class TestReadNetcdf:
+    """Tests for read_netcdf and open_field."""
+
+    @pytest.fixture
+    def netcdf_file(self, tmp_path):
+        lat = np.arange(-20, 21, 1.0)
+        lon = np.arange(0, 360, 1.0)
+        data = xr.DataArray(np.random.rand(2, len(lat), len(lon)), coords=[('time', [0, 1]), ('lat', lat), ('lon', lon)])
+        path = tmp_path / 'field.nc'
+        data.to_dataset(name='tp').to_netcdf(path)
+        return str(path), data
+
+    def test_rename_crop_and_normalize(self, netcdf_file):
+        """Test lat/lon renaming, selection and cropping before loading."""
+        path, original = netcdf_file
+
+        data = io.read_netcdf(path, 'tp', extent=[-10, 10, -5, 5], isel={'time': 1})
+
+        assert data.dims == ('latitude', 'longitude')
+        np.testing.assert_array_equal(data.longitude, np.arange(-10, 11))
+        np.testing.assert_allclose(data.sel(latitude=0, longitude=-10), original.isel(time=1).sel(lat=0, lon=350))
+
+    def test_open_field_dispatch(self, netcdf_file, grib_file, cache_dir):
+        """Test that open_field picks the reader by file extension."""
+        path, _ = netcdf_file
+
+        assert io.open_field(path, 'tp', isel={'time': 0}).dims == ('latitude', 'longitude')
+        assert io.open_field(grib_file, 'u', level=500, step=0).dims == ('latitude', 'longitude')
+
+
+class TestFieldStore:
+    """Tests for the memory-mapped intermediate field store."""
+
+    @pytest.fixture
+    def store(self, tmp_path):
+        return io.FieldStore(root=str(tmp_path / 'fields'))
+
+    @pytest.fixture
+    def source(self, tmp_path):
+        path = tmp_path / 'source.nc'
+        path.write_bytes(b'model run')
+        return str(path)
+
+    def test_roundtrip_is_memory_mapped(self, store, source, sample_temperature_data):
+        """Test that a stored field comes back equal, read-only and memory-mapped."""
+        key = store.key(source, 't2m', extent=[-60, -30, -35, 5])
+        store.put(key, sample_temperature_data)
+
+        data = store.get(key)
+
+        xr.testing.assert_identical(data, sample_temperature_data)
+        assert not data.values.flags.writeable
+        assert isinstance(data.values.base, np.memmap)
+        assert not any(name.endswith('.tmp') for name in os.listdir(store.root))
+
+    def test_key_depends_on_selection_and_source(self, store, source):
+        """Test that variable, level, step, extent and source contents change the key."""
+        base = store.key(source, 't', level=850, step=24, extent=[-80, -30, -35, 10])
+
+        assert base == store.key(source, 't', level=850, step=24, extent=(-80, -30, -35, 10))
+        assert base != store.key(source, 't', level=500, step=24, extent=[-80, -30, -35, 10])
+        assert base != store.key(source, 't', level=850, step=24, extent=[-75, -30, -35, 10])
+
+        with open(source, 'ab') as f:
+            f.write(b' updated')
+        assert base != store.key(source, 't', level=850, step=24, extent=[-80, -30, -35, 10])
+
+    def test_open_field_decodes_once(self, store, tmp_path, sample_precipitation_data, monkeypatch):
+        """Test that open_field with a store decodes the source only on the first call."""
+        path = str(tmp_path / 'tp.nc')
+        sample_precipitation_data.to_dataset(name='tp').to_netcdf(path)
+
+        calls = []
+        read_netcdf = io.read_netcdf
+        monkeypatch.setattr(io, 'read_netcdf', lambda *args, **kwargs: calls.append(1) or read_netcdf(*args, **kwargs))
+
+        first = io.open_field(path, 'tp', extent=[-60, -40, -30, -10], store=store)
+        second = io.open_field(path, 'tp', extent=[-60, -40, -30, -10], store=store)
+
+        assert len(calls) == 1
+        xr.testing.assert_identical(first, second)
+
+    def test_missing_key(self, store):
+        """Test that unknown keys return None."""
+        assert store.get('not-stored') is None
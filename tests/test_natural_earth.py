@@ -0,0 +1,277 @@
+"""
+Tests for meteoplots.utils.natural_earth module (offline Natural Earth cache) and the warmup command.
+"""
+
+import socket
+
+import pytest
+import numpy as np
+import geopandas as gpd
+import matplotlib.pyplot as plt
+import cartopy.crs as ccrs
+from shapely import wkb
+from shapely.geometry import GeometryCollection, LineString, box
+
+from meteoplots import cli
+from meteoplots.utils import natural_earth
+from meteoplots.utils.natural_earth import natural_earth_geometries, natural_earth_resolution, warmup_natural_earth, add_natural_earth
+
+
+# Geometrias sintéticas no lugar do Natural Earth
+SYNTHETIC_FEATURES = {
+    'coastline': [LineString([(-80, -5), (-35, -5), (-35, -30)])],
+    'borders': [LineString([(-60, -20), (-50, -10)])],
+    'land': [box(-80, -35, -35, -5)],
+    'ocean': [box(-35, -35, -20, 10)],
+}
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Empty meteoplots cache directory and empty in-process caches."""
+    monkeypatch.setenv('METEOPLOTS_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(natural_earth, '_GEOMETRIES', {})
+    monkeypatch.setattr(natural_earth, '_PATH_ARRAYS', {})
+    monkeypatch.setattr(natural_earth, '_FRAMES', {})
+    return tmp_path
+
+
+@pytest.fixture
+def synthetic_cache(cache_dir):
+    """Local Natural Earth cache (WKB) with the synthetic features at 110m."""
+    path = cache_dir / 'natural_earth'
+    path.mkdir()
+    for feature, geometries in SYNTHETIC_FEATURES.items():
+        (path / f'{feature}_110m_lon0.wkb').write_bytes(wkb.dumps(GeometryCollection(geometries)))
+    return path
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    """Make every socket connection fail."""
+    def refuse(*args, **kwargs):
+        raise OSError('network disabled in tests')
+    monkeypatch.setattr(socket.socket, 'connect', refuse)
+    monkeypatch.setattr(socket, 'create_connection', refuse)
+
+
+@pytest.fixture
+def synthetic_shapefiles(tmp_path, monkeypatch):
+    """Serve synthetic shapefiles instead of downloading Natural Earth; records the requests."""
+    requests = []
+
+    def fake_natural_earth(resolution='110m', category='physical', name='coastline'):
+        requests.append((resolution, category, name))
+        feature = next(key for key, value in natural_earth.BASE_FEATURES.items() if value == (category, name))
+        path = tmp_path / 'downloads' / f'ne_{resolution}_{name}.shp'
+        path.parent.mkdir(exist_ok=True)
+        gpd.GeoDataFrame(geometry=SYNTHETIC_FEATURES[feature], crs='EPSG:4326').to_file(path)
+        return str(path)
+
+    monkeypatch.setattr('cartopy.io.shapereader.natural_earth', fake_natural_earth)
+    return requests
+
+
+class TestNaturalEarthCache:
+    """Tests for the local binary Natural Earth cache."""
+
+    def test_read_from_cache(self, synthetic_cache, no_network, monkeypatch):
+        """Test that cached features are loaded without reading Natural Earth shapefiles."""
+        monkeypatch.setattr('cartopy.io.shapereader.natural_earth', lambda **kwargs: pytest.fail('shapefile read'))
+
+        geometries = natural_earth_geometries('coastline')
+
+        assert len(geometries) == 1
+        assert geometries[0].equals(SYNTHETIC_FEATURES['coastline'][0])
+        assert natural_earth_geometries('coastline') is geometries
+
+    def test_cache_miss_writes_cache(self, cache_dir, synthetic_shapefiles):
+        """Test that a cache miss reads the shapefile once and writes the binary cache."""
+        natural_earth_geometries('borders', '50m')
+
+        assert synthetic_shapefiles == [('50m', 'cultural', 'admin_0_boundary_lines_land')]
+        assert (cache_dir / 'natural_earth' / 'borders_50m_lon0.wkb').exists()
+
+    def test_pre_projected_central_longitude(self, cache_dir, synthetic_shapefiles):
+        """Test that cached geometries are in the coordinates of PlateCarree(central_longitude)."""
+        geometries = natural_earth_geometries('borders', central_longitude=-60)
+
+        lines = getattr(geometries[0], 'geoms', [geometries[0]])
+        np.testing.assert_allclose(np.concatenate([line.coords for line in lines]), [(0, -20), (10, -10)], atol=1e-9)
+
+    def test_invalid_feature(self, cache_dir):
+        """Test that unknown features and resolutions raise ValueError."""
+        with pytest.raises(ValueError, match='Feature'):
+            natural_earth_geometries('rivers')
+        with pytest.raises(ValueError, match='Resolution'):
+            natural_earth_geometries('coastline', '5m')
+
+    def test_warmup(self, cache_dir, synthetic_shapefiles):
+        """Test that warmup caches every base map feature."""
+        paths = warmup_natural_earth(resolutions=['110m'])
+
+        assert len(paths) == len(natural_earth.BASE_FEATURES)
+        assert all((cache_dir / 'natural_earth' / f'{feature}_110m_lon0.wkb').exists() for feature in natural_earth.BASE_FEATURES)
+
+    def test_warmup_command(self, cache_dir, synthetic_shapefiles):
+        """Test the `meteoplots warmup` subcommand."""
+        assert cli.main(['warmup', '--resolutions', '110m', '50m', '--features', 'coastline']) == 0
+        assert sorted(request[0] for request in synthetic_shapefiles) == ['110m', '50m']
+
+    def test_default_warmup_offline_zoom(self, cache_dir, synthetic_shapefiles, no_network, matplotlib_backend, monkeypatch):
+        """Test that after a default warmup a zoomed 'auto' map is drawn offline, from the cached 10m features."""
+        from meteoplots.plots import get_base_ax
+
+        assert cli.main(['warmup']) == 0
+        assert sorted({request[0] for request in synthetic_shapefiles}) == ['10m', '110m', '50m']
+
+        monkeypatch.setattr('cartopy.io.shapereader.natural_earth', lambda **kwargs: pytest.fail('shapefile read'))
+        monkeypatch.setattr(natural_earth, '_GEOMETRIES', {})
+        fig, ax = get_base_ax(extent=[-40, -31, -10, -3], figsize=(6, 6), resolution='auto')
+        fig.canvas.draw()
+
+        assert len(ax.collections[0].get_paths()) == 1
+        plt.close(fig)
+
+    def test_warmup_command_failure(self, cache_dir, no_network, monkeypatch):
+        """Test that a failed warm-up (no network, no cache) returns a non-zero exit code."""
+        monkeypatch.setattr('cartopy.io.shapereader.natural_earth', lambda **kwargs: socket.create_connection(('naturalearth.s3.amazonaws.com', 443)))
+
+        assert cli.main(['warmup']) == 1
+
+
+class TestOfflineBaseMap:
+    """Tests for base map creation without network."""
+
+    def test_get_base_ax_offline(self, synthetic_cache, no_network, matplotlib_backend):
+        """Test that get_base_ax draws coastlines and borders from the cache with networking disabled."""
+        from meteoplots.plots import get_base_ax
+
+        fig, ax = get_base_ax(extent=[-80, -30, -35, 10], figsize=(6, 6))
+        fig.canvas.draw()
+
+        coastline, borders = ax.collections[:2]
+        np.testing.assert_allclose(coastline.get_paths()[0].vertices, [(-80, -5), (-35, -5), (-35, -30)])
+        np.testing.assert_allclose(borders.get_paths()[0].vertices, [(-60, -20), (-50, -10)])
+        plt.close(fig)
+
+    def test_pacific_centred_coastline(self, cache_dir, synthetic_shapefiles, matplotlib_backend):
+        """Test that coastline vertices are shifted to the coordinates of a central_longitude=180 map."""
+        from meteoplots.plots import get_base_ax
+
+        fig, ax = get_base_ax(extent=[-80, -30, -35, 10], figsize=(6, 6), central_longitude=180, resolution='110m')
+        fig.canvas.draw()
+
+        np.testing.assert_allclose(ax.collections[0].get_paths()[0].vertices, [(100, -5), (145, -5), (145, -30)])
+        assert (cache_dir / 'natural_earth' / 'coastline_110m_lon180.wkb').exists()
+        plt.close(fig)
+
+    def test_mask_features_offline(self, synthetic_cache, no_network, sample_temperature_data, matplotlib_backend, tmp_path):
+        """Test a full contourf plot with masked oceans and saving, with networking disabled."""
+        from meteoplots.plots import plot_contourf_from_xarray
+
+        plot_contourf_from_xarray(sample_temperature_data, plot_var_colorbar='temperature', mask_oceans=True, path_save=str(tmp_path))
+
+        assert (tmp_path / 'contourf_plot.png').exists()
+
+    def test_other_projections(self, synthetic_cache, matplotlib_backend):
+        """Test that non-PlateCarree axes project the cached geometries."""
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.Mercator())
+
+        collection = add_natural_earth(ax, 'borders')
+
+        assert np.abs(collection.get_paths()[0].vertices).max() > 1e6
+        plt.close(fig)
+
+    def test_loaded_when_drawn(self, cache_dir, synthetic_shapefiles, matplotlib_backend):
+        """Test that features are only read when the figure is drawn, like cartopy features."""
+        from meteoplots.plots import get_base_ax
+
+        fig, ax = get_base_ax(extent=[-80, -30, -35, 10], figsize=(6, 6))
+        assert synthetic_shapefiles == []
+
+        fig.canvas.draw()
+        assert sorted(request[2] for request in synthetic_shapefiles) == ['admin_0_boundary_lines_land', 'coastline']
+        plt.close(fig)
+
+
+class TestResolutionByExtent:
+    """Tests for the automatic Natural Earth resolution and the geometries clipped to the extent."""
+
+    def test_natural_earth_resolution(self):
+        """Test the resolution chosen from the largest side of the extent."""
+        assert natural_earth_resolution([-80, -30, -35, 10]) == '110m'
+        assert natural_earth_resolution([-55, -35, -30, -15]) == '50m'
+        assert natural_earth_resolution([-53, -44, -26, -19]) == '10m'
+
+    def test_auto_resolution(self, cache_dir, synthetic_shapefiles, matplotlib_backend):
+        """Test that base maps read the resolution of their extent, unless coastline_resolution is given."""
+        from meteoplots.plots import get_base_ax
+
+        for extent, resolution in [([-53, -44, -26, -19], 'auto'), ([-80, -30, -35, 10], 'auto'), ([-53, -44, -26, -19], '50m')]:
+            fig, ax = get_base_ax(extent=extent, figsize=(6, 6), resolution=resolution)
+            fig.canvas.draw()
+            plt.close(fig)
+
+        assert sorted({request[0] for request in synthetic_shapefiles}) == ['10m', '110m', '50m']
+
+    def test_invalid_resolution(self, cache_dir, matplotlib_backend):
+        """Test that an unknown resolution raises ValueError."""
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.PlateCarree())
+
+        with pytest.raises(ValueError, match='Resolution'):
+            add_natural_earth(ax, 'coastline', '1m')
+        plt.close(fig)
+
+    @pytest.mark.parametrize('central_longitude', [0, -50, 180])
+    def test_clipped_to_extent(self, cache_dir, synthetic_shapefiles, matplotlib_backend, central_longitude):
+        """Test that only the part of the features within the extent plus margin is drawn."""
+        from meteoplots.plots import get_base_ax
+
+        fig, ax = get_base_ax(extent=[-60, -40, -20, 0], figsize=(6, 6), central_longitude=central_longitude, resolution='50m')
+        fig.canvas.draw()
+
+        # Extent + 10% de margem, nas coordenadas do mapa (x = longitude - central_longitude, em -180-180)
+        west = (-62 - central_longitude + 180) % 360 - 180
+        vertices = np.concatenate([path.vertices for collection in ax.collections[:2] for path in collection.get_paths()])
+        assert vertices[:, 0].min() >= west and vertices[:, 0].max() <= west + 24
+        assert vertices[:, 1].min() >= -22 and vertices[:, 1].max() <= 2
+        np.testing.assert_allclose(ax.collections[0].get_paths()[0].vertices, [(west, -5), (west + 24, -5)])
+        plt.close(fig)
+
+    def test_clipped_geometries_cached(self, cache_dir, synthetic_shapefiles, matplotlib_backend, monkeypatch):
+        """Test that the clipping of a feature is done once per resolution and extent, and never at 110m."""
+        from meteoplots.plots import get_base_ax
+        from meteoplots.utils import geometry
+
+        calls = []
+        clip = geometry._clip
+        monkeypatch.setattr(geometry, '_clip', lambda *args: calls.append(args[2]) or clip(*args))
+
+        for resolution in ['50m', '50m', '50m', '110m']:
+            fig, ax = get_base_ax(extent=[-60, -40, -20, 0], figsize=(6, 6), resolution=resolution)
+            fig.canvas.draw()
+            plt.close(fig)
+
+        assert len(calls) == 2
+        assert len(ax.collections[0].get_paths()[0].vertices) == 3
+
+    def test_frames_cache_bounded(self, cache_dir, synthetic_shapefiles, matplotlib_backend, monkeypatch):
+        """Test that evicted feature frames also release their clipped geometries."""
+        import gc
+        from meteoplots.plots import get_base_ax
+        from meteoplots.utils import geometry
+        from meteoplots.utils.utils import LRUCache
+
+        monkeypatch.setattr(natural_earth, '_FRAMES', LRUCache(maxsize=1))
+        monkeypatch.setattr(geometry, '_SIMPLIFIED', {})
+
+        fig, ax = get_base_ax(extent=[-60, -40, -20, 0], figsize=(6, 6), resolution='50m')
+        fig.canvas.draw()
+        plt.close(fig)
+        gc.collect()
+
+        assert len(natural_earth._FRAMES) == 1
+        assert len(geometry._SIMPLIFIED) == 1
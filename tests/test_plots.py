@@ -5,7 +5,7 @@ Tests for meteoplots.plots module.
 import pytest
 import numpy as np
 import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
+from matplotlib.contour import ContourSet
 import xarray as xr
 from unittest.mock import patch, MagicMock
 
@@ -16,6 +16,7 @@ from meteoplots.plots import (
     plot_quiver_from_xarray,
     plot_streamplot_from_xarray,
     plot_multipletypes_from_xarray,
+    plot_small_multiples_from_xarray,
     get_base_ax
 )
 from tests.conftest import assert_figure_created, assert_plot_has_data
@@ -31,11 +32,12 @@ class TestAddBoxToPlot:
         # Define box extent
         extent_boxes = [[-55, -45, -25, -15]]  # [lon_min, lon_max, lat_min, lat_max]
         
-        add_box_to_plot(ax, extent_boxes)
+        boxes = add_box_to_plot(ax, extent_boxes)
         
-        # Check that a patch was added
-        assert len(ax.patches) == 1
-        assert isinstance(ax.patches[0], mpatches.Rectangle)
+        # Check that one collection with one box was added
+        assert boxes in ax.collections
+        assert len(boxes.get_paths()) == 1
+        np.testing.assert_allclose(boxes.get_paths()[0].vertices[:4], [[-55, -25], [-45, -25], [-45, -15], [-55, -15]])
         
         plt.close(fig)
         
@@ -49,10 +51,13 @@ class TestAddBoxToPlot:
             [-50, -40, -30, -20]
         ]
         
-        add_box_to_plot(ax, extent_boxes)
+        n_collections = len(ax.collections)
+        boxes = add_box_to_plot(ax, extent_boxes)
         
-        # Check that two patches were added
-        assert len(ax.patches) == 2
+        # Check that both boxes are in a single collection
+        assert len(ax.collections) == n_collections + 1
+        assert len(boxes.get_paths()) == 2
+        assert len(ax.patches) == 0
         
         plt.close(fig)
         
@@ -62,7 +67,7 @@ class TestAddBoxToPlot:
         
         extent_boxes = [[-55, -45, -25, -15]]
         
-        add_box_to_plot(
+        boxes = add_box_to_plot(
             ax, 
             extent_boxes,
             edgecolor_box='red',
@@ -72,18 +77,33 @@ class TestAddBoxToPlot:
             alpha_box=0.5
         )
         
-        # Check that patch was added with correct properties
-        assert len(ax.patches) == 1
-        patch = ax.patches[0]
-        
         import matplotlib.colors as mcolors
-        assert patch.get_edgecolor()[0:3] == mcolors.to_rgb('red')  # Check RGB components
-        assert patch.get_facecolor()[0:3] == mcolors.to_rgb('blue')
-        assert patch.get_linewidth() == 3
-        assert patch.get_linestyle() == '--'
-        assert patch.get_alpha() == 0.5
+        assert tuple(boxes.get_edgecolor()[0][0:3]) == mcolors.to_rgb('red')  # Check RGB components
+        assert tuple(boxes.get_facecolor()[0][0:3]) == mcolors.to_rgb('blue')
+        assert boxes.get_linewidth()[0] == 3
+        assert boxes.get_linestyle()[0][1] is not None  # dashed
+        assert boxes.get_alpha() == 0.5
         
         plt.close(fig)
+
+    def test_per_box_colors_and_labels(self, matplotlib_backend):
+        """Test one color per box and labels at the box centers."""
+        import matplotlib.colors as mcolors
+        from meteoplots.utils.annotations import TextCollection
+
+        fig, ax = get_base_ax(extent=[-60, -30, -35, -5], figsize=(8, 6))
+        extent_boxes = [[lon, lon + 1, lat, lat + 1] for lon in range(-60, -30) for lat in range(-35, -5)]
+        colors = ['red' if i % 2 else 'blue' for i in range(len(extent_boxes))]
+
+        boxes = add_box_to_plot(ax, extent_boxes, facecolor_box=colors, labels_box=[str(i) for i in range(len(extent_boxes))])
+
+        assert len(boxes.get_paths()) == 900
+        assert tuple(boxes.get_facecolor()[1][:3]) == mcolors.to_rgb('red')
+        labels = [c for c in ax.collections if isinstance(c, TextCollection)][0]
+        assert len(labels) == 900
+        np.testing.assert_allclose(labels.label_offsets[0], [-59.5, -34.5])
+
+        plt.close(fig)
         
     def test_empty_box_list(self, matplotlib_backend):
         """Test behavior with empty box list."""
@@ -94,8 +114,9 @@ class TestAddBoxToPlot:
         # Should not raise an error
         add_box_to_plot(ax, extent_boxes)
         
-        # No patches should be added
+        # Nothing should be added
         assert len(ax.patches) == 0
+        assert len(ax.collections) == 0
         
         plt.close(fig)
 
@@ -209,6 +230,44 @@ class TestPlotContourfFromXarray:
             
             plt.close(fig)
 
+    def test_contourf_basin_labels_declutter(self, sample_temperature_data, tmp_path, matplotlib_backend):
+        """Test that overlapping basin labels keep the one of the larger basin."""
+        import geopandas as gpd
+        from shapely.geometry import box
+
+        shp = gpd.GeoDataFrame({'Nome_Bacia': ['Grande', 'Pequena'],
+                                'geometry': [box(-60, -30, -40, -10), box(-49.8, -20.3, -49.2, -19.7)]}, crs='EPSG:4326')
+        path = tmp_path / 'bacias.shp'
+        shp.to_file(path)
+
+        fig, ax = plot_contourf_from_xarray(sample_temperature_data, plot_var_colorbar='temperature', shp_path_bacias=str(path),
+                                            add_values_from_shapefile=True, declutter_labels=True, savefigure=False)
+
+        visible = [text for text in ax.texts if text.get_visible()]
+        assert len(ax.texts) == 2
+        assert len(visible) == 1
+        assert visible[0].get_position() == pytest.approx((-50, -20))
+
+        plt.close(fig)
+
+    def test_contourf_coarsen_for_display(self, matplotlib_backend, monkeypatch):
+        """Test that coarsen=True contours a grid reduced to the display resolution (max for precipitation)."""
+        from meteoplots.utils import utils
+
+        lat = np.arange(-35, 5, 0.05)
+        lon = np.arange(-60, -30, 0.05)
+        data = xr.DataArray(np.random.rand(len(lat), len(lon)) * 50, coords=[('latitude', lat), ('longitude', lon)])
+
+        calls = []
+        coarsen_to_display = utils.coarsen_to_display
+        monkeypatch.setattr(utils, 'coarsen_to_display', lambda *args, **kwargs: calls.append(kwargs['method']) or coarsen_to_display(*args, **kwargs))
+
+        fig, ax = plot_contourf_from_xarray(data, plot_var_colorbar='tp', extent=[-60, -30, -35, 5], figsize=(6, 6), coarsen=True, savefigure=False)
+
+        assert calls == ['max']
+        assert_plot_has_data(ax)
+        plt.close(fig)
+
 
 class TestPlotContourFromXarray:
     """Tests for plot_contour_from_xarray function."""
@@ -242,6 +301,31 @@ class TestPlotContourFromXarray:
         
         plt.close(fig)
 
+    def test_contour_groups_single_pass(self, sample_pressure_data, matplotlib_backend):
+        """Test that all level groups are contoured once with per-level colors, styles and widths."""
+        from matplotlib.contour import ContourSet
+        from matplotlib.colors import to_rgba
+
+        fig, ax = plot_contour_from_xarray(
+            xarray_data=sample_pressure_data,
+            contour_levels=[[1000, 1005, 1010], [1020, 1025]],
+            colors_levels=['black', 'red'],
+            styles_levels=['solid', 'dashed'],
+            widths_levels=[1, 2.5],
+            savefigure=False
+        )
+
+        contour_sets = [c for c in ax.collections if isinstance(c, ContourSet)]
+        assert len(contour_sets) == 1
+
+        cs = contour_sets[0]
+        np.testing.assert_array_equal(cs.levels, [1000, 1005, 1010, 1020, 1025])
+        assert [tuple(c) for c in cs.get_edgecolor()] == [to_rgba('black')] * 3 + [to_rgba('red')] * 2
+        np.testing.assert_array_equal(cs.get_linewidth(), [1, 1, 1, 2.5, 2.5])
+        assert cs.get_linestyle()[0] != cs.get_linestyle()[-1]
+
+        plt.close(fig)
+
 
 class TestPlotQuiverFromXarray:
     """Tests for plot_quiver_from_xarray function."""
@@ -415,11 +499,116 @@ class TestPlotMultipletypesFromXarray:
         )
         
         assert_figure_created(fig)
-        assert len(ax.patches) >= 1  # Should have box patches
+        assert any(len(c.get_paths()) == len(box_patches) for c in ax.collections)  # Boxes drawn as one collection
         
         plt.close(fig)
 
 
+class TestPlotSmallMultiplesFromXarray:
+    """Tests for plot_small_multiples_from_xarray function."""
+
+    def test_one_panel_per_member(self, sample_ensemble_data, matplotlib_backend):
+        """Test that each member gets its own panel and the figure has one colorbar."""
+        fig, axs = plot_small_multiples_from_xarray(
+            xarray_data=sample_ensemble_data,
+            plot_var_colorbar='tp',
+            savefigure=False
+        )
+
+        visible = [ax for ax in axs if ax.get_visible()]
+        assert len(visible) == 5
+        assert [ax.get_title(loc='left') for ax in visible] == ['0', '1', '2', '3', '4']
+        for ax in visible:
+            assert_plot_has_data(ax)
+
+        # 6 painéis no grid (3x2) + 1 colorbar
+        assert len(fig.axes) == 7
+
+        plt.close(fig)
+
+    def test_model_dimension_and_titles(self, sample_ensemble_data, matplotlib_backend):
+        """Test custom panel dimension, layout and panel titles."""
+        data = sample_ensemble_data.rename(member='modelo')
+
+        fig, axs = plot_small_multiples_from_xarray(
+            xarray_data=data,
+            plot_var_colorbar='tp',
+            panel_dim='modelo',
+            ncols=5,
+            panel_titles=['GFS', 'ECMWF', 'ETA', 'GEFS', 'ENS'],
+            savefigure=False
+        )
+
+        assert len(axs) == 5
+        assert axs[1].get_title(loc='left') == 'ECMWF'
+
+        plt.close(fig)
+
+    def test_parallel_contours_match_serial(self, sample_ensemble_data, matplotlib_backend):
+        """Test that contours generated in worker processes match the serial ones."""
+        fig_serial, axs_serial = plot_small_multiples_from_xarray(sample_ensemble_data, plot_var_colorbar='tp', savefigure=False)
+        fig_parallel, axs_parallel = plot_small_multiples_from_xarray(sample_ensemble_data, plot_var_colorbar='tp', n_workers=2, savefigure=False)
+
+        for ax_serial, ax_parallel in zip(axs_serial[:5], axs_parallel[:5]):
+            cs_serial, cs_parallel = ax_serial.collections[-1], ax_parallel.collections[-1]
+            assert type(cs_serial) is type(cs_parallel)
+            assert isinstance(cs_parallel, ContourSet)
+            np.testing.assert_allclose(cs_serial.get_facecolor(), cs_parallel.get_facecolor())
+            for path_serial, path_parallel in zip(cs_serial.get_paths(), cs_parallel.get_paths()):
+                np.testing.assert_allclose(path_serial.vertices, path_parallel.vertices)
+
+        plt.close(fig_serial)
+        plt.close(fig_parallel)
+
+    def test_panels_match_contourf(self, sample_ensemble_data, matplotlib_backend):
+        """Test that each panel has the same polygons and colors as contourf of its member."""
+        from meteoplots.colorbar.colorbars import custom_colorbar
+
+        fig, axs = plot_small_multiples_from_xarray(sample_ensemble_data, plot_var_colorbar='tp', savefigure=False)
+        levels, colors, cmap, _ = custom_colorbar(variavel_plotagem='tp')
+
+        data = sample_ensemble_data.isel(member=3)
+        fig_ref, ax_ref = plt.subplots(subplot_kw={'projection': axs[3].projection})
+        cs_ref = ax_ref.contourf(data.longitude, data.latitude, data.values, levels=levels, colors=colors, extend='both')
+
+        cs = axs[3].collections[-1]
+        np.testing.assert_allclose(cs.get_facecolor(), cs_ref.get_facecolor())
+        assert len(cs.get_paths()) == len(cs_ref.get_paths())
+        for path, path_ref in zip(cs.get_paths(), cs_ref.get_paths()):
+            np.testing.assert_allclose(path.vertices, path_ref.vertices)
+
+        plt.close(fig)
+        plt.close(fig_ref)
+
+    def test_base_map_paths_shared(self, sample_ensemble_data, matplotlib_backend):
+        """Test that every panel reuses the coastline and border paths of the first one."""
+        from meteoplots.utils.natural_earth import NaturalEarthCollection
+
+        fig, axs = plot_small_multiples_from_xarray(sample_ensemble_data, plot_var_colorbar='tp', savefigure=False)
+
+        first = {c.feature: c for c in axs[0].collections if isinstance(c, NaturalEarthCollection)}
+        assert set(first) == {'coastline', 'borders'}
+        for ax in axs[1:5]:
+            for collection in [c for c in ax.collections if isinstance(c, NaturalEarthCollection)]:
+                assert collection.share is first[collection.feature]
+
+        plt.close(fig)
+
+    def test_normalize_colorbar_with_cmap_palette(self, sample_ensemble_data, matplotlib_backend):
+        """Test normalize_colorbar with a palette defined by a cmap (no colors list)."""
+        fig, axs = plot_small_multiples_from_xarray(sample_ensemble_data, plot_var_colorbar='temperature', normalize_colorbar=True, savefigure=False)
+
+        for ax in axs[:5]:
+            assert_plot_has_data(ax)
+
+        plt.close(fig)
+
+    def test_missing_panel_dimension_raises_error(self, sample_temperature_data):
+        """Test that data without a member/model dimension raises an error."""
+        with pytest.raises(ValueError, match='panel dimension'):
+            plot_small_multiples_from_xarray(sample_temperature_data, plot_var_colorbar='temperature')
+
+
 class TestPlotsUtilities:
     """Tests for utility functions and common functionality."""
     
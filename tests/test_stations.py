@@ -0,0 +1,131 @@
+"""
+Tests for meteoplots.utils.stations module.
+"""
+
+import sys
+
+import pytest
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import cartopy.crs as ccrs
+
+from meteoplots.utils.stations import idw_to_grid, delaunay_to_grid, stations_to_grid
+from meteoplots.plots import plot_stations
+
+
+def smooth_field(lon, lat):
+    return 50 + 40 * np.sin(np.deg2rad(4 * lon)) * np.cos(np.deg2rad(3 * lat))
+
+
+@pytest.fixture
+def rain_gauges():
+    """Create 3000 rain gauges sampling a smooth field over South America."""
+    rng = np.random.default_rng(0)
+    lon, lat = rng.uniform(-75, -30, 3000), rng.uniform(-35, 5, 3000)
+    return pd.DataFrame({'lon': lon, 'lat': lat, 'valor': smooth_field(lon, lat)})
+
+
+class TestStationsToGrid:
+    """Tests for the IDW and Delaunay gridding of station data."""
+
+    @pytest.mark.parametrize('method, tolerance', [('idw', 2.0), ('linear', 0.5)])
+    def test_reconstructs_smooth_field(self, rain_gauges, method, tolerance):
+        """Test that both methods recover a smooth field from dense stations."""
+        grid = stations_to_grid(rain_gauges, method=method, resolution=0.5, extent=[-70, -35, -30, 0])
+        error = np.abs(grid - smooth_field(grid.longitude, grid.latitude))
+
+        assert grid.dims == ('latitude', 'longitude')
+        assert float(error.mean()) < tolerance
+
+    def test_idw_exact_at_stations(self):
+        """Test that a grid point on a station takes the station value."""
+        field = idw_to_grid(np.array([-50.0, -40.0]), np.array([-20.0, -10.0]), np.array([10.0, 30.0]),
+                            grid_lon=[-50.0, -45.0], grid_lat=[-20.0])
+
+        assert field.sel(longitude=-50.0, latitude=-20.0) == 10.0
+        assert 10.0 < field.sel(longitude=-45.0, latitude=-20.0) < 30.0
+
+    def test_idw_max_distance(self):
+        """Test that points far from every station are NaN."""
+        field = idw_to_grid(np.array([-50.0]), np.array([-20.0]), np.array([5.0]),
+                            grid_lon=[-50.0, -30.0], grid_lat=[-20.0], max_distance=5)
+
+        np.testing.assert_array_equal(np.isnan(field.values), [[False, True]])
+
+    def test_idw_without_scipy(self, rain_gauges, monkeypatch):
+        """Test that the numpy fallback gives the same result as the KD-tree."""
+        pytest.importorskip('scipy')
+        expected = stations_to_grid(rain_gauges, resolution=1.0)
+
+        monkeypatch.setitem(sys.modules, 'scipy.spatial', None)
+        result = stations_to_grid(rain_gauges, resolution=1.0)
+
+        np.testing.assert_allclose(result, expected)
+
+    def test_linear_outside_hull(self):
+        """Test that Delaunay interpolation is NaN outside the stations' convex hull."""
+        field = delaunay_to_grid(np.array([0.0, 1.0, 0.0]), np.array([0.0, 0.0, 1.0]), np.array([0.0, 1.0, 2.0]),
+                                 grid_lon=[0.25, 2.0], grid_lat=[0.25])
+
+        assert field[0, 0] == pytest.approx(0.75)
+        assert np.isnan(field[0, 1])
+
+    def test_missing_values_and_columns(self, rain_gauges):
+        """Test that NaN stations are ignored and missing columns raise ValueError."""
+        data = rain_gauges.copy()
+        data.loc[:10, 'valor'] = np.nan
+        assert np.isfinite(stations_to_grid(data, resolution=1.0)).all()
+
+        with pytest.raises(ValueError, match='no column'):
+            stations_to_grid(rain_gauges, value_column='tp')
+        with pytest.raises(ValueError, match='not supported'):
+            stations_to_grid(rain_gauges, method='kriging')
+
+
+class TestPlotStations:
+    """Tests for plot_stations."""
+
+    def test_scatter_with_palette(self, rain_gauges, matplotlib_backend):
+        """Test colored scatter symbols with the 'tp' palette."""
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.PlateCarree())
+
+        fig, ax = plot_stations(rain_gauges, 'tp', fig=fig, ax=ax, savefigure=False)
+
+        assert len(ax.collections[-1].get_offsets()) == len(rain_gauges)
+        plt.close('all')
+
+    def test_interpolated(self, rain_gauges, matplotlib_backend, monkeypatch):
+        """Test that interpolation grids the stations and uses plot_contourf_from_xarray."""
+        calls = {}
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.PlateCarree())
+        monkeypatch.setattr('meteoplots.plots.plot_contourf_from_xarray',
+                            lambda data, plot_var_colorbar=None, **kwargs: calls.update(data=data, palette=plot_var_colorbar) or (fig, ax))
+
+        plot_stations(rain_gauges, 'tp', interpolation='idw', resolution=1.0, savefigure=False)
+
+        assert calls['palette'] == 'tp'
+        assert calls['data'].dims == ('latitude', 'longitude')
+        plt.close('all')
+
+    @pytest.mark.parametrize('interpolation', [None, 'idw'])
+    def test_every_palette(self, rain_gauges, palette_names, matplotlib_backend, interpolation):
+        """Test that every custom_colorbar palette (named/short cmaps, few colors) can color the stations."""
+        stations = rain_gauges.iloc[:300]
+
+        for palette in palette_names:
+            fig = plt.figure()
+            ax = plt.axes(projection=ccrs.PlateCarree())
+
+            fig, ax = plot_stations(stations, palette, interpolation=interpolation, resolution=2.0, fig=fig, ax=ax, savefigure=False)
+            fig.canvas.draw()
+
+            assert len(ax.collections[-1].get_facecolors()) == len(stations), palette
+            plt.close('all')
+
+    def test_requires_palette(self, rain_gauges):
+        """Test that plotting without palette or levels raises ValueError."""
+        with pytest.raises(ValueError, match='levels'):
+            plot_stations(rain_gauges)
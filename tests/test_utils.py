@@ -16,7 +16,17 @@ from PIL import Image
 
 from meteoplots.utils.utils import (
     calculate_mean_basin_value_from_shapefile,
-    figures_panel
+    figures_panel,
+    normalize_longitude,
+    normalize_extent,
+    display_resolution,
+    coarsen_to_display,
+    gaussian_smooth,
+    smooth_contour_paths,
+    place_contour_labels,
+    land_sea_mask,
+    mask_land_sea,
+    LRUCache
 )
 from meteoplots.utils.titles import generate_title
 
@@ -235,6 +245,114 @@ class TestFiguresPanel:
             )
 
 
+class TestNormalizeLongitude:
+    """Tests for normalize_longitude and normalize_extent functions."""
+
+    @staticmethod
+    def make_data(lon):
+        lat = np.arange(-2, 3, 1.0)
+        return xr.DataArray(np.tile(lon, (len(lat), 1)), coords=[('latitude', lat), ('longitude', lon)])
+
+    def test_global_grid_is_rolled(self):
+        """Test that a global 0-360 grid is rotated to sorted -180-180."""
+        data = self.make_data(np.arange(0, 360, 1.0))
+
+        result = normalize_longitude(data)
+
+        assert np.all(np.diff(result.longitude.values) > 0)
+        assert result.longitude.min() == -180 and result.longitude.max() == 179
+        # Os valores acompanham as coordenadas
+        np.testing.assert_array_equal(result.values % 360, (result.longitude.values % 360)[None, :].repeat(5, axis=0))
+
+    def test_regional_grid_is_not_copied(self):
+        """Test that a 0-360 grid entirely above 180 only changes the coordinate."""
+        data = self.make_data(np.arange(280, 330, 1.0))
+
+        result = normalize_longitude(data)
+
+        assert result.longitude.values[0] == -80
+        assert np.shares_memory(result.values, data.values)
+
+        dataset = data.to_dataset(name='t')
+        assert np.shares_memory(normalize_longitude(dataset)['t'].values, dataset['t'].values)
+
+    def test_rotated_grid_is_copied(self):
+        """Test that a grid crossing the window edge is rotated into a new array, leaving the input intact."""
+        data = self.make_data(np.arange(0, 360, 60.0))
+
+        result = normalize_longitude(data)
+
+        np.testing.assert_array_equal(result.longitude.values, [-180, -120, -60, 0, 60, 120])
+        np.testing.assert_array_equal(result.values[0], [180, 240, 300, 0, 60, 120])
+        assert not np.shares_memory(result.values, data.values)
+        np.testing.assert_array_equal(data.longitude.values, np.arange(0, 360, 60.0))
+
+    def test_data_already_normalized(self):
+        """Test that -180-180 data is returned unchanged."""
+        data = self.make_data(np.arange(-75, -30, 1.0))
+
+        assert normalize_longitude(data) is data
+
+    def test_unordered_grid(self):
+        """Test the fallback for irregular/unordered longitudes."""
+        data = self.make_data(np.array([350.0, 10.0, 190.0, 0.0]))
+
+        result = normalize_longitude(data)
+
+        np.testing.assert_array_equal(result.longitude.values, [-170, -10, 0, 10])
+        np.testing.assert_array_equal(result.values[0], [190, 350, 0, 10])
+
+    def test_permutation_is_cached(self):
+        """Test that the permutation is computed once per coordinate array."""
+        from meteoplots.utils import utils
+
+        lon = np.arange(0.5, 360, 2.0)
+        normalize_longitude(self.make_data(lon))
+        cached = utils._longitude_permutation(lon)
+
+        assert utils._longitude_permutation(lon.copy()) is cached
+
+    def test_dataset(self):
+        """Test that every variable of a Dataset is normalized together."""
+        lon = np.arange(0, 360, 10.0)
+        ds = xr.Dataset({'u': self.make_data(lon), 'v': self.make_data(lon) * 2})
+
+        result = normalize_longitude(ds)
+
+        np.testing.assert_array_equal(result['v'].values, 2 * result['u'].values)
+
+    def test_normalize_extent(self):
+        """Test conversion of extents from 0-360 to -180-180."""
+        assert normalize_extent([280, 330, -35, 10]) == (-80, -30, -35, 10)
+        assert normalize_extent([240, 360, -60, 20]) == (-120, 0, -60, 20)
+        assert normalize_extent([-60, -30, -35, 5]) == (-60, -30, -35, 5)
+        # Cruza 180°: continua crescente a partir de lon_min
+        assert normalize_extent([170, 190, 0, 10]) == (170, 190, 0, 10)
+        assert normalize_extent([170, -170, 0, 10]) == (170, 190, 0, 10)
+        assert normalize_extent([0, 360, -90, 90]) == (-180, 180, -90, 90)
+
+    def test_pacific_centred_grid(self):
+        """Test that central_longitude=180 keeps 0-360 data and moves -180-180 data to 0-360."""
+        data = self.make_data(np.arange(0, 360, 1.0))
+        assert normalize_longitude(data, central_longitude=180) is data
+
+        result = normalize_longitude(self.make_data(np.arange(-180, 180, 1.0)), central_longitude=180)
+
+        np.testing.assert_array_equal(result.longitude.values, np.arange(0, 360, 1.0))
+        np.testing.assert_array_equal(result.values[0] % 360, result.longitude.values)
+
+    def test_dateline_extent_matches_data(self):
+        """Test that a dateline-crossing extent and the data share the window of the map."""
+        lon_min, lon_max, _, _ = normalize_extent([160, -160, -10, 10], central_longitude=180)
+        result = normalize_longitude(self.make_data(np.arange(-180, 180, 1.0)), central_longitude=180)
+
+        assert (lon_min, lon_max) == (160, 200)
+        inside = result.longitude.values[(result.longitude.values >= lon_min) & (result.longitude.values <= lon_max)]
+        np.testing.assert_array_equal(inside, np.arange(160, 201, 1.0))
+        # Mapas de -80 a -30 centrados no Pacífico usam 280-330
+        assert normalize_extent([-80, -30, -35, 10], central_longitude=180) == (280, 330, -35, 10)
+
+
 class TestGenerateTitle:
     """Tests for generate_title function."""
     
@@ -380,6 +498,56 @@ class TestGenerateTitle:
         assert "Copernicus" in title
 
 
+class TestCoarsenToDisplay:
+    """Tests for the display-resolution coarsening stage."""
+
+    @pytest.fixture
+    def fine_grid(self):
+        """0.05° field over [-60, -30, -35, 5] with value = row index."""
+        lat = np.arange(-35, 5, 0.05)
+        lon = np.arange(-60, -30, 0.05)
+        return xr.DataArray(np.repeat(np.arange(len(lat), dtype=float)[:, None], len(lon), axis=1),
+                            coords=[('latitude', lat), ('longitude', lon)])
+
+    def test_display_resolution(self):
+        """Test degrees per pixel from extent, figsize and dpi."""
+        assert display_resolution([-80, -30, -35, 10], (12, 12), dpi=100) == pytest.approx((50 / 1200, 45 / 1200))
+        assert display_resolution([300, 330, -35, 5], (6, 4), dpi=50) == pytest.approx((30 / 300, 40 / 200))
+
+    def test_factor_from_figure(self, fine_grid):
+        """Test that the block size follows the pixel size (3 pixels per cell by default)."""
+        coarse = coarsen_to_display(fine_grid, [-60, -30, -35, 5], (6, 6), dpi=100)
+
+        # 30° / 600 px * 3 px = 0.15° -> blocos de 3 x 3 células de 0.05°
+        assert coarse.sizes['longitude'] == fine_grid.sizes['longitude'] // 3
+        np.testing.assert_allclose(float(coarse.longitude[1] - coarse.longitude[0]), 0.15)
+
+    def test_mean_and_max(self, fine_grid):
+        """Test block mean and block max."""
+        mean = coarsen_to_display(fine_grid, [-60, -30, -35, 5], (6, 6), method='mean')
+        maximum = coarsen_to_display(fine_grid, [-60, -30, -35, 5], (6, 6), method='max')
+
+        # 40° / 600 px * 3 px = 0.2° -> blocos de 4 linhas (valores 0, 1, 2, 3)
+        assert mean[0, 0] == 1.5
+        assert maximum[0, 0] == 3.0
+
+    def test_coarse_grid_unchanged(self, sample_temperature_data):
+        """Test that grids already coarser than the display are returned as is."""
+        assert coarsen_to_display(sample_temperature_data, [-75, -30, -35, 10], (12, 12)) is sample_temperature_data
+
+    def test_crop_to_extent(self, fine_grid):
+        """Test that the field is cropped to the extent (plus margin) before coarsening."""
+        coarse = coarsen_to_display(fine_grid, [-50, -40, -20, -10], (2, 2), dpi=100)
+
+        assert coarse.longitude.min() > -51 and coarse.longitude.max() < -39
+        assert coarse.latitude.min() > -21 and coarse.latitude.max() < -9
+
+    def test_invalid_method(self, fine_grid):
+        """Test that unknown methods raise ValueError."""
+        with pytest.raises(ValueError):
+            coarsen_to_display(fine_grid, [-60, -30, -35, 5], (6, 6), method='median')
+
+
 class TestUtilsIntegration:
     """Integration tests for utils functionality."""
     
@@ -451,4 +619,179 @@ class TestUtilsIntegration:
         with Image.open(panel_path) as panel_img:
             with Image.open(image_paths[0]) as single_img:
                 assert panel_img.size[0] >= single_img.size[0]
-                assert panel_img.size[1] >= single_img.size[1]
\ No newline at end of file
+                assert panel_img.size[1] >= single_img.size[1]
+
+
+class TestContourSmoothing:
+    """Tests for the gaussian field filter and the Chaikin path smoothing."""
+
+    def test_gaussian_smooth_reduces_noise(self, sample_temperature_data):
+        """Test that the filter keeps the mean, reduces the variance and the coordinates."""
+        smoothed = gaussian_smooth(sample_temperature_data, 2)
+
+        assert smoothed.dims == sample_temperature_data.dims
+        assert float(smoothed.std()) < float(sample_temperature_data.std())
+        assert float(smoothed.mean()) == pytest.approx(float(sample_temperature_data.mean()), rel=1e-2)
+
+    def test_gaussian_smooth_keeps_nan(self, sample_temperature_data):
+        """Test that missing values stay NaN and do not spread."""
+        data = sample_temperature_data.copy()
+        data[5, 5] = np.nan
+        smoothed = gaussian_smooth(data, 1)
+
+        assert np.isnan(smoothed[5, 5])
+        assert np.isnan(smoothed).sum() == 1
+
+    def test_gaussian_smooth_disabled(self, sample_temperature_data):
+        """Test that sigma None/0 returns the input untouched."""
+        assert gaussian_smooth(sample_temperature_data, None) is sample_temperature_data
+
+    def test_smooth_contour_paths(self):
+        """Test that Chaikin doubles the vertices and keeps the lines close to the original."""
+        import matplotlib.pyplot as plt
+
+        x, y = np.meshgrid(np.linspace(-2, 2, 20), np.linspace(-2, 2, 20))
+        fig, ax = plt.subplots()
+        cs = ax.contour(x, y, x ** 2 + y ** 2, levels=[1, 2])
+        before = [path.vertices.copy() for path in cs.get_paths()]
+
+        smooth_contour_paths(cs, iterations=2)
+        after = cs.get_paths()
+
+        for original, smoothed in zip(before, after):
+            if len(original) == 0:
+                continue
+            assert len(smoothed.vertices) > len(original)
+            radius = np.hypot(*smoothed.vertices.T)
+            assert np.all(np.abs(radius - np.hypot(*original.T).mean()) < 0.1)
+
+        ax.clabel(cs, fmt='%.0f')
+        plt.close(fig)
+
+
+class TestPlaceContourLabels:
+    """Tests for the fast contour label placement."""
+
+    @pytest.fixture
+    def contour_set(self):
+        """Contours of a wave field on an 8x8 inch figure."""
+        import matplotlib.pyplot as plt
+
+        x, y = np.meshgrid(np.linspace(-4, 4, 200), np.linspace(-4, 4, 200))
+        fig, ax = plt.subplots(figsize=(8, 8))
+        yield ax.contour(x, y, 10 * np.sin(3 * x) * np.cos(2 * y), levels=np.arange(-8, 9, 4), colors='black')
+        plt.close(fig)
+
+    def test_labels_on_lines(self, contour_set):
+        """Test that every label lies on a line of its level."""
+        texts = place_contour_labels(contour_set, fontsize=10)
+
+        assert len(texts) > 0
+        for text in texts:
+            x, y = text.get_position()
+            value = 10 * np.sin(3 * x) * np.cos(2 * y)
+            assert abs(value - float(text.get_text())) < 0.5
+
+    def test_minimum_spacing(self, contour_set):
+        """Test that labels of the same level are at least `spacing` pixels apart."""
+        texts = place_contour_labels(contour_set, fontsize=10, spacing=200)
+        transform = contour_set.get_transform()
+
+        for level in {text.get_text() for text in texts}:
+            points = transform.transform([text.get_position() for text in texts if text.get_text() == level])
+            distances = np.hypot(*(points[:, None] - points[None]).transpose(2, 0, 1))
+            assert np.all(distances[np.triu_indices(len(points), 1)] >= 200)
+
+    def test_fewer_labels_with_larger_spacing(self, contour_set):
+        """Test that the spacing controls the label density."""
+        dense = place_contour_labels(contour_set, fontsize=10, spacing=100)
+        for text in dense:
+            text.remove()
+        sparse = place_contour_labels(contour_set, fontsize=10, spacing=400)
+
+        assert len(sparse) < len(dense)
+
+
+class TestLandSeaMask:
+    """Tests for the cached, rasterized land-sea mask."""
+
+    @pytest.fixture
+    def square_continent(self, monkeypatch, tmp_path):
+        """A single square 'continent' as Natural Earth land, with empty mask caches."""
+        from shapely.geometry import box
+        from meteoplots.utils import geometry, utils
+
+        calls = []
+        monkeypatch.setenv('METEOPLOTS_CACHE_DIR', str(tmp_path))
+        monkeypatch.setattr(utils, '_LAND_SEA_MASKS', {})
+        monkeypatch.setattr(geometry, 'land_geometries', lambda resolution='110m': calls.append(resolution) or [box(-60, -30, -40, -10)])
+        return calls
+
+    def test_mask_values(self, square_continent):
+        """Test that grid cells inside the land polygons are True."""
+        lon, lat = np.arange(-75, -30, 1.0), np.arange(-35, 5, 1.0)
+        land = land_sea_mask(lon + 0.5, lat + 0.5)
+
+        assert land.shape == (len(lat), len(lon))
+        assert land.sum() == 400
+        assert land[np.searchsorted(lat, -20), np.searchsorted(lon, -50)]
+        assert not land[0, 0]
+
+    def test_computed_once(self, square_continent, tmp_path):
+        """Test that the mask is rasterized once and reloaded from disk by a new process."""
+        from meteoplots.utils import utils
+
+        lon, lat = np.arange(-75, -30, 0.5), np.arange(-35, 5, 0.5)
+        first = land_sea_mask(lon, lat)
+
+        assert land_sea_mask(lon, lat) is first
+        assert len(list((tmp_path / 'masks').glob('*.npy'))) == 1
+
+        # Novo processo: cache em memória vazio, máscara lida do disco
+        utils._LAND_SEA_MASKS.clear()
+        np.testing.assert_array_equal(land_sea_mask(lon, lat), first)
+        assert square_continent == ['110m']
+
+    def test_mask_land_sea(self, square_continent, sample_temperature_data):
+        """Test that land or ocean cells become NaN."""
+        over_ocean = mask_land_sea(sample_temperature_data, 'land')
+        over_land = mask_land_sea(sample_temperature_data, 'ocean')
+
+        assert np.isnan(over_ocean.sel(latitude=-20, longitude=-50))
+        assert not np.isnan(over_land.sel(latitude=-20, longitude=-50))
+        assert (np.isnan(over_ocean) ^ np.isnan(over_land)).all()
+        with pytest.raises(ValueError, match="'land' or 'ocean'"):
+            mask_land_sea(sample_temperature_data, 'lakes')
+
+    def test_plot_mask_method_data(self, square_continent, sample_temperature_data, matplotlib_backend):
+        """Test that mask_method='data' masks the field and draws no LAND feature."""
+        import matplotlib.pyplot as plt
+        import cartopy.crs as ccrs
+        from cartopy.mpl.feature_artist import FeatureArtist
+        from meteoplots.plots import plot_contourf_from_xarray
+
+        fig = plt.figure()
+        ax = plt.axes(projection=ccrs.PlateCarree())
+
+        fig, ax = plot_contourf_from_xarray(sample_temperature_data, plot_var_colorbar='temperature', mask_continents=True, mask_method='data',
+                                            fig=fig, ax=ax, savefigure=False)
+
+        assert square_continent == ['110m']
+        assert not any(isinstance(artist, FeatureArtist) for artist in ax.get_children())
+        plt.close(fig)
+
+
+
+class TestLRUCache:
+    """Tests for the bounded in-process caches."""
+
+    def test_drops_least_recently_used(self):
+        """Test that the cache keeps maxsize entries and reading a key keeps it."""
+        cache = LRUCache(maxsize=2)
+        cache['a'], cache['b'] = 1, 2
+        assert cache['a'] == 1
+
+        cache['c'] = 3
+
+        assert list(cache) == ['a', 'c']
+        assert cache.pop('b', None) is None